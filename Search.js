@@ -216,8 +216,43 @@ const Search = () => {
   const [openDownloadDialog, setOpenDownloadDialog] = useState(false);
   const [downloadingResume, setDownloadingResume] = useState(null);
   const [hasSearched, setHasSearched] = useState(false);
+  const [suggestions, setSuggestions] = useState([]);
   const lastModifiedRef = useRef(null);
 
+  const termSeparator = searchType === 'skills' ? ',' : /\s+/;
+
+  // Live suggestions for the fragment currently being typed
+  useEffect(() => {
+    const fragment = searchTerm.split(termSeparator).pop().trim();
+    if (!token || fragment.length < 2) {
+      setSuggestions([]);
+      return undefined;
+    }
+
+    const timer = setTimeout(async () => {
+      try {
+        const response = await fetch(
+          `http://localhost:5000/api/resumes/suggest?prefix=${encodeURIComponent(fragment)}&limit=8`,
+          { headers: { 'Authorization': `Bearer ${token}` } }
+        );
+        if (!response.ok) return;
+        const data = await response.json();
+        const wantedType = { skills: 'skill', email: 'email' }[searchType];
+        setSuggestions((data.suggestions || []).filter(s => !wantedType || s.type === wantedType));
+      } catch (err) {
+        setSuggestions([]);
+      }
+    }, 150);
+    return () => clearTimeout(timer);
+  }, [searchTerm, searchType, token]);
+
+  const applySuggestion = (value) => {
+    const parts = searchTerm.split(termSeparator);
+    parts[parts.length - 1] = value;
+    setSearchTerm(parts.map(part => part.trim()).join(searchType === 'skills' ? ', ' : ' '));
+    setSuggestions([]);
+  };
+
   const handleSearch = async () => {
     if (!isAuthenticated || !token) {
       navigate('/login');
@@ -244,6 +279,7 @@ const Search = () => {
         body: JSON.stringify({
           search_term: searchTerm.trim(),
           search_type: searchType,
+          ...((searchType === 'text' || searchType === 'hybrid') && { page_size: 100 }),
         }),
       });
 
@@ -425,11 +461,13 @@ const Search = () => {
             >
               <MenuItem value="skills">Search by Skills</MenuItem>
               <MenuItem value="email">Search by Email(s)</MenuItem>
+              <MenuItem value="text">Full-Text Search</MenuItem>
+              <MenuItem value="hybrid">Smart Search (Keyword + Semantic)</MenuItem>
             </Select>
           </StyledFormControl>
 
           <StyledTextField
-            label={searchType === 'skills' ? "Enter skills (comma-separated)" : "Enter email(s) (space-separated)"}
+            label={searchType === 'skills' ? "Enter skills (comma-separated)" : (searchType === 'text' || searchType === 'hybrid') ? "Enter names, titles, companies or keywords" : "Enter email(s) (space-separated)"}
             value={searchTerm}
             onChange={(e) => {
               setSearchTerm(e.target.value);
@@ -439,12 +477,26 @@ const Search = () => {
               }
             }}
             onKeyPress={(e) => e.key === 'Enter' && handleSearch()}
-            placeholder={searchType === 'skills' ? "e.g., React, Node.js, Python" : "e.g., email1@example.com email2@example.com"}
+            placeholder={searchType === 'skills' ? "e.g., React, Node.js, Python" : (searchType === 'text' || searchType === 'hybrid') ? 'e.g., "data engineer" Acme Spark' : "e.g., email1@example.com email2@example.com"}
             fullWidth
             multiline={searchType === 'skills'}
             rows={searchType === 'skills' ? 2 : 1}
           />
 
+          {suggestions.length > 0 && (
+            <Stack direction="row" spacing={1} flexWrap="wrap" useFlexGap>
+              {suggestions.map((suggestion) => (
+                <Chip
+                  key={`${suggestion.type}-${suggestion.value}`}
+                  label={suggestion.value}
+                  size="small"
+                  variant="outlined"
+                  onClick={() => applySuggestion(suggestion.value)}
+                />
+              ))}
+            </Stack>
+          )}
+
           <Button
             variant="contained"
             color="primary"
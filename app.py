@@ -1,9 +1,13 @@
 # =============================================
 # Import Statements and Dependencies
 # =============================================
-from flask import Flask, request, jsonify, redirect, send_file, make_response  # Core Flask functionality
+from flask import Flask, request, jsonify, send_file, make_response, g, has_request_context  # Core Flask functionality
+from flask.json.provider import DefaultJSONProvider  # Base class for the BSON-aware JSON provider
 from flask_cors import CORS  # Handle Cross-Origin Resource Sharing
-from pymongo import MongoClient  # MongoDB database driver
+from pymongo import MongoClient, InsertOne, UpdateOne, DeleteOne  # MongoDB database driver and bulk operations
+from pymongo import monitoring  # Connection pool and command events
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, generate_latest, multiprocess, CONTENT_TYPE_LATEST  # Metrics
+from pymongo.errors import BulkWriteError  # Per-operation failures from bulk_write
 from bson import ObjectId  # MongoDB ObjectId handling
 import os  # Operating system utilities
 from dotenv import load_dotenv  # Environment variable management
@@ -11,28 +15,57 @@ from werkzeug.security import generate_password_hash, check_password_hash  # Pas
 import jwt  # JSON Web Token for authentication
 from datetime import datetime, timedelta  # Date and time utilities
 from functools import wraps  # Function decorator utilities
+from collections import OrderedDict, deque  # LRU bookkeeping for in-process caches, recent samples
+import threading  # Locks for caches shared between request threads
+import bisect  # Binary search over sorted suggestion keys
 
 # File Processing Packages
-from PyPDF2 import PdfReader  # PDF file reading
-import docx2txt  # DOCX file text extraction
+# PyPDF2 and docx2txt are imported on first use in the extract_text_* helpers
 import io  # Input/output stream utilities
 import base64  # Base64 encoding/decoding
 
 # AI and Processing Packages
-import google.generativeai as genai  # Google's Generative AI (Gemini) API
-from sentence_transformers import SentenceTransformer  # Text embedding model
-from sklearn.metrics.pairwise import cosine_similarity  # Calculate similarity between vectors
+# google.generativeai, sentence_transformers (torch) and numpy are heavy and only
+# needed by a few routes; they are imported on first use, see get_gemini_model()
+# and get_embedding_model()
 
 # Utility Packages
 import json  # JSON data handling
 import time  # Time-related functions
-from waitress import serve  # Production WSGI server
+import sys  # Interpreter path for the startup report
+import subprocess  # Child interpreters for the startup report
+import click  # Options for maintenance commands
 from werkzeug.utils import secure_filename  # Secure file name handling
-from concurrent.futures import ThreadPoolExecutor, as_completed  # Parallel processing
-import traceback  # For printing exception stack trace
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait  # Parallel processing
+import hashlib  # ETag digests
+import gzip  # Response compression
+import math  # Retry-After rounding
+import uuid  # Request IDs
+import random  # Profiling sample selection
+import cProfile  # Deterministic per-request profiling
+import logging  # Structured application logging
+from logging.handlers import QueueHandler, QueueListener  # Non-blocking log delivery
+import queue  # Bounded log queue
+import atexit  # Flush queued logs on shutdown
+import sqlite3  # Persistent LLM response cache shared by worker processes
 
 import re
 
+try:
+    import orjson  # Fast JSON serialization for API responses
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+try:
+    import brotli  # Brotli response compression
+except ImportError:  # Only gzip is offered
+    brotli = None
+
+try:
+    import fcntl  # Admission slots shared by worker processes
+except ImportError:  # Not on Windows; slots are then per process
+    fcntl = None
+
 # =============================================
 # Utility Functions
 # =============================================
@@ -43,65 +76,1233 @@ def is_valid_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return bool(re.match(pattern, email))
 
+def normalize_email(email):
+    """Return the canonical lowercase form of an email used for lookups"""
+    return (email or '').strip().lower()
+
+def parse_route_settings(value, convert):
+    """Parse 'route=value,route=value' settings into a dict of converted values"""
+    settings = {}
+    for item in (value or '').split(','):
+        if '=' in item:
+            route, setting = item.rsplit('=', 1)
+            try:
+                settings[route.strip()] = convert(setting.strip())
+            except ValueError:
+                # Logging is not configured yet; this goes to stderr
+                logging.getLogger('ats').warning('Ignoring invalid route setting %r; the route keeps the default', item.strip())
+    return settings
+
+def parse_log_level(name):
+    """Numeric logging level for a name such as WARNING"""
+    level = logging.getLevelName(name.upper())
+    if not isinstance(level, int):
+        raise ValueError(f'Unknown log level: {name}')
+    return level
+
+MAX_EXPERIENCE_YEARS = 60  # Anything larger is a calendar year or a typo, not a duration
+
+def parse_experience_years(value):
+    """Convert free-text experience such as '5+ years', '18 months' or '2015 - present' to a number of years"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        years = float(value)
+    else:
+        text = str(value or '').lower()
+        duration = re.search(r'(\d+(?:\.\d+)?)\s*\+?\s*(years?|yrs?|months?|mos?)\b', text)
+        calendar_years = [int(year) for year in re.findall(r'\b(?:19|20)\d{2}\b', text)]
+        if duration:
+            years = float(duration.group(1))
+            if duration.group(2).startswith('mo'):
+                years = round(years / 12, 1)
+        elif calendar_years:
+            # A span such as '2012 - 2018', '2015 - present' or 'since 2012'
+            if len(calendar_years) == 1 or re.search(r'present|current|now|today|date', text):
+                end = datetime.utcnow().year
+            else:
+                end = max(calendar_years)
+            years = float(end - min(calendar_years))
+        else:
+            match = re.search(r'\d+(?:\.\d+)?', text)
+            if not match:
+                return None
+            years = float(match.group())
+    return years if 0 <= years <= MAX_EXPERIENCE_YEARS else None
+
+def normalize_location(location):
+    """Lowercase a location and tidy its comma-separated parts"""
+    parts = [' '.join(part.split()) for part in str(location or '').lower().split(',')]
+    return ', '.join(part for part in parts if part)
+
+# Short degree abbreviations such as 'ms' or 'be' only count when they read as a
+# degree: followed by 'in'/'of', 'degree', punctuation, the end of the entry or
+# a field of study. 'MS Office' or 'will be' are not degrees.
+DEGREE_CONTEXT = (
+    r'(?=\s+(?:in|of)\b|\s*(?:degree\b|[,;(/|-]|$)|\s+(?:computer|information|data|software|electrical|electronics|'
+    r'mechanical|civil|chemical|business|management|finance|accounting|mathematics|physics|chemistry|biology|'
+    r'statistics|economics|engineering|science|arts|commerce)\b)'
+)
+
+def degree_pattern(words, abbreviations=()):
+    """Regex matching any of the unambiguous words, or an abbreviation in a degree context"""
+    pattern = r'\b(?:' + '|'.join(words) + r')\b'
+    if abbreviations:
+        pattern += r'|\b(?:' + '|'.join(abbreviations) + ')' + DEGREE_CONTEXT
+    return pattern
+
+# Checked in order, so higher degrees win when several are mentioned
+EDUCATION_LEVELS = [
+    ('doctorate', degree_pattern([r'ph\.?\s?d', r'doctor(?:ate)?'])),
+    ('masters', degree_pattern([r"master'?s?", r'm\.?\s?sc', r'mba', r'm\.?\s?tech', r'mca'], [r'm\.?\s?s\.?', r'm\.?\s?e\.?'])),
+    ('bachelors', degree_pattern(
+        [r"bachelor'?s?", r'b\.?\s?sc', r'b\.?\s?tech', r'bca', r'b\.?\s?com'],
+        [r'b\.?\s?s\.?', r'b\.?\s?e\.?', r'b\.?\s?a\.?']
+    )),
+    ('associate', r'\bassociate\b'),
+    ('diploma', r'(?<!school )\bdiploma\b'),
+    ('high_school', r'\b(high school|secondary|ssc|hsc)\b')
+]
+
+def classify_education(education):
+    """Map a free-text education entry to a coarse education level"""
+    text = str(education or '').lower()
+    if not text.strip():
+        return ''
+    for level, pattern in EDUCATION_LEVELS:
+        if re.search(pattern, text):
+            return level
+    return 'other'
+
+def compute_resume_facets(data):
+    """Derive typed facet fields from whichever raw resume fields are present in data"""
+    facets = {}
+    if 'total_experience' in data:
+        facets['experience_years'] = parse_experience_years(data.get('total_experience'))
+    if 'location' in data:
+        facets['location_normalized'] = normalize_location(data.get('location'))
+    if 'category' in data:
+        facets['category_normalized'] = ' '.join(str(data.get('category') or '').lower().split())
+    if 'education' in data:
+        facets['education_level'] = classify_education(data.get('education'))
+    return facets
+
 # =============================================
 # Environment Setup and Configuration
 # =============================================
 # Load environment variables
 load_dotenv()
 
+# =============================================
+# JSON Serialization
+# =============================================
+# Fields that are never sent back in list responses
+HEAVY_RESUME_FIELDS = {'file_data': 0, 'text_content': 0, 'embedding': 0}
+HEAVY_SUBMISSION_FIELDS = {'file_data': 0, 'resume_data': 0, 'text_content': 0}
+
+def bson_default(obj):
+    """Encode BSON and other non-JSON types found in MongoDB documents"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode('utf-8')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class BSONJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes ObjectId, datetime and bytes natively, using orjson when available"""
+
+    @staticmethod
+    def default(obj):
+        return bson_default(obj)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=bson_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=bson_default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def with_ids(docs):
+    """Add the 'id' alias the frontend expects alongside '_id'"""
+    for doc in docs:
+        doc['id'] = doc['_id']
+    return docs
+
 app = Flask(__name__)
+app.json = BSONJSONProvider(app)
 # Configure CORS with additional options
 CORS(app)
 
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'SECRET_KEY')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', '/app/uploads')
+app.config['USER_CACHE_TTL'] = int(os.getenv('USER_CACHE_TTL', 300))  # Seconds a resolved user stays cached
+app.config['USER_CACHE_MAX_SIZE'] = int(os.getenv('USER_CACHE_MAX_SIZE', 1024))  # Max cached users per process
+app.config['TOKEN_VERSION_CACHE_TTL'] = int(os.getenv('TOKEN_VERSION_CACHE_TTL', 5))  # Seconds before other workers see a token revocation
+app.config['MAX_BULK_OPERATIONS'] = int(os.getenv('MAX_BULK_OPERATIONS', 1000))  # Max items per bulk request
+app.config['SUGGEST_REFRESH_SECONDS'] = int(os.getenv('SUGGEST_REFRESH_SECONDS', 30))  # Pull changed resumes into suggestion indexes
+app.config['SUGGEST_REBUILD_SECONDS'] = int(os.getenv('SUGGEST_REBUILD_SECONDS', 600))  # Full rebuild, picks up deletes from other workers
+app.config['SUGGEST_MAX_TENANTS'] = int(os.getenv('SUGGEST_MAX_TENANTS', 256))  # Suggestion indexes kept per process
+app.config['EMBEDDING_INDEX_MAX_TENANTS'] = int(os.getenv('EMBEDDING_INDEX_MAX_TENANTS', 32))  # Embedding matrices kept per process, ~1.5 KB per resume each
+app.config['EMBEDDING_MODEL'] = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')  # Sentence-transformers model for resume vectors
+app.config['EMBEDDING_REFRESH_SECONDS'] = int(os.getenv('EMBEDDING_REFRESH_SECONDS', 60))  # Pull changed resumes into embedding matrices
+app.config['EMBEDDING_REBUILD_SECONDS'] = int(os.getenv('EMBEDDING_REBUILD_SECONDS', 600))  # Full reload, drops deleted rows
+app.config['HYBRID_SEARCH_BUDGET_MS'] = int(os.getenv('HYBRID_SEARCH_BUDGET_MS', 1500))  # Latency budget per hybrid search
+app.config['HYBRID_CANDIDATES'] = int(os.getenv('HYBRID_CANDIDATES', 100))  # Candidates taken from each signal before fusion
+app.config['RESUME_TEXT_MAX_CHARS'] = int(os.getenv('RESUME_TEXT_MAX_CHARS', 50000))  # Extracted text kept per resume
+app.config['LLM_RESUME_TOKEN_BUDGET'] = int(os.getenv('LLM_RESUME_TOKEN_BUDGET', 2000))  # Resume text tokens sent for extraction
+app.config['MONGO_DB_NAME'] = os.getenv('MONGO_DB_NAME', 'ats_db')  # Separate databases for benchmarks and load tests
+app.config['MONGO_MAX_POOL_SIZE'] = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))  # Connections per worker process
+app.config['MONGO_MIN_POOL_SIZE'] = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))  # Connections kept open while idle
+app.config['MONGO_MAX_IDLE_TIME_MS'] = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 300000))  # Close connections idle this long (0 = never)
+app.config['MONGO_WAIT_QUEUE_TIMEOUT_MS'] = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 10000))  # Max wait for a free connection (0 = forever)
+app.config['MONGO_CONNECT_TIMEOUT_MS'] = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 10000))  # TCP connect timeout
+app.config['MONGO_SOCKET_TIMEOUT_MS'] = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 0))  # Per-operation socket timeout (0 = none)
+app.config['MONGO_SERVER_SELECTION_TIMEOUT_MS'] = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))  # Wait for a usable server
+app.config['PUBLIC_JOB_CACHE_TTL'] = int(os.getenv('PUBLIC_JOB_CACHE_TTL', 60))  # Seconds a rendered public job page is reused
+app.config['PUBLIC_JOB_CACHE_MAX_SIZE'] = int(os.getenv('PUBLIC_JOB_CACHE_MAX_SIZE', 1024))  # Public job pages kept per process
+app.config['ADMISSION_IP_PER_MINUTE'] = float(os.getenv('ADMISSION_IP_PER_MINUTE', 10))  # Public LLM requests per client IP
+app.config['ADMISSION_IP_BURST'] = int(os.getenv('ADMISSION_IP_BURST', 5))
+app.config['ADMISSION_GLOBAL_PER_MINUTE'] = float(os.getenv('ADMISSION_GLOBAL_PER_MINUTE', 120))  # Public LLM requests per worker
+app.config['ADMISSION_GLOBAL_BURST'] = int(os.getenv('ADMISSION_GLOBAL_BURST', 20))
+app.config['ADMISSION_MAX_CONCURRENT'] = int(os.getenv('ADMISSION_MAX_CONCURRENT', 4))  # Public LLM requests running at once across all workers
+app.config['ADMISSION_SLOT_DIR'] = os.getenv('ADMISSION_SLOT_DIR', '/tmp/ats_admission')  # Lock files that hold the shared slots
+app.config['ADMISSION_QUEUE_DEPTH'] = int(os.getenv('ADMISSION_QUEUE_DEPTH', 8))  # Requests allowed to wait for a slot per worker; 0 in sync workers
+app.config['ADMISSION_QUEUE_TIMEOUT'] = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 10))  # Seconds a queued request waits
+app.config['ADMISSION_MAX_TRACKED_IPS'] = int(os.getenv('ADMISSION_MAX_TRACKED_IPS', 10000))
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')  # Bearer token required by /api/metrics when set
+app.config['PROFILE_TOKEN'] = os.getenv('PROFILE_TOKEN')  # Secret that enables profiling via the X-Profile header
+app.config['PROFILE_SAMPLE_RATE'] = float(os.getenv('PROFILE_SAMPLE_RATE', 0))  # Fraction of requests profiled automatically
+app.config['PROFILE_MODE'] = os.getenv('PROFILE_MODE', 'sampling')  # 'sampling' (collapsed stacks) or 'cprofile'
+app.config['PROFILE_INTERVAL_MS'] = float(os.getenv('PROFILE_INTERVAL_MS', 5))  # Sampling interval
+app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR', '/tmp/ats_profiles')  # Where profiles are written
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # Smallest JSON body worth compressing
+app.config['COMPRESS_GZIP_LEVEL'] = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+app.config['COMPRESS_BROTLI_QUALITY'] = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))  # Low qualities are fast enough per request
+app.config['LOG_LEVEL'] = os.getenv('LOG_LEVEL', 'INFO').upper()
+app.config['LOG_ROUTE_LEVELS'] = parse_route_settings(os.getenv('LOG_ROUTE_LEVELS'), parse_log_level)  # e.g. /api/health=WARNING
+app.config['LOG_SAMPLE_RATES'] = parse_route_settings(os.getenv('LOG_SAMPLE_RATES'), float)  # e.g. /api/resumes/suggest=0.01
+app.config['LOG_QUEUE_SIZE'] = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # Records buffered before new ones are dropped
+app.config['LLM_CACHE_PATH'] = os.getenv('LLM_CACHE_PATH', os.path.join(app.instance_path, 'llm_cache.sqlite3'))  # Shared by all workers on a host; holds resume data; empty disables
+app.config['LLM_CACHE_MAX_MB'] = int(os.getenv('LLM_CACHE_MAX_MB', 256))  # Least recently used responses are evicted beyond this
+
+# =============================================
+# In-Process Caches
+# =============================================
+class TTLCache:
+    """Thread-safe LRU whose entries expire a fixed time after they are stored.
+
+    The size limit and lifetime are read from app.config on every use, so they
+    can be tuned after import. Without a ttl_key entries never expire and are
+    only evicted by size; on_evict(key, value) is called for size evictions.
+    """
+
+    def __init__(self, max_size_key, ttl_key=None, on_evict=None):
+        self.max_size_key = max_size_key
+        self.ttl_key = ttl_key
+        self.on_evict = on_evict
+        self.entries = OrderedDict()  # key -> (value, expires_at)
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """The live value for key, or default if it is missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+                return default
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        with self.lock:
+            self._store(key, value)
+
+    def setdefault(self, key, factory):
+        """The live value for key, storing factory() first if there is none"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self.entries.move_to_end(key)
+                return entry[0]
+            value = factory()
+            self._store(key, value)
+            return value
+
+    def pop(self, key, default=None):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def _store(self, key, value):
+        expires_at = time.monotonic() + app.config[self.ttl_key] if self.ttl_key else None
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > app.config[self.max_size_key]:
+            evicted_key, (evicted, _) = self.entries.popitem(last=False)
+            if self.on_evict:
+                self.on_evict(evicted_key, evicted)
+
+class UserResumeIndex:
+    """In-process structure over one user's resumes, built once and then kept current.
+
+    Writes made by this worker are applied directly; writes from other workers
+    are pulled in by updated_at on a refresh, and a periodic rebuild picks up
+    their deletes. Subclasses set QUERY, PROJECTION, EXECUTOR and the
+    REFRESH_KEY/REBUILD_KEY config names, and implement apply, discard and
+    swap, which are called with lock held.
+    """
+
+    QUERY = {}
+    PROJECTION = {}
+
+    def __init__(self):
+        self.watermark = None
+        self.refreshed_at = 0
+        self.built_at = 0
+        self.removed_during_build = None  # Resume IDs deleted while a rebuild was loading
+        self.lock = threading.Lock()  # Guards the index structures; only held briefly
+        self.updating = threading.Lock()  # Held by the one build or refresh in progress
+
+    def track(self, resume):
+        """Advance the refresh watermark past a loaded resume"""
+        updated_at = resume.get('updated_at')
+        if isinstance(updated_at, datetime) and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def remove(self, resume_id):
+        """Drop a deleted resume, remembering it if a rebuild is loading"""
+        if self.removed_during_build is not None:
+            self.removed_during_build.add(resume_id)
+        self.discard(resume_id)
+
+    def build(self, user_id):
+        """Load every resume for the user into a fresh index, then swap its structures in"""
+        with self.lock:
+            self.removed_during_build = set()
+        fresh = type(self)()
+        fresh.apply(resumes_collection.find({'user_id': user_id, **self.QUERY}, self.PROJECTION))
+        with self.lock:
+            # Writes during the load reach Mongo and come back with the next
+            # refresh; deletes would not, so they are replayed here
+            for resume_id in self.removed_during_build:
+                fresh.discard(resume_id)
+            self.swap(fresh)
+            self.watermark = fresh.watermark
+            self.removed_during_build = None
+            self.built_at = self.refreshed_at = time.monotonic()
+
+    def refresh(self, user_id):
+        """Apply resumes written (by any worker) since the last refresh"""
+        query = {'user_id': user_id, **self.QUERY}
+        if self.watermark is not None:
+            query['updated_at'] = {'$gte': self.watermark}
+        changed = list(resumes_collection.find(query, self.PROJECTION))
+        with self.lock:
+            self.apply(changed)
+            self.refreshed_at = time.monotonic()
+
+    def update_in_background(self, update, user_id):
+        """Run a build or refresh on the index's pool unless one is already running"""
+        if not self.updating.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                update(user_id)
+            except Exception:
+                logger.exception(f'Failed to update {type(self).__name__}', extra={'user_id': user_id})
+            finally:
+                self.updating.release()
+
+        submit_tracked(self.EXECUTOR, self.POOL, run)
+
+def get_user_index(indexes, index_class, user_id):
+    """Return the user's index from indexes, building it on first use and updating it in the background when stale"""
+    index = indexes.setdefault(user_id, index_class)
+
+    if not index.built_at:
+        # Only the first request for a user waits for a build
+        with index.updating:
+            if not index.built_at:
+                index.build(user_id)
+        return index
+
+    now = time.monotonic()
+    if now - index.built_at > app.config[index.REBUILD_KEY]:
+        index.update_in_background(index.build, user_id)
+    elif now - index.refreshed_at > app.config[index.REFRESH_KEY]:
+        index.update_in_background(index.refresh, user_id)
+    return index
+
+# =============================================
+# Structured Logging
+# =============================================
+# Records are rendered as one JSON object per line and put on a bounded queue;
+# a listener thread does the writing, so request threads never block on stdout.
+# When the queue is full, records are dropped rather than waited on. Routes can
+# raise their minimum level (LOG_ROUTE_LEVELS) or sample their INFO/DEBUG
+# records per request (LOG_SAMPLE_RATES); warnings and errors are always kept.
+logger = logging.getLogger('ats')
+
+LOG_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JSONLogFormatter(logging.Formatter):
+    """Render a record and its extra fields as a single JSON line"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.utcfromtimestamp(record.created).isoformat() + 'Z',
+            'level': record.levelname,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in LOG_RECORD_FIELDS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """Tag records with the request ID and route, and apply the route's level and sampling"""
+
+    def filter(self, record):
+        if not has_request_context():
+            return True
+        if record.levelno < g.get('log_level', logging.NOTSET):
+            return False
+        if record.levelno < logging.WARNING and not g.get('log_sampled', True):
+            return False
+        record.request_id = g.get('request_id')
+        record.route = request.url_rule.rule if request.url_rule else None
+        return True
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that counts and drops records instead of blocking when the queue is full"""
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_log_listener = None
+_log_pid = None
+
+def init_logging():
+    """Start this process's log writer thread; called again after fork, where the parent's thread is gone"""
+    global _log_listener, _log_pid
+    if _log_pid == os.getpid():
+        return
+    log_queue = queue.Queue(maxsize=app.config['LOG_QUEUE_SIZE'])
+    handler = DroppingQueueHandler(log_queue)
+    handler.setFormatter(JSONLogFormatter())
+    handler.addFilter(RequestContextFilter())
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter('%(message)s'))
+    _log_listener = QueueListener(log_queue, stream)
+    _log_listener.start()
+
+    logger.handlers = [handler]
+    logger.setLevel(app.config['LOG_LEVEL'])
+    logger.propagate = False
+    _log_pid = os.getpid()
+
+@atexit.register
+def stop_logging():
+    """Flush queued records before the process exits"""
+    if _log_listener is not None and _log_pid == os.getpid():
+        _log_listener.stop()
+
+init_logging()
+
+@app.before_request
+def choose_request_logging():
+    """Decide once per request which records this route keeps"""
+    route = request.url_rule.rule if request.url_rule else None
+    g.log_level = app.config['LOG_ROUTE_LEVELS'].get(route, logging.NOTSET)
+    g.log_sampled = random.random() < app.config['LOG_SAMPLE_RATES'].get(route, 1.0)
+
+@app.after_request
+def log_request(response):
+    """One structured access record per request"""
+    started = g.get('request_started')
+    logger.info('request', extra={
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 2) if started is not None else None
+    })
+    return response
+
+# =============================================
+# Metrics
+# =============================================
+# Prometheus metrics. Under gunicorn, PROMETHEUS_MULTIPROC_DIR (set in
+# gunicorn_config.py) makes each worker write samples to shared files that
+# /api/metrics aggregates, so one scrape covers every worker.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    'ats_http_request_duration_seconds', 'Request latency by route',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    'ats_stage_duration_seconds', 'Latency of resume processing stages (text_extraction, llm, embedding)',
+    ['stage'], buckets=LATENCY_BUCKETS
+)
+MONGO_LATENCY = Histogram(
+    'ats_mongo_command_duration_seconds', 'MongoDB command latency',
+    ['command', 'outcome'], buckets=LATENCY_BUCKETS
+)
+LLM_CALLS = Counter('ats_llm_calls_total', 'Gemini calls by operation and outcome (success, error, timeout)', ['operation', 'outcome'])
+LLM_RETRIES = Counter('ats_llm_retries_total', 'Resume extraction retries', ['operation'])
+THREADPOOL_QUEUE_DEPTH = Gauge(
+    'ats_threadpool_queue_depth', 'Tasks submitted to a thread pool that have not started yet',
+    ['pool'], multiprocess_mode='livesum'
+)
+ADMISSION_REJECTIONS = Counter('ats_admission_rejections_total', 'Public requests rejected by admission control', ['reason'])
+LLM_CACHE_REQUESTS = Counter('ats_llm_cache_requests_total', 'LLM response cache lookups by operation and result (hit, miss, error)', ['operation', 'result'])
+LLM_JSON_REPAIRS = Counter('ats_llm_json_repairs_total', 'LLM responses that needed JSON repair, by outcome (recovered, failed)', ['outcome'])
+LLM_CACHE_EVICTIONS = Counter('ats_llm_cache_evictions_total', 'LLM responses evicted to keep the cache under LLM_CACHE_MAX_MB')
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Record the latency of every MongoDB command"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_LATENCY.labels(event.command_name, 'success').observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_LATENCY.labels(event.command_name, 'failure').observe(event.duration_micros / 1e6)
+
+def submit_tracked(executor, pool, fn, *args, **kwargs):
+    """Submit work to a thread pool, counting it in the queue-depth gauge until it starts"""
+    depth = THREADPOOL_QUEUE_DEPTH.labels(pool)
+    depth.inc()
+
+    def run():
+        depth.dec()
+        return fn(*args, **kwargs)
+
+    def forget_cancelled(future):
+        if future.cancelled():
+            depth.dec()
+
+    future = executor.submit(run)
+    future.add_done_callback(forget_cancelled)
+    return future
+
+@app.before_request
+def start_request_timer():
+    """Remember when the request started for the latency histogram"""
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    """Observe request latency labelled by route pattern, not raw path, to bound cardinality"""
+    started = g.get('request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.labels(request.method, route, str(response.status_code)).observe(time.perf_counter() - started)
+    return response
+
+# =============================================
+# Request Profiling
+# =============================================
+# Opt-in profiling of single requests. A request is profiled when it sends
+# `X-Profile: <PROFILE_TOKEN>`, or is authenticated and picked by PROFILE_SAMPLE_RATE. The
+# sampling profiler writes collapsed stacks (flamegraph.pl / speedscope input);
+# cprofile mode writes a pstats file. Files are named by route and request ID.
+class SamplingProfiler:
+    """Record every thread's Python stack at a fixed interval as collapsed-stack counts"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = {}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            # Upload work runs in pool threads, so sample all of them, rooted at the thread name
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                key = ';'.join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def write(self, path):
+        with open(f'{path}.folded', 'w') as f:
+            for stack, count in self.stacks.items():
+                f.write(f'{stack} {count}\n')
+        return f'{path}.folded'
+
+class CProfileProfiler:
+    """cProfile over the request thread, saved as a pstats file"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def write(self, path):
+        self.profile.dump_stats(f'{path}.prof')
+        return f'{path}.prof'
+
+# Client-supplied request IDs end up in log records and profile file names
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9-]{1,64}')
+
+def has_valid_token():
+    """Whether the request carries a valid, unrevoked JWT"""
+    token = get_token_from_request()
+    if not token:
+        return False
+    try:
+        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+        token_version = get_token_version(data['user_id'])
+    except Exception:
+        return False
+    return token_version is not None and token_version == data.get('token_version', 0)
+
+def should_profile():
+    """Whether this request asked for profiling with the right token, or is an authenticated request that was sampled"""
+    token = app.config['PROFILE_TOKEN']
+    if token and request.headers.get('X-Profile') == token:
+        return True
+    # Anonymous traffic is never sampled, so it cannot make the app write profiles
+    rate = app.config['PROFILE_SAMPLE_RATE']
+    return rate > 0 and random.random() < rate and has_valid_token()
+
+@app.before_request
+def start_request_profiler():
+    """Assign the request ID and start a profiler if this request is profiled"""
+    request_id = request.headers.get('X-Request-ID')
+    g.request_id = request_id if request_id and REQUEST_ID_PATTERN.fullmatch(request_id) else uuid.uuid4().hex
+    if should_profile():
+        if app.config['PROFILE_MODE'] == 'cprofile':
+            profiler = CProfileProfiler()
+        else:
+            profiler = SamplingProfiler(app.config['PROFILE_INTERVAL_MS'] / 1000)
+        profiler.start()
+        g.profiler = profiler
+
+@app.after_request
+def add_request_id(response):
+    """Echo the request ID so clients can match responses to profiles and logs"""
+    request_id = g.get('request_id')
+    if request_id:
+        response.headers['X-Request-ID'] = request_id
+    return response
+
+@app.teardown_request
+def stop_request_profiler(error=None):
+    """Stop the request's profiler and write its output"""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    profiler.stop()
+    try:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        route_tag = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'root'
+        os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+        path = os.path.join(
+            app.config['PROFILE_DIR'],
+            f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{request.method}-{route_tag}-{g.request_id}"
+        )
+        logger.info('Wrote request profile', extra={'profile_path': profiler.write(path)})
+    except Exception:
+        logger.exception('Failed to write request profile')
 
 # =============================================
 # Database Connection Setup
 # =============================================
-# MongoDB connection
+# Relative weight of each resume field in full-text search
+RESUME_TEXT_WEIGHTS = {
+    'name': 10,
+    'job_title': 5,
+    'current_role': 5,
+    'skills': 5,
+    'current_job': 3,
+    'current_company': 3,
+    'text_content': 1
+}
+
+def create_index_safely(collection, keys, hint=None, **options):
+    """Create one index, logging a failure instead of raising so the remaining indexes are still created"""
+    try:
+        collection.create_index(keys, **options)
+        return True
+    except Exception:
+        logger.exception('Failed to create index', extra={'collection': collection.name, 'index': options.get('name'), 'hint': hint})
+        return False
+
+def drop_index_if_exists(collection, name):
+    """Drop an index superseded by a newer one"""
+    try:
+        if name in collection.index_information():
+            collection.drop_index(name)
+    except Exception:
+        logger.exception('Failed to drop index', extra={'collection': collection.name, 'index': name})
+
+def ensure_indexes():
+    """Create the indexes the application relies on"""
+    # One resume per (user, normalized email); public uploads and empty emails are excluded
+    if create_index_safely(
+        resumes_collection,
+        [('user_id', 1), ('email_normalized', 1)],
+        hint='Merge duplicate resumes with `flask --app app dedupe-resumes`',
+        name='user_email_normalized_unique',
+        unique=True,
+        partialFilterExpression={'user_id': {'$type': 'string'}, 'email_normalized': {'$gt': ''}}
+    ):
+        # The earlier case-sensitive (user_id, email) index only slows writes now
+        drop_index_if_exists(resumes_collection, 'user_email_unique')
+    # Exact and prefix lookups that are not scoped to a user
+    create_index_safely(resumes_collection, [('email_normalized', 1)], name='email_normalized')
+    # Incremental refresh of per-user suggestion indexes
+    create_index_safely(resumes_collection, [('user_id', 1), ('updated_at', 1)], name='user_updated_at')
+    # Facet filters and counts
+    for field in ('location_normalized', 'category_normalized', 'education_level', 'experience_years'):
+        create_index_safely(resumes_collection, [('user_id', 1), (field, 1)], name=f'user_{field}')
+
+    # Weighted full-text index for the 'text' search mode
+    create_index_safely(
+        resumes_collection,
+        [(field, 'text') for field in RESUME_TEXT_WEIGHTS],
+        name='resume_text',
+        weights=RESUME_TEXT_WEIGHTS,
+        default_language='english',
+        language_override='text_language'
+    )
+
+    # Public job pages are looked up by shareable link, which must identify one job
+    if create_index_safely(
+        jobs_collection,
+        [('shareable_link', 1)],
+        hint='Relink duplicate jobs with `flask --app app dedupe-job-links`',
+        name='shareable_link_unique',
+        unique=True,
+        partialFilterExpression={'shareable_link': {'$type': 'string'}}
+    ):
+        drop_index_if_exists(jobs_collection, 'shareable_link')
+    # Applications listed per job
+    create_index_safely(public_applications_collection, [('job_id', 1)], name='job_id')
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters and checkout wait times for this process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()  # Greenlet-local under gevent
+        self.recent_waits = deque(maxlen=1024)
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.open = 0
+            self.checked_out = 0
+            self.max_checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures = {}
+            self.wait_ms_total = 0.0
+            self.wait_ms_max = 0.0
+            self.pool_clears = 0
+            self.recent_waits.clear()
+
+    def _record_wait(self):
+        started = getattr(self.local, 'started', None)
+        self.local.started = None
+        if started is None:
+            return 0.0
+        wait_ms = (time.perf_counter() - started) * 1000
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        self.recent_waits.append(wait_ms)
+        return wait_ms
+
+    def connection_check_out_started(self, event):
+        self.local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        with self.lock:
+            self._record_wait()
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_check_out_failed(self, event):
+        with self.lock:
+            self._record_wait()
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def connection_created(self, event):
+        with self.lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self.lock:
+            self.open = max(self.open - 1, 0)
+
+    def pool_cleared(self, event):
+        with self.lock:
+            self.pool_clears += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self):
+        with self.lock:
+            waits = sorted(self.recent_waits)
+            attempts = self.checkouts + sum(self.checkout_failures.values())
+
+            def percentile(q):
+                return round(waits[min(int(len(waits) * q), len(waits) - 1)], 3) if waits else 0.0
+
+            return {
+                'open_connections': self.open,
+                'checked_out': self.checked_out,
+                'max_checked_out': self.max_checked_out,
+                'checkouts': self.checkouts,
+                'checkout_failures': dict(self.checkout_failures),
+                'pool_clears': self.pool_clears,
+                'wait_ms': {
+                    'avg': round(self.wait_ms_total / attempts, 3) if attempts else 0.0,
+                    'p50': percentile(0.5),
+                    'p95': percentile(0.95),
+                    'max': round(self.wait_ms_max, 3)
+                }
+            }
+
+pool_stats = PoolStats()
+
+MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
 db = None
-try:
-    MONGO_URI = os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-    # Verify connection
-    client.server_info()
-    # print("Successfully connected to MongoDB")  # Comment out debug print
-    db = client['ats_db']
-
-    # Collections
-    users_collection = db['users']
-    jobs_collection = db['jobs']
-    recruiters_collection = db['recruiters']
-    resumes_collection = db['resumes']
-    submissions_collection = db['submissions']
-    public_applications_collection = db['public_applications']
-except Exception as e:
-    # print(f"Failed to connect to MongoDB: {str(e)}")  # Comment out debug print
-    # print("Starting Flask server without MongoDB connection. Some features will be unavailable.")  # Comment out debug print
-    pass
+_db_pid = None
+_indexes_ready = False
+_indexes_lock = threading.Lock()
+
+def init_db():
+    """Create this process's MongoClient and bind the collections.
+
+    PyMongo clients are not fork-safe, so gunicorn calls this again in each
+    worker after fork (see post_fork in gunicorn_config.py). connect=False
+    defers all network I/O to the first query, so the copy made at import time
+    in a preloading master never opens a socket.
+    """
+    global client, db, _db_pid, _indexes_ready
+    global users_collection, jobs_collection, recruiters_collection
+    global resumes_collection, submissions_collection, public_applications_collection
+    global versions_collection
+    try:
+        client = MongoClient(
+            MONGO_URI,
+            connect=False,
+            maxPoolSize=app.config['MONGO_MAX_POOL_SIZE'],
+            minPoolSize=app.config['MONGO_MIN_POOL_SIZE'],
+            maxIdleTimeMS=app.config['MONGO_MAX_IDLE_TIME_MS'] or None,
+            waitQueueTimeoutMS=app.config['MONGO_WAIT_QUEUE_TIMEOUT_MS'] or None,
+            connectTimeoutMS=app.config['MONGO_CONNECT_TIMEOUT_MS'],
+            socketTimeoutMS=app.config['MONGO_SOCKET_TIMEOUT_MS'] or None,  # 0 means no limit
+            serverSelectionTimeoutMS=app.config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+            event_listeners=[pool_stats, MongoCommandMetrics()]
+        )
+        db = client[app.config['MONGO_DB_NAME']]
+
+        # Collections
+        users_collection = db['users']
+        jobs_collection = db['jobs']
+        recruiters_collection = db['recruiters']
+        resumes_collection = db['resumes']
+        submissions_collection = db['submissions']
+        public_applications_collection = db['public_applications']
+        # Write counters per collection, used for ETags
+        versions_collection = db['collection_versions']
+    except Exception:
+        logger.exception('Failed to configure MongoDB client')
+        db = None
+    # Counters inherited from the parent describe its pool, not ours
+    pool_stats.reset()
+    _db_pid = os.getpid()
+    _indexes_ready = False
+
+init_db()
+
+@app.before_request
+def ensure_db_for_process():
+    """Rebuild per-process state in a forked child that skipped post_fork, and create indexes on first request"""
+    global _indexes_ready
+    if _db_pid != os.getpid():
+        with _indexes_lock:
+            if _db_pid != os.getpid():
+                init_db()
+                init_logging()
+    if _indexes_ready or db is None:
+        return
+    with _indexes_lock:
+        if not _indexes_ready:
+            ensure_indexes()
+            _indexes_ready = True
 
 # =============================================
 # AI Model Configuration
 # =============================================
-# Configure Gemini API
 GEMINI_API_KEY = os.getenv('GOOGLE_API_KEY')
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel(
-    'gemini-2.0-flash-exp',
-    generation_config={
-        "temperature": 0.1,
-        "top_p": 0.95,
-        "max_output_tokens": 2048,
-    }
-)
+GEMINI_MODEL_NAME = 'gemini-2.0-flash-exp'
+GEMINI_GENERATION_CONFIG = {
+    "temperature": 0.1,
+    "top_p": 0.95,
+    "max_output_tokens": 2048,
+}
+_gemini_model = None
+_gemini_model_lock = threading.Lock()
+
+def get_gemini_model():
+    """Configure Gemini and build the shared model on first use"""
+    global _gemini_model
+    if _gemini_model is None:
+        with _gemini_model_lock:
+            if _gemini_model is None:
+                import google.generativeai as genai  # Google's Generative AI (Gemini) API
+
+                # The REST transport goes through requests/sockets, which gevent
+                # workers can multiplex; gRPC would block the whole worker per call.
+                genai.configure(api_key=GEMINI_API_KEY, transport=os.getenv('GEMINI_TRANSPORT', 'rest'))
+                _gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME, generation_config=GEMINI_GENERATION_CONFIG)
+    return _gemini_model
+
+def is_timeout_error(error):
+    """Whether an exception from the Gemini client is a timeout or deadline failure"""
+    name = type(error).__name__.lower()
+    return isinstance(error, TimeoutError) or 'timeout' in name or 'deadline' in name
+
+def generate_llm_content(prompt, operation, prompt_version=None, refresh=False, generation_config=None):
+    """Call Gemini, recording latency and outcome under the given operation name
+
+    With a prompt_version, responses are served from and stored in the LLM
+    response cache; refresh skips the lookup (for retries after a bad answer).
+    generation_config is merged over the model's defaults for this call.
+    """
+    key = llm_cache_key(operation, prompt_version, prompt, generation_config) if prompt_version is not None else None
+    if key and not refresh:
+        cached = llm_cache_get(key, operation)
+        if cached is not None:
+            return CachedLLMResponse(cached)
+
+    with STAGE_LATENCY.labels('llm').time():
+        try:
+            if generation_config:
+                response = get_gemini_model().generate_content(prompt, generation_config=generation_config)
+            else:
+                response = get_gemini_model().generate_content(prompt)
+            # .text raises ValueError for blocked or empty responses; that is a failed call
+            text = response.text
+        except Exception as e:
+            LLM_CALLS.labels(operation, 'timeout' if is_timeout_error(e) else 'error').inc()
+            raise
+    LLM_CALLS.labels(operation, 'success').inc()
+    if key:
+        llm_cache_put(key, operation, prompt_version, text)
+    return response
+
+# =============================================
+# LLM Response Cache
+# =============================================
+# Gemini responses keyed by model, generation config, prompt version and a hash
+# of the full prompt, in a SQLite file that every worker on the host shares.
+# Each process and thread opens its own connection; WAL mode lets readers
+# proceed while another worker writes. The cache is best effort: any SQLite
+# error is logged and the call goes to Gemini as if it had missed.
+_llm_cache_local = threading.local()
+_llm_cache_puts = 0
+
+class CachedLLMResponse:
+    """Stands in for a Gemini response served from the cache"""
+
+    def __init__(self, text):
+        self.text = text
+
+def get_llm_cache():
+    """This thread's connection to the cache database, or None when caching is disabled"""
+    path = app.config['LLM_CACHE_PATH']
+    if not path:
+        return None
+    connection = getattr(_llm_cache_local, 'connection', None)
+    if connection is None or _llm_cache_local.pid != os.getpid():
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        # Responses contain candidates' personal details, so only the app's user may
+        # read them; SQLite gives the -wal and -shm files the database file's mode
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(path, 0o600)
+        connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS llm_responses ('
+            'key TEXT PRIMARY KEY, operation TEXT, prompt_version TEXT, response TEXT, '
+            'size INTEGER, created_at REAL, accessed_at REAL)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS llm_responses_accessed_at ON llm_responses (accessed_at)')
+        _llm_cache_local.connection = connection
+        _llm_cache_local.pid = os.getpid()
+    return connection
+
+def llm_cache_key(operation, prompt_version, prompt, generation_config=None):
+    """Digest of everything that determines a response"""
+    config = {**GEMINI_GENERATION_CONFIG, **(generation_config or {})}
+    parts = [GEMINI_MODEL_NAME, json.dumps(config, sort_keys=True), operation, str(prompt_version), prompt]
+    return hashlib.sha256('\x00'.join(parts).encode('utf-8')).hexdigest()
+
+def llm_cache_get(key, operation):
+    """Cached response text for a key, or None"""
+    try:
+        connection = get_llm_cache()
+        if connection is None:
+            return None
+        row = connection.execute('SELECT response, accessed_at FROM llm_responses WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            LLM_CACHE_REQUESTS.labels(operation, 'miss').inc()
+            return None
+        now = time.time()
+        # Recency only needs to be roughly right for LRU; skip most of the writes
+        if now - row[1] > 60:
+            connection.execute('UPDATE llm_responses SET accessed_at = ? WHERE key = ?', (now, key))
+        LLM_CACHE_REQUESTS.labels(operation, 'hit').inc()
+        return row[0]
+    except sqlite3.Error as e:
+        logger.warning('LLM cache lookup failed', extra={'error': str(e)})
+        LLM_CACHE_REQUESTS.labels(operation, 'error').inc()
+        return None
+
+def llm_cache_put(key, operation, prompt_version, text):
+    """Store a response, evicting least recently used ones when the cache is over its size limit"""
+    global _llm_cache_puts
+    try:
+        connection = get_llm_cache()
+        if connection is None:
+            return
+        now = time.time()
+        connection.execute(
+            'INSERT OR REPLACE INTO llm_responses (key, operation, prompt_version, response, size, created_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (key, operation, str(prompt_version), text, len(text.encode('utf-8')), now, now)
+        )
+        _llm_cache_puts += 1
+        if _llm_cache_puts % 100 == 0:
+            evict_llm_cache(connection)
+    except sqlite3.Error as e:
+        logger.warning('LLM cache write failed', extra={'error': str(e)})
+
+def evict_llm_cache(connection):
+    """Delete least recently used responses until the cache is back under 90% of its limit"""
+    limit = app.config['LLM_CACHE_MAX_MB'] * 1024 * 1024
+    total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM llm_responses').fetchone()[0]
+    if total <= limit:
+        return
+    excess = total - int(limit * 0.9)
+    evicted = []
+    for key, size in connection.execute('SELECT key, size FROM llm_responses ORDER BY accessed_at'):
+        evicted.append((key,))
+        excess -= size
+        if excess <= 0:
+            break
+    connection.executemany('DELETE FROM llm_responses WHERE key = ?', evicted)
+    LLM_CACHE_EVICTIONS.inc(len(evicted))
+
+# =============================================
+# Resume Embeddings
+# =============================================
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+def get_embedding_model():
+    """Load the sentence-transformers model once per process"""
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_model_lock:
+            if _embedding_model is None:
+                from sentence_transformers import SentenceTransformer  # Text embedding model (pulls in torch)
+
+                _embedding_model = SentenceTransformer(app.config['EMBEDDING_MODEL'])
+    return _embedding_model
+
+def build_embedding_text(resume):
+    """Text that represents a resume for semantic search; the model only reads the first few hundred tokens"""
+    parts = [
+        resume.get('job_title') or resume.get('current_role') or '',
+        resume.get('skills') or '',
+        resume.get('category') or '',
+        resume.get('education') or '',
+        (resume.get('text_content') or '')[:2000]
+    ]
+    return '\n'.join(part for part in parts if isinstance(part, str) and part.strip())
+
+def embed_resume(resume):
+    """Return a normalized embedding for a resume as a list of floats, or None on failure"""
+    text = build_embedding_text(resume)
+    if not text:
+        return None
+    try:
+        with STAGE_LATENCY.labels('embedding').time():
+            vector = get_embedding_model().encode(text, normalize_embeddings=True)
+        return [float(value) for value in vector]
+    except Exception:
+        logger.exception('Error embedding resume')
+        return None
+
+_embedding_warmup_pid = None  # Process whose background model load has started
+
+def warm_embedding_model():
+    """Start loading the embedding model on a background thread, once per process"""
+    global _embedding_warmup_pid
+    if _embedding_model is not None or _embedding_warmup_pid == os.getpid():
+        return
+    _embedding_warmup_pid = os.getpid()
+
+    def load():
+        global _embedding_warmup_pid
+        try:
+            get_embedding_model()
+        except Exception:
+            logger.exception('Failed to load the embedding model')
+            _embedding_warmup_pid = None
+
+    threading.Thread(target=load, name='embedding-warmup', daemon=True).start()
+
+_embedding_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='embedding-index')
+
+class EmbeddingIndex(UserResumeIndex):
+    """One user's stored resume embeddings as a float32 matrix for brute-force cosine search"""
+
+    QUERY = {'embedding': {'$type': 'array'}}
+    PROJECTION = {'embedding': 1, 'updated_at': 1}
+    EXECUTOR = _embedding_executor
+    POOL = 'embedding'
+    REFRESH_KEY = 'EMBEDDING_REFRESH_SECONDS'
+    REBUILD_KEY = 'EMBEDDING_REBUILD_SECONDS'
+
+    def __init__(self):
+        super().__init__()
+        self.ids = []  # Row -> resume ID, None once the resume is deleted
+        self.rows = {}  # Resume ID -> row
+        self.matrix = None
+
+    def apply(self, resumes):
+        """Overwrite the rows of known resumes in place and append new ones as one block"""
+        import numpy as np
+
+        added = {}
+        for resume in resumes:
+            self.track(resume)
+            if 'embedding' not in resume:
+                continue
+            vector = resume['embedding']
+            row = self.rows.get(resume['_id'])
+            if not isinstance(vector, list) or not vector:
+                self.discard(resume['_id'])
+            elif row is not None:
+                self.matrix[row] = vector
+            else:
+                added[resume['_id']] = vector
+        if added:
+            # Searches in flight keep the old ids and matrix, so appends build new ones
+            block = np.asarray(list(added.values()), dtype=np.float32)
+            self.matrix = block if self.matrix is None else np.vstack([self.matrix, block])
+            self.rows.update((resume_id, len(self.ids) + offset) for offset, resume_id in enumerate(added))
+            self.ids = self.ids + list(added)
+
+    def discard(self, resume_id):
+        """Blank a deleted resume's row; the next rebuild compacts it away"""
+        row = self.rows.pop(resume_id, None)
+        if row is not None:
+            self.matrix[row] = 0
+            self.ids[row] = None
+
+    def swap(self, fresh):
+        """Take over a freshly built index's structures"""
+        self.ids, self.rows, self.matrix = fresh.ids, fresh.rows, fresh.matrix
+
+    def search(self, query_vector, limit):
+        """Return up to limit (resume ID, cosine similarity) pairs, best first"""
+        import numpy as np
+
+        with self.lock:
+            ids, matrix = self.ids, self.matrix
+        if matrix is None:
+            return []
+        similarities = matrix @ np.asarray(query_vector, dtype=np.float32)
+        results = []
+        for row in np.argsort(-similarities):
+            if ids[row] is not None:
+                results.append((ids[row], float(similarities[row])))
+                if len(results) == limit:
+                    break
+        return results
+
+_embedding_indexes = TTLCache('EMBEDDING_INDEX_MAX_TENANTS')
+
+def get_embedding_index(user_id):
+    """Return the user's embedding index, building it on first use and refreshing it in the background when stale"""
+    return get_user_index(_embedding_indexes, EmbeddingIndex, user_id)
 
 # =============================================
 # Utility Functions
 # =============================================
 def extract_text_from_pdf(pdf_file):
     """Extract text from PDF file"""
+    from PyPDF2 import PdfReader  # PDF file reading
+
     try:
         pdf_reader = PdfReader(io.BytesIO(pdf_file.read()))
         pdf_file.seek(0)  # Reset file pointer
@@ -114,6 +1315,8 @@ def extract_text_from_pdf(pdf_file):
 
 def extract_text_from_docx(docx_file):
     """Extract text from DOCX file"""
+    import docx2txt  # DOCX file text extraction
+
     try:
         text = docx2txt.process(io.BytesIO(docx_file.read()))
         docx_file.seek(0)  # Reset file pointer
@@ -121,6 +1324,7 @@ def extract_text_from_docx(docx_file):
     except Exception as e:
         raise Exception(f"Error extracting text from DOCX: {str(e)}")
 
+@STAGE_LATENCY.labels('text_extraction').time()
 def extract_text_from_file(file):
     """Extract text from PDF or DOCX files with max length limit"""
     try:
@@ -132,8 +1336,8 @@ def extract_text_from_file(file):
         else:
             raise ValueError("Unsupported file format. Please upload PDF or DOCX files only.")
         
-        # Limit text length to 8000 characters
-        max_text_length = 8000
+        # Only bounds document size; extract_resume_info compacts what it sends to Gemini
+        max_text_length = app.config['RESUME_TEXT_MAX_CHARS']
         if len(text) > max_text_length:
             text = text[:max_text_length] + "... [text truncated]"
             
@@ -141,6 +1345,255 @@ def extract_text_from_file(file):
     except Exception as e:
         raise Exception(f"Error extracting text from file: {str(e)}")
 
+# =============================================
+# Resume Text Compaction
+# =============================================
+# Extracted PDF text repeats headers and footers on every page and is full of
+# page numbers and whitespace runs. Before extraction the text is cleaned up,
+# split into sections, and the sections that matter most for the extracted
+# fields are kept first until the token budget is spent.
+CHARS_PER_TOKEN = 4  # Rough average for English resume text
+LOW_PRIORITY_SECTION = 5  # Sections from this priority on only get budget the others leave
+
+RESUME_SECTIONS = [
+    # (section, priority, heading keywords); lower priorities are kept first
+    ('contact', 0, ['contact', 'contact information', 'contact details']),
+    ('skills', 1, ['skills', 'technical skills', 'core competencies', 'competencies', 'technologies', 'tools', 'expertise', 'skill set', 'technical proficiencies']),
+    ('experience', 2, ['experience', 'work experience', 'professional experience', 'employment', 'employment history', 'work history', 'career history']),
+    ('summary', 3, ['summary', 'professional summary', 'profile', 'professional profile', 'objective', 'career objective', 'about me']),
+    ('education', 3, ['education', 'academic background', 'qualifications', 'academic qualifications']),
+    ('certifications', 4, ['certifications', 'certificates', 'licenses', 'training']),
+    ('projects', 5, ['projects', 'key projects', 'personal projects']),
+    ('other', 6, ['awards', 'achievements', 'publications', 'languages', 'volunteer', 'volunteering', 'activities']),
+    ('extras', 7, ['interests', 'hobbies', 'references', 'declaration', 'personal details'])
+]
+RESUME_HEADINGS = {keyword: (section, priority) for section, priority, keywords in RESUME_SECTIONS for keyword in keywords}
+# The whole line must be the page number, so "Managed page 3 of the site" is kept
+PAGE_NUMBER_PATTERN = re.compile(r'^\s*(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?\s*$', re.IGNORECASE)
+CONTACT_PATTERN = re.compile(
+    r'[\w.+-]+@[\w-]+\.[\w.-]+|linkedin\.com/\S+|\+\d[\d\s().-]{8,}\d|\(?\b\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b'
+)
+
+RUNNING_LINE_MIN_REPEATS = 3  # A line seen this often is a running header or footer wherever it appears
+
+def is_page_number(line):
+    """Whether a whitespace-collapsed line is a page number or a "Page 2 of 3" footer"""
+    return bool(PAGE_NUMBER_PATTERN.match(line))
+
+def find_running_lines(lines):
+    """Lowercased lines that repeat like running headers or footers: at least
+    RUNNING_LINE_MIN_REPEATS times, or more than once and always next to a page number"""
+    page_breaks = [position for position, line in enumerate(lines) if is_page_number(line)]
+    occurrences = {}
+    for position, line in enumerate(lines):
+        if len(line) >= 4 and not is_page_number(line):
+            occurrences.setdefault(line.lower(), []).append(position)
+    running = set()
+    for key, positions in occurrences.items():
+        if len(positions) >= RUNNING_LINE_MIN_REPEATS:
+            running.add(key)
+        elif len(positions) > 1 and all(any(abs(position - page_break) <= 3 for page_break in page_breaks) for position in positions):
+            running.add(key)
+    return running
+
+def normalize_resume_lines(text, drop_running=False):
+    """Clean lines: collapse whitespace and drop page numbers and, if asked, repeats of running headers and footers"""
+    text = text.replace('\xa0', ' ').replace('\u2022', '-').replace('\uf0b7', '-')
+    lines = [re.sub(r'\s+', ' ', line).strip() for line in text.splitlines()]
+    running = find_running_lines(lines) if drop_running else set()
+
+    # Other repeated lines, such as a "Responsibilities" label under each job, are kept
+    cleaned = []
+    seen = set()
+    for line in lines:
+        if is_page_number(line):
+            continue
+        key = line.lower()
+        if key in running:
+            if key in seen:
+                continue
+            seen.add(key)
+        if line or (cleaned and cleaned[-1]):
+            cleaned.append(line)
+    return cleaned
+
+def heading_for(line):
+    """(section, priority) if the line is a section heading, else None"""
+    if not line or len(line) > 40:
+        return None
+    return RESUME_HEADINGS.get(line.lower().strip(' :-|').strip())
+
+def compact_resume_text(text, token_budget):
+    """Resume text reduced to a token budget, keeping contact details, skills and experience first"""
+    budget = token_budget * CHARS_PER_TOKEN
+    compacted = '\n'.join(normalize_resume_lines(text or '')).strip()
+    if len(compacted) <= budget:
+        return compacted
+
+    lines = normalize_resume_lines(text, drop_running=True)
+    compacted = '\n'.join(lines).strip()
+    if len(compacted) <= budget:
+        return compacted
+
+    # Split into sections; text before the first heading is the header (name, contact details)
+    sections = [{'priority': 0, 'lines': []}]
+    for line in lines:
+        heading = heading_for(line)
+        if heading:
+            sections.append({'priority': heading[1], 'lines': [line]})
+        else:
+            sections[-1]['lines'].append(line)
+
+    # Contact details found further down move up into the header
+    contacts = []
+    for section in sections[1:]:
+        contacts += [line for line in section['lines'] if CONTACT_PATTERN.search(line)]
+        section['lines'] = [line for line in section['lines'] if not CONTACT_PATTERN.search(line)]
+    sections[0]['lines'] = contacts + sections[0]['lines']
+
+    # Sections go in priority order. The first pass only admits sections below
+    # LOW_PRIORITY_SECTION, and none but the header may take more than half the
+    # budget, so a long experience section cannot crowd out education. The
+    # second pass hands out whatever is left, so the overflow of important
+    # sections is kept before projects, awards or hobbies get anything.
+    remaining = budget
+    kept = {index: [] for index in range(len(sections))}
+    positions = [0] * len(sections)
+    order = sorted(range(len(sections)), key=lambda i: sections[i]['priority'])
+    for cap, max_priority in ((budget // 2, LOW_PRIORITY_SECTION - 1), (budget, None)):
+        for index in order:
+            if max_priority is not None and sections[index]['priority'] > max_priority:
+                break
+            allowance = min(remaining, budget if index == 0 else cap)
+            section_lines = sections[index]['lines']
+            while positions[index] < len(section_lines) and allowance > 0:
+                line = section_lines[positions[index]]
+                if len(line) + 1 > allowance:
+                    if allowance > 80 and allowance == remaining:
+                        kept[index].append(line[:allowance - 1])
+                        remaining = 0
+                    break
+                kept[index].append(line)
+                positions[index] += 1
+                allowance -= len(line) + 1
+                remaining -= len(line) + 1
+
+    # Reassemble in document order so the model sees a normal-looking resume
+    return '\n'.join(line for index in sorted(kept) for line in kept[index]).strip()
+
+# JSON mode with a response schema makes Gemini return a bare, well-formed
+# object instead of fenced or prose-wrapped JSON
+RESUME_RESPONSE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        **{field: {'type': 'string'} for field in [
+            'name', 'email', 'phone_number', 'location', 'current_role', 'current_company', 'total_experience',
+            'education', 'skills', 'linkedin', 'category', 'professional_summary_resume'
+        ]},
+        'experience_details': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {field: {'type': 'string'} for field in ['title', 'company', 'duration', 'responsibilities']}
+            }
+        }
+    },
+    'required': ['name', 'email', 'skills']
+}
+RESUME_GENERATION_CONFIG = {'response_mime_type': 'application/json', 'response_schema': RESUME_RESPONSE_SCHEMA}
+
+def parse_llm_json(text):
+    """Parse the JSON object in an LLM response, tolerating code fences, surrounding prose and truncation"""
+    text = re.sub(r'```(?:json)?', '', text).strip()
+    start = text.find('{')
+    if start == -1:
+        raise json.JSONDecodeError('No JSON object in response', text, 0)
+    text = text[start:]
+    try:
+        # raw_decode stops at the end of the object, ignoring any trailing prose
+        return json.JSONDecoder().raw_decode(text)[0]
+    except json.JSONDecodeError:
+        pass
+    try:
+        result = repair_truncated_json(text)
+    except json.JSONDecodeError:
+        LLM_JSON_REPAIRS.labels('failed').inc()
+        raise
+    LLM_JSON_REPAIRS.labels('recovered').inc()
+    return result
+
+def repair_truncated_json(text):
+    """Recover the longest parseable prefix of a cut-off JSON object by closing whatever it left open"""
+    stack = []
+    cuts = []  # (position, closers) where the text can be cut and closed
+    in_string = escaped = False
+    for position, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+            cuts.append((position + 1, ''.join(reversed(stack))))
+        elif char in '}]':
+            if stack:
+                stack.pop()
+            cuts.append((position + 1, ''.join(reversed(stack))))
+        elif char == ',':
+            cuts.append((position, ''.join(reversed(stack))))
+
+    closers = ''.join(reversed(stack))
+    if in_string:
+        # Keep a partially generated string value, minus a dangling escape
+        candidates = [(text[:-1] if escaped else text) + '"' + closers]
+    else:
+        candidates = [text.rstrip().rstrip(',') + closers]
+    # Otherwise back off to the last complete element
+    candidates += [text[:position] + closers for position, closers in reversed(cuts)]
+    for candidate in candidates:
+        try:
+            result = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(result, dict):
+            return result
+    raise json.JSONDecodeError('Could not repair JSON response', text, len(text))
+
+# Bump whenever the extraction prompt or the fields it returns change, so
+# reprocess-resumes re-extracts resumes processed under the old prompt
+RESUME_PROMPT_VERSION = 3
+
+def extraction_stamp(text):
+    """Record which text and prompt version a resume's extracted fields came from"""
+    return {
+        'text_hash': hashlib.sha256(text.encode('utf-8')).hexdigest(),
+        'prompt_version': RESUME_PROMPT_VERSION
+    }
+
+def resume_fields_from_extraction(resume_info):
+    """Map extract_resume_info output onto stored resume fields"""
+    return {
+        'name': resume_info.get('name', ''),
+        'email': resume_info.get('email', ''),
+        'email_normalized': normalize_email(resume_info.get('email')),
+        'phone_number': resume_info.get('phone_number', ''),
+        'job_title': resume_info.get('current_role', ''),
+        'current_job': resume_info.get('current_company', ''),
+        'skills': resume_info.get('skills', ''),
+        'location': resume_info.get('location', ''),
+        'linkedin': resume_info.get('linkedin', ''),
+        'education': resume_info.get('education', ''),
+        'resume_summary': resume_info.get('professional_summary_resume', ''),
+        'experience': resume_info.get('experience_details', []),
+        'category': resume_info.get('category', ''),
+        'total_experience': resume_info.get('total_experience', '')
+    }
+
 def extract_resume_info(text):
     """Extract resume information using Gemini AI with enhanced extraction"""
     try:
@@ -148,13 +1601,11 @@ def extract_resume_info(text):
         max_retries = 2
         base_delay = 2
         retry_count = 0
-        max_text_length = 8000
         resume_info = None
         valid_email = False
 
-        # Truncate text if it exceeds max_text_length
-        if len(text) > max_text_length:
-            text = text[:max_text_length] + "... [text truncated]"
+        # Fit the most useful parts of the resume into the prompt budget
+        text = compact_resume_text(text, app.config['LLM_RESUME_TOKEN_BUDGET'])
 
         # Generate detailed extraction prompt
         prompt = """Extract the following information from the resume text in JSON format:
@@ -168,6 +1619,9 @@ def extract_resume_info(text):
             "total_experience": "Total years of experience (number)",
             "education": "Highest education qualification with major/specialization",
             "skills": "List all technical and professional skills (comma-separated)",
+            "linkedin": "LinkedIn profile URL if present",
+            "category": "Job category, e.g. Software Engineering, Data Science, DevOps, QA",
+            "professional_summary_resume": "Two or three sentence professional summary",
             "experience_details": [
                 {
                     "title": "Job title",
@@ -194,15 +1648,16 @@ def extract_resume_info(text):
         while retry_count < max_retries and not valid_email:
             try:
                 if retry_count > 0:
+                    LLM_RETRIES.labels('extract_resume_info').inc()
                     time.sleep(base_delay * (2 ** (retry_count - 1)))
 
                 # Generate response using Gemini
-                response = model.generate_content(prompt)
-                response_text = response.text.strip()
-                
-                # Clean and parse the response
-                response_text = response_text.replace('```json', '').replace('```', '').strip()
-                result = json.loads(response_text)
+                # Retries follow an unusable answer, so they must not be served that answer again
+                response = generate_llm_content(
+                    prompt, 'extract_resume_info', RESUME_PROMPT_VERSION,
+                    refresh=retry_count > 0, generation_config=RESUME_GENERATION_CONFIG
+                )
+                result = parse_llm_json(response.text)
                 
                 # Validate essential fields
                 if not result.get('email') or not is_valid_email(result.get('email', '')):
@@ -224,10 +1679,10 @@ def extract_resume_info(text):
                 return result
                 
             except json.JSONDecodeError as e:
-                print(f"JSON parsing error (attempt {retry_count + 1}): {str(e)}")
+                logger.warning('Could not parse extraction response', extra={'attempt': retry_count + 1, 'error': str(e)})
                 retry_count += 1
             except Exception as e:
-                print(f"Extraction error (attempt {retry_count + 1}): {str(e)}")
+                logger.warning('Extraction attempt failed', extra={'attempt': retry_count + 1, 'error': str(e)})
                 retry_count += 1
         
         # If all retries failed, return default structure
@@ -241,11 +1696,14 @@ def extract_resume_info(text):
             "total_experience": "",
             "education": "",
             "skills": "",
+            "linkedin": "",
+            "category": "",
+            "professional_summary_resume": "",
             "experience_details": []
         }
 
-    except Exception as e:
-        print(f"Fatal error in extract_resume_info: {str(e)}")
+    except Exception:
+        logger.exception('Fatal error in extract_resume_info')
         return {
             "name": "",
             "email": "",
@@ -256,6 +1714,9 @@ def extract_resume_info(text):
             "total_experience": "",
             "education": "",
             "skills": "",
+            "linkedin": "",
+            "category": "",
+            "professional_summary_resume": "",
             "experience_details": []
         }
 
@@ -272,25 +1733,497 @@ def validate_password(password):
         return False, "Password must contain at least one special character"
     return True, "Password is valid"
 
+# =============================================
+# Authenticated User Cache
+# =============================================
+# Per-process LRU of user documents keyed by user_id. A user's token_version is
+# cached separately for only a few seconds, so a revocation (see revoke_tokens)
+# made through any worker is honoured by every worker almost immediately.
+_user_cache = TTLCache('USER_CACHE_MAX_SIZE', 'USER_CACHE_TTL')
+_token_versions = TTLCache('USER_CACHE_MAX_SIZE', 'TOKEN_VERSION_CACHE_TTL')
+
+def get_token_version(user_id):
+    """Current token_version of a user, or None if the user no longer exists"""
+    version = _token_versions.get(user_id)
+    if version is None:
+        user = users_collection.find_one({'_id': ObjectId(user_id)}, {'token_version': 1})
+        if not user:
+            return None
+        version = user.get('token_version', 0)
+        _token_versions.set(user_id, version)
+    return version
+
+def get_cached_user(user_id, token_version=0):
+    """Resolve a user by ID through the TTL/LRU cache, returning None if missing or revoked"""
+    # Tokens issued before the last revocation carry an older version
+    current_version = get_token_version(user_id)
+    if current_version is None or current_version != token_version:
+        return None
+
+    user = _user_cache.get(user_id)
+    if user is None or user.get('token_version', 0) != current_version:
+        user = users_collection.find_one({'_id': ObjectId(user_id)}, {'password': 0})
+        if not user:
+            invalidate_cached_user(user_id)
+            return None
+        _user_cache.set(user_id, user)
+    return user
+
+def invalidate_cached_user(user_id):
+    """Drop a user from the caches so the next request reloads it"""
+    _user_cache.pop(user_id)
+    _token_versions.pop(user_id)
+
+def get_token_from_request():
+    """Return the bearer token from the Authorization header, if any"""
+    auth_header = request.headers.get('Authorization', '')
+    parts = auth_header.split(" ")
+    return parts[1] if len(parts) > 1 else None
+
 def token_required(f):
+    """Require a valid JWT and pass the (cached) user document to the handler"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            token = request.headers['Authorization'].split(" ")[1]
+        token = get_token_from_request()
         
         if not token:
             return jsonify({'message': 'Token is missing'}), 401
         
         try:
             data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = users_collection.find_one({'_id': ObjectId(data['user_id'])})
+            current_user = get_cached_user(data['user_id'], data.get('token_version', 0))
         except:
             return jsonify({'message': 'Token is invalid'}), 401
+
+        if not current_user:
+            return jsonify({'message': 'Token is invalid'}), 401
         
         return f(current_user, *args, **kwargs)
     return decorated
 
+def token_claims_required(f):
+    """Require a valid, unrevoked JWT and pass a user built from its claims instead of the full user document.
+
+    For read-only handlers that need nothing beyond the user's ID, username and
+    email; only the user's token_version is looked up, through a short-lived cache.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = get_token_from_request()
+
+        if not token:
+            return jsonify({'message': 'Token is missing'}), 401
+
+        try:
+            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+            token_version = get_token_version(data['user_id'])
+            current_user = {
+                '_id': ObjectId(data['user_id']),
+                'username': data.get('username'),
+                'email': data.get('email')
+            }
+        except:
+            return jsonify({'message': 'Token is invalid'}), 401
+
+        if token_version is None or token_version != data.get('token_version', 0):
+            return jsonify({'message': 'Token is invalid'}), 401
+
+        return f(current_user, *args, **kwargs)
+    return decorated
+
+# =============================================
+# Conditional GET and Compression
+# =============================================
+# Every write bumps a shared counter for the collections it touched. List
+# responses carry an ETag derived from those counters, so a client revalidating
+# an unchanged list gets a 304 after one small query instead of the payload.
+def bump_version(*names):
+    """Record that the named collections changed, invalidating ETags built from them"""
+    for name in names:
+        try:
+            versions_collection.update_one({'_id': name}, {'$inc': {'version': 1}}, upsert=True)
+        except Exception:
+            logger.exception('Failed to bump collection version', extra={'collection': name})
+
+def compute_etag(current_user, names):
+    """Strong ETag for this request's URL and user at the current collection versions"""
+    versions = {doc['_id']: doc['version'] for doc in versions_collection.find({'_id': {'$in': list(names)}})}
+    key = '|'.join([request.full_path, str(current_user['_id'])] + [f"{name}:{versions.get(name, 0)}" for name in names])
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def conditional_get(*names):
+    """Answer 304 without running the view when the client's ETag is still current"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            try:
+                etag = compute_etag(current_user, names)
+            except Exception:
+                return f(current_user, *args, **kwargs)
+
+            # Compressed variants carry an encoding suffix (see compress_response)
+            for candidate in (etag, f'{etag}-br', f'{etag}-gzip'):
+                if request.if_none_match.contains(candidate):
+                    response = make_response('', 304)
+                    response.set_etag(candidate)
+                    response.cache_control.private = True
+                    response.cache_control.no_cache = True
+                    response.vary.add('Accept-Encoding')
+                    return response
+
+            response = make_response(f(current_user, *args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+            return response
+        return decorated
+    return decorator
+
+@app.after_request
+def compress_response(response):
+    """Brotli- or gzip-encode large JSON responses the client accepts"""
+    if (response.status_code != 200 or response.direct_passthrough
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    if brotli is not None and request.accept_encodings['br']:
+        encoding = 'br'
+        data = brotli.compress(data, quality=app.config['COMPRESS_BROTLI_QUALITY'])
+    elif request.accept_encodings['gzip']:
+        encoding = 'gzip'
+        data = gzip.compress(data, compresslevel=app.config['COMPRESS_GZIP_LEVEL'])
+    else:
+        return response
+
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    # A strong ETag must differ between encodings of the same resource
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak=weak)
+    return response
+
+# =============================================
+# Admission Control
+# =============================================
+# The public resume endpoints run PDF parsing and Gemini calls for anonymous
+# clients. Per-IP and per-worker token buckets cap the request rate, and a fixed
+# number of slots shared by every worker on the host caps how many run at once,
+# so a burst of applicants cannot occupy every worker. Everything beyond that
+# gets a 429. Slots are flock()ed lock files, so a worker that dies frees its
+# slot. Waiting for a slot only makes sense in gevent workers; a sync worker
+# would be held by the waiting request, so gunicorn_config.py sets the queue
+# depth to 0 there.
+class TokenBucket:
+    """Refill `rate` tokens per second up to `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Consume a token, returning 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else app.config['ADMISSION_QUEUE_TIMEOUT']
+
+    def refund(self):
+        """Give back a token taken by a request that was not served"""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+_admission_lock = threading.Lock()
+_ip_buckets = OrderedDict()
+_global_bucket = TokenBucket(app.config['ADMISSION_GLOBAL_PER_MINUTE'] / 60, app.config['ADMISSION_GLOBAL_BURST'])
+_admission_waiting = 0
+_slot_files = {}  # Slot number -> this process's open lock file
+_slot_files_pid = None
+_held_slots = set()  # Slots held by requests in this process; flock() alone cannot tell them apart
+
+def too_many_requests(retry_after):
+    """429 response telling the client when to retry"""
+    response = jsonify({'error': 'Too many requests. Please try again later.'})
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response, 429
+
+def check_rate_limits(client_ip):
+    """Take a token from the client's bucket and the global bucket, returning seconds to wait or 0"""
+    with _admission_lock:
+        bucket = _ip_buckets.get(client_ip)
+        if bucket is None:
+            bucket = TokenBucket(app.config['ADMISSION_IP_PER_MINUTE'] / 60, app.config['ADMISSION_IP_BURST'])
+            _ip_buckets[client_ip] = bucket
+            while len(_ip_buckets) > app.config['ADMISSION_MAX_TRACKED_IPS']:
+                _ip_buckets.popitem(last=False)
+        _ip_buckets.move_to_end(client_ip)
+
+        # Check the client first so one noisy IP does not drain the global bucket
+        retry_after = bucket.take()
+        if retry_after:
+            return retry_after
+        retry_after = _global_bucket.take()
+        if retry_after:
+            bucket.refund()
+        return retry_after
+
+def refund_rate_limits(client_ip):
+    """Return the tokens of a request that was admitted by the rate limits but never ran"""
+    with _admission_lock:
+        bucket = _ip_buckets.get(client_ip)
+        if bucket is not None:
+            bucket.refund()
+        _global_bucket.refund()
+
+def slot_file(slot):
+    """This process's open lock file for a slot"""
+    handle = _slot_files.get(slot)
+    if handle is None:
+        os.makedirs(app.config['ADMISSION_SLOT_DIR'], exist_ok=True)
+        handle = open(os.path.join(app.config['ADMISSION_SLOT_DIR'], f'slot-{slot}.lock'), 'a')
+        _slot_files[slot] = handle
+    return handle
+
+def try_acquire_slot():
+    """Claim a free host-wide slot, returning its number or None"""
+    global _slot_files_pid
+    with _admission_lock:
+        if _slot_files_pid != os.getpid():
+            # Lock files inherited over fork share their locks with the parent
+            _slot_files.clear()
+            _held_slots.clear()
+            _slot_files_pid = os.getpid()
+        for slot in range(app.config['ADMISSION_MAX_CONCURRENT']):
+            if slot in _held_slots:
+                continue
+            if fcntl is not None:
+                try:
+                    fcntl.flock(slot_file(slot), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+            _held_slots.add(slot)
+            return slot
+    return None
+
+def release_slot(slot):
+    """Free a slot taken by try_acquire_slot"""
+    with _admission_lock:
+        if fcntl is not None:
+            fcntl.flock(slot_file(slot), fcntl.LOCK_UN)
+        _held_slots.discard(slot)
+
+def acquire_slot(timeout):
+    """Wait up to timeout seconds for a slot; other processes cannot wake us, so poll"""
+    deadline = time.monotonic() + timeout
+    while True:
+        slot = try_acquire_slot()
+        if slot is not None or time.monotonic() >= deadline:
+            return slot
+        time.sleep(0.05)
+
+def admission_control(f):
+    """Rate-limit and bound the concurrency of an expensive public endpoint"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        global _admission_waiting
+        if request.method == 'OPTIONS':
+            return f(*args, **kwargs)
+
+        client_ip = request.remote_addr or 'unknown'
+        retry_after = check_rate_limits(client_ip)
+        if retry_after:
+            ADMISSION_REJECTIONS.labels('rate_limited').inc()
+            return too_many_requests(retry_after)
+
+        slot = try_acquire_slot()
+        if slot is None:
+            with _admission_lock:
+                queue_full = _admission_waiting >= app.config['ADMISSION_QUEUE_DEPTH']
+                if not queue_full:
+                    _admission_waiting += 1
+            if queue_full:
+                refund_rate_limits(client_ip)
+                ADMISSION_REJECTIONS.labels('queue_full').inc()
+                return too_many_requests(app.config['ADMISSION_QUEUE_TIMEOUT'])
+            try:
+                slot = acquire_slot(app.config['ADMISSION_QUEUE_TIMEOUT'])
+            finally:
+                with _admission_lock:
+                    _admission_waiting -= 1
+            if slot is None:
+                refund_rate_limits(client_ip)
+                ADMISSION_REJECTIONS.labels('queue_timeout').inc()
+                return too_many_requests(app.config['ADMISSION_QUEUE_TIMEOUT'])
+
+        try:
+            return f(*args, **kwargs)
+        finally:
+            release_slot(slot)
+    return decorated
+
+# =============================================
+# Bulk Write Helpers
+# =============================================
+def strip_ids(data):
+    """Return update data without the immutable _id / id fields"""
+    return {key: value for key, value in data.items() if key not in ('_id', 'id')}
+
+# Fields a client may echo back from a GET; they are never written, so they are
+# dropped rather than rejected
+READ_ONLY_FIELDS = ['_id', 'id', 'user_id', 'created_at', 'updated_at']
+
+def editable_update(data, fields, read_only=()):
+    """Return (update, error) for update data that may only touch the given fields"""
+    update = {key: value for key, value in data.items() if key not in READ_ONLY_FIELDS and key not in read_only}
+    unknown = sorted(set(update) - set(fields))
+    if unknown:
+        return None, f"Fields cannot be updated: {', '.join(unknown)}"
+    if not update:
+        return None, 'No data provided'
+    return update, None
+
+def build_item(build, data):
+    """Run a create/update builder on one bulk item, turning malformed values into that item's error"""
+    try:
+        return build(data)
+    except (TypeError, ValueError, AttributeError) as e:
+        return None, f'Invalid data: {e}'
+
+def parse_bulk_request():
+    """Read the operations list and ordered flag from a bulk request, returning (operations, ordered, error)"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('operations'), list):
+        return None, None, 'A list of operations is required'
+    operations = data['operations']
+    if not operations:
+        return None, None, 'No operations provided'
+    if len(operations) > app.config['MAX_BULK_OPERATIONS']:
+        return None, None, f"Too many operations. Maximum is {app.config['MAX_BULK_OPERATIONS']} per request"
+    return operations, bool(data.get('ordered', True)), None
+
+def run_bulk_write(collection, user_id, operations, ordered, build_create, build_update, check_deletes=None):
+    """Validate create/update/delete operations and apply them with a single bulk_write.
+
+    Each operation is {'op': 'create'|'update'|'delete', 'id': ..., 'data': {...}}.
+    Updates and deletes only reach documents owned by user_id; other IDs are
+    reported as not found. Ordered requests stop at the first failing item,
+    leaving the rest 'skipped'; unordered requests apply every valid item.
+    Returns a per-item report and totals.
+    """
+    results = [None] * len(operations)
+
+    # Resolve which referenced documents exist with one query
+    target_ids = []
+    for item in operations:
+        if isinstance(item, dict) and item.get('op') in ('update', 'delete') and ObjectId.is_valid(str(item.get('id'))):
+            target_ids.append(ObjectId(item['id']))
+    existing_ids = set()
+    if target_ids:
+        existing_ids = {doc['_id'] for doc in collection.find({'_id': {'$in': target_ids}, 'user_id': user_id}, {'_id': 1})}
+    delete_errors = {}
+    if check_deletes:
+        delete_ids = [ObjectId(item['id']) for item in operations
+                      if isinstance(item, dict) and item.get('op') == 'delete' and ObjectId.is_valid(str(item.get('id')))]
+        if delete_ids:
+            delete_errors = check_deletes(delete_ids)
+
+    write_requests = []
+    request_indexes = []
+    deleted_ids = set()  # Deleted earlier in this batch
+    for index, item in enumerate(operations):
+        op = item.get('op') if isinstance(item, dict) else None
+        data = (item.get('data') or {}) if isinstance(item, dict) else {}
+        error = None
+        if op in ('create', 'update') and not isinstance(data, dict):
+            error = 'Data must be an object'
+        elif op == 'create':
+            doc, error = build_item(build_create, data)
+            if not error:
+                doc['_id'] = ObjectId()
+                write_requests.append(InsertOne(doc))
+                request_indexes.append(index)
+                results[index] = {'index': index, 'op': op, 'id': doc['_id']}
+        elif op in ('update', 'delete'):
+            if not ObjectId.is_valid(str(item.get('id'))):
+                error = 'Invalid id'
+            elif ObjectId(item['id']) not in existing_ids:
+                error = 'Document not found'
+            elif ObjectId(item['id']) in deleted_ids:
+                error = 'Document is deleted earlier in this batch'
+            elif op == 'update':
+                update, error = build_item(build_update, data) if strip_ids(data) else (None, 'No data provided')
+                if not error:
+                    write_requests.append(UpdateOne({'_id': ObjectId(item['id']), 'user_id': user_id}, {'$set': update}))
+                    request_indexes.append(index)
+                    results[index] = {'index': index, 'op': op, 'id': ObjectId(item['id'])}
+            elif ObjectId(item['id']) in delete_errors:
+                error = delete_errors[ObjectId(item['id'])]
+            else:
+                write_requests.append(DeleteOne({'_id': ObjectId(item['id']), 'user_id': user_id}))
+                request_indexes.append(index)
+                deleted_ids.add(ObjectId(item['id']))
+                results[index] = {'index': index, 'op': op, 'id': ObjectId(item['id'])}
+        else:
+            error = 'Invalid operation. Must be one of create, update or delete'
+
+        if error:
+            results[index] = {'index': index, 'op': op, 'status': 'error', 'error': error}
+            if ordered:
+                break
+
+    totals = {'inserted': 0, 'modified': 0, 'deleted': 0}
+    if write_requests:
+        try:
+            bulk_result = collection.bulk_write(write_requests, ordered=ordered)
+            details = bulk_result.bulk_api_result
+            failed_requests = {}
+        except BulkWriteError as e:
+            details = e.details
+            failed_requests = {err['index']: err.get('errmsg', 'Write failed') for err in details.get('writeErrors', [])}
+
+        totals = {
+            'inserted': details.get('nInserted', 0),
+            'modified': details.get('nModified', 0),
+            'deleted': details.get('nRemoved', 0)
+        }
+        first_failure = min(failed_requests) if failed_requests else None
+        for request_index, index in enumerate(request_indexes):
+            if request_index in failed_requests:
+                results[index].update({'status': 'error', 'error': failed_requests[request_index]})
+            elif ordered and first_failure is not None and request_index > first_failure:
+                results[index].update({'status': 'skipped'})
+            else:
+                results[index]['status'] = 'success'
+
+        if any(totals.values()):
+            bump_version(collection.name)
+
+    for index, result in enumerate(results):
+        if result is None:
+            op = operations[index].get('op') if isinstance(operations[index], dict) else None
+            results[index] = {'index': index, 'op': op, 'status': 'skipped'}
+
+    successful = len([r for r in results if r['status'] == 'success'])
+    failed = len([r for r in results if r['status'] == 'error'])
+    return {
+        'ordered': ordered,
+        'total': len(operations),
+        'successful': successful,
+        'failed': failed,
+        'skipped': len(operations) - successful - failed,
+        **totals,
+        'results': results
+    }
+
 # =============================================
 # Health Check Route
 # =============================================
@@ -299,6 +2232,30 @@ def health_check():
     """Check if the API is running"""
     return jsonify({'status': 'healthy'})
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics, aggregated across gunicorn workers in multiprocess mode"""
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return app.response_class(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+@app.route('/api/health/db-pool', methods=['GET'])
+def db_pool_stats():
+    """Connection pool statistics for the worker process that serves this request"""
+    return jsonify({
+        'pid': os.getpid(),
+        'max_pool_size': app.config['MONGO_MAX_POOL_SIZE'],
+        'min_pool_size': app.config['MONGO_MIN_POOL_SIZE'],
+        **pool_stats.snapshot()
+    })
+
 # =============================================
 # Authentication Routes
 # =============================================
@@ -363,8 +2320,8 @@ def signup():
             'user_id': str(result.inserted_id)
         }), 201
         
-    except Exception as e:
-        print(f"Signup error: {str(e)}")
+    except Exception:
+        logger.exception('Signup error')
         return jsonify({'error': 'An error occurred during signup. Please try again.'}), 500
 
 @app.route('/api/auth/login', methods=['POST'])
@@ -385,6 +2342,7 @@ def login():
         'user_id': str(user['_id']),
         'username': user['username'],
         'email': user['email'],
+        'token_version': user.get('token_version', 0),
         'exp': datetime.utcnow() + timedelta(hours=24)
     }, app.config['SECRET_KEY'])
     
@@ -397,30 +2355,36 @@ def login():
         }
     })
 
+@app.route('/api/auth/revoke-tokens', methods=['POST'])
+@token_required
+def revoke_tokens(current_user):
+    """Invalidate every token issued to the current user"""
+    try:
+        users_collection.update_one(
+            {'_id': current_user['_id']},
+            {'$inc': {'token_version': 1}}
+        )
+        invalidate_cached_user(str(current_user['_id']))
+        return jsonify({'message': 'All sessions have been signed out'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # =============================================
 # Recruiter Management Routes
 # =============================================
 @app.route('/api/recruiters', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('recruiters')
 def get_recruiters(current_user):
     """Get all recruiters for the current user"""
     try:
-        recruiters = list(recruiters_collection.find())
-        for recruiter in recruiters:
-            recruiter['_id'] = str(recruiter['_id'])
-            recruiter['id'] = str(recruiter['_id'])
+        recruiters = with_ids(list(recruiters_collection.find()))
         return jsonify(recruiters)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/recruiters', methods=['POST'])
-@token_required
-def create_recruiter(current_user):
-    """Create a new recruiter"""
-    data = request.json
-    if not data:
-        return jsonify({'error': 'No data provided'}), 400
-    
+def build_recruiter_doc(data, current_user):
+    """Build and validate a recruiter document, returning (recruiter, error)"""
     recruiter = {
         'name': data.get('name'),
         'email': data.get('email'),
@@ -433,18 +2397,47 @@ def create_recruiter(current_user):
     
     # Validate required fields
     if not recruiter['name'] or not recruiter['email']:
-        return jsonify({'error': 'Name and email are required fields'}), 400
+        return None, 'Name and email are required fields'
     
     # Validate email format
     if not is_valid_email(recruiter['email']):
-        return jsonify({'error': 'Invalid email format'}), 400
+        return None, 'Invalid email format'
     
     # Validate country code format if provided
     if recruiter['country_code'] and not re.match(r"^\+\d{1,4}$", recruiter['country_code']):
-        return jsonify({'error': 'Invalid country code format. Use format: +XX'}), 400
+        return None, 'Invalid country code format. Use format: +XX'
+    
+    return recruiter, None
+
+RECRUITER_EDITABLE_FIELDS = ['name', 'email', 'company', 'phone', 'country_code']
+
+def build_recruiter_update(data):
+    """Validate recruiter update data, returning (update, error)"""
+    update, error = editable_update(data, RECRUITER_EDITABLE_FIELDS)
+    if error:
+        return None, error
+    if 'name' in update and not update['name']:
+        return None, 'Name cannot be empty'
+    if 'email' in update and not is_valid_email(update['email']):
+        return None, 'Invalid email format'
+    if update.get('country_code') and not re.match(r"^\+\d{1,4}$", update['country_code']):
+        return None, 'Invalid country code format. Use format: +XX'
+    return update, None
+
+@app.route('/api/recruiters', methods=['POST'])
+@token_required
+def create_recruiter(current_user):
+    """Create a new recruiter"""
+    data = request.json
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    recruiter, error = build_recruiter_doc(data, current_user)
+    if error:
+        return jsonify({'error': error}), 400
     
-    result = recruiters_collection.insert_one(recruiter)
-    recruiter['_id'] = str(result.inserted_id)
+    recruiters_collection.insert_one(recruiter)
+    bump_version('recruiters')
     return jsonify(recruiter), 201
 
 @app.route('/api/recruiters/<recruiter_id>', methods=['PUT'])
@@ -455,17 +2448,20 @@ def update_recruiter(current_user, recruiter_id):
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
+    update, error = build_item(build_recruiter_update, data)
+    if error:
+        return jsonify({'error': error}), 400
+    
     try:
         result = recruiters_collection.update_one(
             {'_id': ObjectId(recruiter_id)},
-            {'$set': data}
+            {'$set': update}
         )
-        
         if result.modified_count == 0:
             return jsonify({'error': 'Recruiter not found'}), 404
+        bump_version('recruiters')
         
         updated_recruiter = recruiters_collection.find_one({'_id': ObjectId(recruiter_id)})
-        updated_recruiter['_id'] = str(updated_recruiter['_id'])
         return jsonify(updated_recruiter)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -480,126 +2476,122 @@ def delete_recruiter(current_user, recruiter_id):
         })
         if result.deleted_count == 0:
             return jsonify({'error': 'Recruiter not found'}), 404
+        bump_version('recruiters')
         return jsonify({'message': 'Recruiter deleted successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/recruiters/bulk', methods=['POST'])
+@token_required
+def bulk_recruiters(current_user):
+    """Create, update and delete many recruiters in one request"""
+    operations, ordered, error = parse_bulk_request()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    try:
+        report = run_bulk_write(
+            recruiters_collection,
+            str(current_user['_id']),
+            operations,
+            ordered,
+            build_create=lambda data: build_recruiter_doc(data, current_user),
+            build_update=build_recruiter_update
+        )
+        return jsonify(report)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # =============================================
 # Submission Management Routes
 # =============================================
 @app.route('/api/submissions', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('submissions')
 def get_submissions(current_user):
     """Get all submissions for the current user"""
     try:
-        print(f"Fetching submissions for user: {current_user['_id']}")  # Debug log
+        # Get all submissions for the current user, leaving out binary data
+        submissions = list(submissions_collection.find({}, HEAVY_SUBMISSION_FIELDS))
         
-        # Get all submissions for the current user
-        submissions = list(submissions_collection.find())
-        print(f"Found {len(submissions)} submissions")  # Debug log
-        
-        # Convert ObjectId to string and clean up response
-        for submission in submissions:
-            # Convert ObjectId to string
-            submission['_id'] = str(submission['_id'])
-            submission['id'] = str(submission['_id'])
-            
-            # Ensure all required fields exist with default values
-            submission.setdefault('candidate_name', '')
-            submission.setdefault('candidate_email', '')
-            submission.setdefault('candidate_phone', '')
-            submission.setdefault('candidate_city', '')
-            submission.setdefault('candidate_state', '')
-            submission.setdefault('candidate_country', '')
-            submission.setdefault('status', 'Submitted')
-            submission.setdefault('created_at', datetime.utcnow())
-            submission.setdefault('updated_at', datetime.utcnow())
-            
-            # Remove any binary data or non-serializable fields
-            if 'file_data' in submission:
-                del submission['file_data']
-            if 'resume_data' in submission:
-                del submission['resume_data']
-            if 'text_content' in submission:
-                del submission['text_content']
-            
-            # Convert datetime objects to ISO format strings
-            if 'created_at' in submission:
-                if isinstance(submission['created_at'], datetime):
-                    submission['created_at'] = submission['created_at'].isoformat()
-                elif isinstance(submission['created_at'], str):
-                    submission['created_at'] = datetime.fromisoformat(submission['created_at']).isoformat()
-            if 'updated_at' in submission:
-                if isinstance(submission['updated_at'], datetime):
-                    submission['updated_at'] = submission['updated_at'].isoformat()
-                elif isinstance(submission['updated_at'], str):
-                    submission['updated_at'] = datetime.fromisoformat(submission['updated_at']).isoformat()
-        
-        print("Submissions processed successfully")  # Debug log
+        # Ensure all required fields exist with default values
+        now = datetime.utcnow()
+        defaults = {
+            'candidate_name': '',
+            'candidate_email': '',
+            'candidate_phone': '',
+            'candidate_city': '',
+            'candidate_state': '',
+            'candidate_country': '',
+            'status': 'Submitted',
+            'created_at': now,
+            'updated_at': now
+        }
+        submissions = [{**defaults, **submission, 'id': submission['_id']} for submission in submissions]
+        logger.debug('Fetched submissions', extra={'count': len(submissions)})
         return jsonify(submissions)
     except Exception as e:
-        print(f"Error in get_submissions: {str(e)}")  # Error log
+        logger.exception('Error in get_submissions')
         return jsonify({'error': str(e)}), 500
 
+SUBMISSION_REQUIRED_FIELDS = [
+    'job_id', 'recruiter_id', 'candidate_name', 'candidate_email',
+    'candidate_city', 'candidate_state', 'candidate_country', 'visa', 'pay_rate'
+]
+
+def build_submission_doc(data, current_user):
+    """Build and validate a submission document from form or JSON data, returning (submission, error)"""
+    # Validate required fields
+    for field in SUBMISSION_REQUIRED_FIELDS:
+        if not data.get(field):
+            return None, f'{field.replace("_", " ").title()} is required'
+
+    # Create submission document
+    submission = {
+        'job_id': data.get('job_id'),
+        'recruiter_id': data.get('recruiter_id'),
+        'user_id': str(current_user['_id']),
+        'candidate_name': data.get('candidate_name'),
+        'candidate_email': data.get('candidate_email'),
+        'candidate_phone': data.get('candidate_phone'),
+        'candidate_city': data.get('candidate_city'),
+        'candidate_state': data.get('candidate_state'),
+        'candidate_country': data.get('candidate_country'),
+        'visa': data.get('visa'),
+        'pay_rate': data.get('pay_rate'),
+        'status': data.get('status', 'Submitted'),
+        'notes': data.get('notes', ''),
+        'created_at': datetime.utcnow(),
+        'updated_at': datetime.utcnow()
+    }
+    return submission, None
+
+SUBMISSION_EDITABLE_FIELDS = SUBMISSION_REQUIRED_FIELDS + ['candidate_phone', 'status', 'notes']
+
+def build_submission_update(data):
+    """Validate submission update data, returning (update, error)"""
+    update, error = editable_update(data, SUBMISSION_EDITABLE_FIELDS)
+    if error:
+        return None, error
+    for field in SUBMISSION_REQUIRED_FIELDS:
+        if field in update and not update[field]:
+            return None, f'{field.replace("_", " ").title()} cannot be empty'
+    update['updated_at'] = datetime.utcnow()
+    return update, None
+
 @app.route('/api/submissions', methods=['POST'])
 @token_required
 def create_submission(current_user):
     """Create a new submission"""
     try:
-        # Get form data
-        job_id = request.form.get('job_id')
-        recruiter_id = request.form.get('recruiter_id')
-        candidate_name = request.form.get('candidate_name')
-        candidate_email = request.form.get('candidate_email')
-        candidate_phone = request.form.get('candidate_phone')
-        candidate_city = request.form.get('candidate_city')
-        candidate_state = request.form.get('candidate_state')
-        candidate_country = request.form.get('candidate_country')
-        visa = request.form.get('visa')
-        pay_rate = request.form.get('pay_rate')
-        status = request.form.get('status', 'Submitted')
-        notes = request.form.get('notes', '')
-
-        # Validate required fields
-        required_fields = {
-            'job_id': job_id,
-            'recruiter_id': recruiter_id,
-            'candidate_name': candidate_name,
-            'candidate_email': candidate_email,
-            'candidate_city': candidate_city,
-            'candidate_state': candidate_state,
-            'candidate_country': candidate_country,
-            'visa': visa,
-            'pay_rate': pay_rate
-        }
-
-        for field, value in required_fields.items():
-            if not value:
-                return jsonify({'error': f'{field.replace("_", " ").title()} is required'}), 400
-
-        # Create submission document
-        submission = {
-            'job_id': job_id,
-            'recruiter_id': recruiter_id,
-            'user_id': str(current_user['_id']),
-            'candidate_name': candidate_name,
-            'candidate_email': candidate_email,
-            'candidate_phone': candidate_phone,
-            'candidate_city': candidate_city,
-            'candidate_state': candidate_state,
-            'candidate_country': candidate_country,
-            'visa': visa,
-            'pay_rate': pay_rate,
-            'status': status,
-            'notes': notes,
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow()
-        }
+        submission, error = build_submission_doc(request.form, current_user)
+        if error:
+            return jsonify({'error': error}), 400
 
         # Insert submission
         result = submissions_collection.insert_one(submission)
-        submission['_id'] = str(result.inserted_id)
-        submission['id'] = str(result.inserted_id)
+        bump_version('submissions')
+        submission['id'] = result.inserted_id
 
         return jsonify({
             'message': 'Submission created successfully',
@@ -607,7 +2599,7 @@ def create_submission(current_user):
         }), 201
 
     except Exception as e:
-        print(f"Error creating submission: {str(e)}")
+        logger.exception('Error creating submission')
         return jsonify({'error': f'Error creating submission: {str(e)}'}), 500
 
 @app.route('/api/submissions/<submission_id>', methods=['PUT'])
@@ -618,16 +2610,20 @@ def update_submission(current_user, submission_id):
     if not data:
         return jsonify({'error': 'No data provided'}), 400
     
+    update, error = build_item(build_submission_update, data)
+    if error:
+        return jsonify({'error': error}), 400
+    
     try:
         result = submissions_collection.update_one(
             {'_id': ObjectId(submission_id)},
-            {'$set': data}
+            {'$set': update}
         )
         if result.modified_count == 0:
             return jsonify({'error': 'Submission not found'}), 404
+        bump_version('submissions')
         
         updated_submission = submissions_collection.find_one({'_id': ObjectId(submission_id)})
-        updated_submission['_id'] = str(updated_submission['_id'])
         return jsonify(updated_submission)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -642,27 +2638,181 @@ def delete_submission(current_user, submission_id):
         })
         if result.deleted_count == 0:
             return jsonify({'error': 'Submission not found'}), 404
+        bump_version('submissions')
         return jsonify({'message': 'Submission deleted successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/submissions/bulk', methods=['POST'])
+@token_required
+def bulk_submissions(current_user):
+    """Create, update and delete many submissions in one request"""
+    operations, ordered, error = parse_bulk_request()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    try:
+        report = run_bulk_write(
+            submissions_collection,
+            str(current_user['_id']),
+            operations,
+            ordered,
+            build_create=lambda data: build_submission_doc(data, current_user),
+            build_update=build_submission_update
+        )
+        return jsonify(report)
+    except Exception as e:
+        logger.exception('Error in bulk_submissions')
+        return jsonify({'error': str(e)}), 500
+
+# =============================================
+# Resume Suggestion Index
+# =============================================
+_suggestion_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='suggest-index')
+
+class SuggestionIndex(UserResumeIndex):
+    """Sorted-array prefix index over one user's resume names, emails, titles and skills"""
+
+    FIELDS = {
+        'name': 'name',
+        'email': 'email',
+        'job_title': 'title',
+        'current_role': 'title',
+        'skills': 'skill'
+    }
+    PROJECTION = {field: 1 for field in list(FIELDS) + ['updated_at']}
+    EXECUTOR = _suggestion_executor
+    POOL = 'suggest'
+    REFRESH_KEY = 'SUGGEST_REFRESH_SECONDS'
+    REBUILD_KEY = 'SUGGEST_REBUILD_SECONDS'
+
+    def __init__(self):
+        super().__init__()
+        self.keys = []  # Sorted (token, type, value) tuples
+        self.counts = {}  # Key -> number of resumes contributing it
+        self.resume_keys = {}  # Resume ID -> keys it contributed
+
+    @classmethod
+    def keys_for(cls, resume):
+        """Return the suggestion keys for one resume; names and titles are also indexed by each word"""
+        keys = set()
+        for field, kind in cls.FIELDS.items():
+            raw = resume.get(field)
+            if not raw or not isinstance(raw, str):
+                continue
+            values = raw.split(',') if field == 'skills' else [raw]
+            for value in values:
+                value = value.strip()
+                if not value:
+                    continue
+                lowered = value.lower()
+                keys.add((lowered, kind, value))
+                if kind in ('name', 'title'):
+                    for word in lowered.split()[1:]:
+                        keys.add((word, kind, value))
+        return keys
+
+    def _add(self, resume_id, resume):
+        """Count a resume's keys, returning those no other resume contributes yet"""
+        keys = self.keys_for(resume)
+        new_keys = []
+        for key in keys:
+            if key in self.counts:
+                self.counts[key] += 1
+            else:
+                self.counts[key] = 1
+                new_keys.append(key)
+        self.resume_keys[resume_id] = keys
+        self.track(resume)
+        return new_keys
+
+    def _drop(self, resume_id):
+        """Uncount a resume's keys, returning those no resume contributes any more"""
+        dead_keys = []
+        for key in self.resume_keys.pop(resume_id, ()):
+            self.counts[key] -= 1
+            if not self.counts[key]:
+                del self.counts[key]
+                dead_keys.append(key)
+        return dead_keys
+
+    def upsert(self, resume_id, resume):
+        """Replace the keys contributed by a resume"""
+        for key in self._drop(resume_id):
+            del self.keys[bisect.bisect_left(self.keys, key)]
+        for key in self._add(resume_id, resume):
+            bisect.insort(self.keys, key)
+
+    def upsert_many(self, resumes):
+        """Replace the keys of many resumes, sorting once instead of inserting key by key"""
+        for resume in resumes:
+            self._drop(resume['_id'])
+            self._add(resume['_id'], resume)
+        self.keys = sorted(self.counts)
+
+    def apply(self, resumes):
+        """Upsert loaded or written resumes, in one sort when there are many"""
+        resumes = list(resumes)
+        if len(resumes) > 50:
+            self.upsert_many(resumes)
+        else:
+            for resume in resumes:
+                self.upsert(resume['_id'], resume)
+
+    def discard(self, resume_id):
+        """Drop every key contributed by a resume"""
+        for key in self._drop(resume_id):
+            del self.keys[bisect.bisect_left(self.keys, key)]
+
+    def swap(self, fresh):
+        """Take over a freshly built index's structures"""
+        self.keys, self.counts, self.resume_keys = fresh.keys, fresh.counts, fresh.resume_keys
+
+    def suggest(self, prefix, limit):
+        """Return up to limit distinct values with a token starting with prefix"""
+        suggestions = []
+        seen = set()
+        position = bisect.bisect_left(self.keys, (prefix,))
+        while position < len(self.keys) and len(suggestions) < limit:
+            key = self.keys[position]
+            if not key[0].startswith(prefix):
+                break
+            token, kind, value = key
+            if (kind, value) not in seen:
+                seen.add((kind, value))
+                suggestions.append({'value': value, 'type': kind, 'count': self.counts[key]})
+            position += 1
+        return suggestions
+
+_suggestion_indexes = TTLCache('SUGGEST_MAX_TENANTS')
+
+def get_suggestion_index(user_id):
+    """Return the user's suggestion index, building it on first use and refreshing it in the background when stale"""
+    return get_user_index(_suggestion_indexes, SuggestionIndex, user_id)
+
+def note_resume_changed(user_id, resume_id, resume=None):
+    """Update this worker's suggestion and embedding indexes for a written (or, with no resume, deleted) resume"""
+    for indexes in (_suggestion_indexes, _embedding_indexes):
+        index = indexes.get(user_id)
+        if index is None:
+            continue
+        with index.lock:
+            if resume is None:
+                index.remove(resume_id)
+            else:
+                index.apply([{**resume, '_id': resume_id}])
+
 # =============================================
 # Resume Management Routes
 # =============================================
 @app.route('/api/resumes', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('resumes')
 def get_resumes(current_user):
     """Get all resumes for the current user"""
     try:
-        resumes = list(resumes_collection.find())
-        # Convert ObjectId to string and clean up response
-        for resume in resumes:
-            resume['_id'] = str(resume['_id'])
-            # Remove large binary data from list response
-            if 'file_data' in resume:
-                del resume['file_data']
-            if 'text_content' in resume:
-                del resume['text_content']
+        # Leave large binary data out of the list response
+        resumes = list(resumes_collection.find({}, HEAVY_RESUME_FIELDS))
         
         return jsonify({
             'resumes': resumes,
@@ -677,6 +2827,7 @@ def upload_resume(current_user):
     """Upload and process multiple resumes in parallel with optimized failure handling"""
     results = []
     failed_files = []
+    processed = []
     try:
         if 'file' not in request.files:
             return jsonify({'error': 'No file provided'}), 400
@@ -685,16 +2836,7 @@ def upload_resume(current_user):
         if not files or files[0].filename == '':
             return jsonify({'error': 'No file selected'}), 400
 
-        # Initialize Gemini model
-        genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
-        model = genai.GenerativeModel(
-            'gemini-2.0-flash-exp',
-            generation_config={
-                "temperature": 0.1,
-                "top_p": 0.95,
-                "max_output_tokens": 2048,
-            }
-        )
+        model = get_gemini_model()
 
         # First pass: Validate all files and collect valid ones
         valid_files = []
@@ -721,7 +2863,7 @@ def upload_resume(current_user):
         with ThreadPoolExecutor(max_workers=3) as executor:
             # Submit all files for processing
             future_to_file = {
-                executor.submit(process_single_resume, file, model, current_user): file 
+                submit_tracked(executor, 'upload', process_single_resume, file, model, current_user): file
                 for file in valid_files
             }
 
@@ -733,7 +2875,7 @@ def upload_resume(current_user):
                     if result.get('status') == 'error':
                         failed_files.append((file, result))
                     else:
-                        results.append(result)
+                        processed.append(result)
                 except TimeoutError:
                     failed_files.append((file, {
                         'status': 'error',
@@ -751,27 +2893,29 @@ def upload_resume(current_user):
 
         # Quick retry for failed files with reduced retry attempts
         if failed_files:
-            retry_results = []
             with ThreadPoolExecutor(max_workers=3) as executor:
                 for file, error in failed_files:
                     # Only retry if it's not a format error
                     if error.get('error') not in ['invalid_format']:
-                        future = executor.submit(process_single_resume, file, model, current_user)
+                        future = submit_tracked(executor, 'upload', process_single_resume, file, model, current_user)
                         try:
                             result = future.result(timeout=30)  # 30 seconds timeout for retry
-                            retry_results.append(result)
+                            if result.get('status') == 'error':
+                                results.append(result)
+                            else:
+                                processed.append(result)
                         except Exception:
-                            retry_results.append(error)
+                            results.append(error)
                     else:
-                        retry_results.append(error)
-            
-            # Update results with retry outcomes
-            results.extend(retry_results)
+                        results.append(error)
+
+        # Store every successfully processed resume in one bulk write
+        results.extend(store_processed_resumes(processed, current_user))
 
         # Log summary of results
         successful = len([r for r in results if r.get('status') == 'success'])
         failed = len([r for r in results if r.get('status') == 'error'])
-        print(f"Resume upload summary: {successful} successful, {failed} failed out of {len(files)} total files")
+        logger.info('Resume upload summary', extra={'successful': successful, 'failed': failed, 'total_files': len(files)})
         
         return jsonify({
             'total_files': len(files),
@@ -782,14 +2926,14 @@ def upload_resume(current_user):
         })
 
     except Exception as e:
-        print(f"Error in upload_resume: {str(e)}")
+        logger.exception('Error in upload_resume')
         return jsonify({
             'error': 'upload_failed',
             'message': str(e)
         }), 500
 
 def process_single_resume(file, model, current_user):
-    """Process a single resume file with optimized retry logic"""
+    """Extract a single resume file with optimized retry logic, without storing it"""
     max_retries = 2  
     retry_count = 0
     resume_info = None
@@ -797,6 +2941,8 @@ def process_single_resume(file, model, current_user):
     error_logged = False  # Flag to track if error has been logged
 
     while retry_count < max_retries and not valid_email:
+        if retry_count > 0:
+            LLM_RETRIES.labels('process_single_resume').inc()
         try:
             # Extract text from file
             resume_text = extract_text_from_file(file)
@@ -817,12 +2963,6 @@ def process_single_resume(file, model, current_user):
 
             # Validate email format
             if email and is_valid_email(email):
-                # Check if email already exists
-                existing_resume = resumes_collection.find_one({
-                    'user_id': str(current_user['_id']),
-                    'email': email
-                })
-
                 # Prepare resume data
                 file.seek(0)
                 file_data = base64.b64encode(file.read()).decode('utf-8')
@@ -835,6 +2975,7 @@ def process_single_resume(file, model, current_user):
                     'text_content': resume_text,
                     'name': resume_info.get('name', ''),
                     'email': email,
+                    'email_normalized': normalize_email(email),
                     'phone_number': resume_info.get('phone_number', ''),
                     'job_title': resume_info.get('current_role', ''),
                     'current_job': resume_info.get('current_company', ''),
@@ -845,40 +2986,20 @@ def process_single_resume(file, model, current_user):
                     'resume_summary': resume_info.get('professional_summary_resume', ''),
                     'experience': resume_info.get('experience_details', []),
                     'category': resume_info.get('category', ''),
-                    'created_at': datetime.utcnow(),
-                    'updated_at': datetime.utcnow(),
-                    'extraction_retries': retry_count
+                    'total_experience': resume_info.get('total_experience', ''),
+                    'extraction_retries': retry_count,
+                    **extraction_stamp(resume_text)
                 }
+                resume_data.update(compute_resume_facets(resume_data))
+                resume_data['embedding'] = embed_resume(resume_data)
 
-                if existing_resume:
-                    # Update existing resume
-                    resumes_collection.update_one(
-                        {'_id': existing_resume['_id']},
-                        {'$set': resume_data}
-                    )
-                    return {
-                        'status': 'success',
-                        'id': str(existing_resume['_id']),
-                        'filename': file.filename,
-                        'name': resume_info.get('name', ''),
-                        'email': email,
-                        'skills': resume_info.get('skills', ''),
-                        'retries': retry_count,
-                        'message': 'Resume updated successfully'
-                    }
-                else:
-                    # Insert new resume
-                    result = resumes_collection.insert_one(resume_data)
-                    return {
-                        'status': 'success',
-                        'id': str(result.inserted_id),
-                        'filename': file.filename,
-                        'name': resume_info.get('name', ''),
-                        'email': email,
-                        'skills': resume_info.get('skills', ''),
-                        'retries': retry_count,
-                        'message': 'Resume uploaded successfully'
-                    }
+                # Storage happens once per batch in store_processed_resumes
+                return {
+                    'status': 'processed',
+                    'filename': file.filename,
+                    'resume_data': resume_data,
+                    'retries': retry_count
+                }
             else:
                 retry_count += 1
                 if retry_count == max_retries and not error_logged:
@@ -914,6 +3035,98 @@ def process_single_resume(file, model, current_user):
             'message': 'Failed to process resume after maximum retries'
         }
 
+DUPLICATE_KEY_ERROR = 11000
+UPSERT_ATTEMPTS = 3
+
+def store_processed_resumes(processed, current_user):
+    """Upsert a batch of processed resumes with one bulk_write keyed on (user_id, email)"""
+    if not processed:
+        return []
+
+    user_id = str(current_user['_id'])
+
+    # Later files win when several files in the batch share an email
+    latest = {}
+    for item in processed:
+        latest[item['resume_data']['email_normalized']] = item
+    emails = list(latest)
+
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {'user_id': user_id, 'email_normalized': email},
+            {'$set': {**latest[email]['resume_data'], 'updated_at': now}, '$setOnInsert': {'created_at': now}},
+            upsert=True
+        )
+        for email in emails
+    ]
+
+    failed_emails = {}
+    upserted_indexes = set()
+    pending = list(range(len(operations)))
+    for attempt in range(UPSERT_ATTEMPTS):
+        try:
+            bulk_result = resumes_collection.bulk_write([operations[index] for index in pending], ordered=False)
+            upserted_indexes.update(pending[position] for position in bulk_result.upserted_ids)
+            errors = []
+        except BulkWriteError as e:
+            upserted_indexes.update(pending[upsert['index']] for upsert in e.details.get('upserted', []))
+            errors = e.details.get('writeErrors', [])
+
+        # A concurrent upload of the same email can win the race to insert it;
+        # retried, the upsert matches that document and updates it instead
+        retry = []
+        for error in errors:
+            index = pending[error['index']]
+            if error.get('code') == DUPLICATE_KEY_ERROR and attempt + 1 < UPSERT_ATTEMPTS:
+                retry.append(index)
+            else:
+                failed_emails[emails[index]] = error.get('errmsg', 'Failed to store resume')
+        if not retry:
+            break
+        pending = retry
+    if len(failed_emails) < len(emails):
+        bump_version('resumes')
+    inserted_emails = {emails[index] for index in upserted_indexes}
+
+    stored_ids = {
+        doc['email_normalized']: doc['_id']
+        for doc in resumes_collection.find({'user_id': user_id, 'email_normalized': {'$in': emails}}, {'email_normalized': 1})
+    }
+
+    results = []
+    for item in processed:
+        resume_data = item['resume_data']
+        email = resume_data['email_normalized']
+        if email in failed_emails:
+            results.append({
+                'status': 'error',
+                'error': 'storage_failed',
+                'filename': item['filename'],
+                'message': failed_emails[email]
+            })
+            continue
+
+        if latest[email] is not item:
+            message = f"Merged with {latest[email]['filename']} (same email)"
+        elif email in inserted_emails:
+            message = 'Resume uploaded successfully'
+        else:
+            message = 'Resume updated successfully'
+        if latest[email] is item and stored_ids.get(email):
+            note_resume_changed(user_id, stored_ids[email], {**resume_data, 'updated_at': now})
+        results.append({
+            'status': 'success',
+            'id': stored_ids.get(email),
+            'filename': item['filename'],
+            'name': resume_data.get('name', ''),
+            'email': resume_data['email'],
+            'skills': resume_data.get('skills', ''),
+            'retries': item['retries'],
+            'message': message
+        })
+    return results
+
 @app.route('/api/resumes/<resume_id>/preview', methods=['GET'])
 @token_required
 def preview_resume(current_user, resume_id):
@@ -1010,13 +3223,12 @@ def get_resume(current_user, resume_id):
         resume = resumes_collection.find_one({
             '_id': ObjectId(resume_id),
             'user_id': str(current_user['_id'])
-        })
+        }, {'embedding': 0})
         
         if not resume:
             return jsonify({'error': 'Resume not found'}), 404
         
-        resume['_id'] = str(resume['_id'])
-        resume['id'] = str(resume['_id'])
+        resume['id'] = resume['_id']
         
         return jsonify(resume)
     except Exception as e:
@@ -1042,11 +3254,15 @@ def delete_resume(resume_id):
             
         # Delete the resume
         result = resumes_collection.delete_one({'_id': ObjectId(resume_id)})
+        bump_version('resumes')
         
         if result.deleted_count == 0:
             response = jsonify({'error': 'Failed to delete resume'})
             response.headers.add('Access-Control-Allow-Origin', '*')
             return response, 500
+
+        if resume.get('user_id'):
+            note_resume_changed(resume['user_id'], resume['_id'])
             
         response = jsonify({'message': 'Resume deleted successfully'})
         response.headers.add('Access-Control-Allow-Origin', '*')
@@ -1086,6 +3302,8 @@ def reprocess_resume(current_user, resume_id):
         resume_info = None
         
         while retry_count < max_retries and not resume_info:
+            if retry_count > 0:
+                LLM_RETRIES.labels('reprocess_resume').inc()
             try:
                 resume_info = extract_resume_info(text_content)
                 if not resume_info.get('email'):  # If email extraction failed
@@ -1109,30 +3327,27 @@ def reprocess_resume(current_user, resume_id):
         
         # Update resume with new extracted information
         update_data = {
-            'name': resume_info.get('name', ''),
-            'email': resume_info.get('email', ''),
-            'phone_number': resume_info.get('phone_number', ''),
-            'job_title': resume_info.get('current_role', ''),
-            'current_job': resume_info.get('current_company', ''),
-            'skills': resume_info.get('skills', ''),
-            'location': resume_info.get('location', ''),
-            'resume_summary': resume_info.get('education', ''),
-            'experience': resume_info.get('experience_details', []),
-            'category': resume_info.get('category', ''),
+            **resume_fields_from_extraction(resume_info),
+            **extraction_stamp(text_content),
             'updated_at': datetime.utcnow(),
             'extraction_retries': retry_count
         }
+        update_data.update(compute_resume_facets(resume_info))
+        update_data['embedding'] = embed_resume({**resume, **update_data})
         
         result = resumes_collection.update_one(
             {'_id': ObjectId(resume_id)},
             {'$set': update_data}
         )
+        bump_version('resumes')
         
         if result.modified_count == 0:
             return jsonify({
                 'status': 'warning',
                 'message': 'No changes were made to the resume'
             })
+
+        note_resume_changed(resume['user_id'], resume['_id'], {**resume, **update_data})
         
         return jsonify({
             'status': 'success',
@@ -1151,22 +3366,43 @@ def reprocess_resume(current_user, resume_id):
 # Resume Search Routes
 # =============================================
 @app.route('/api/resumes/search', methods=['POST'])
-@token_required
+@token_claims_required
 def search_resumes(current_user):
-    """Search resumes by skills or email"""
+    """Search resumes by skills, email, ranked full text, hybrid lexical/semantic ranking or facets"""
     try:
         data = request.get_json()
-        if not data or 'search_term' not in data or 'search_type' not in data:
+        if not isinstance(data, dict) or 'search_type' not in data or ('search_term' not in data and data['search_type'] != 'faceted'):
             return jsonify({'error': 'Missing search parameters'}), 400
 
-        search_term = data['search_term'].strip()
+        search_term = (data.get('search_term') or '').strip()
         search_type = data['search_type']
+        query = {'user_id': str(current_user['_id'])}
+
+        if search_type == 'faceted':
+            # Facets alone are a valid search, so the term may be empty here
+            try:
+                page = max(int(data.get('page', 1)), 1)
+                page_size = min(max(int(data.get('page_size', 20)), 1), 100)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Invalid pagination parameters'}), 400
+
+            filters = data.get('filters') or {}
+            if not isinstance(filters, dict):
+                return jsonify({'error': 'Filters must be an object'}), 400
+            try:
+                for bound in ('min_experience', 'max_experience'):
+                    if filters.get(bound) is not None:
+                        filters[bound] = float(filters[bound])
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Experience filters must be numbers'}), 400
+
+            return jsonify(faceted_search_resumes(
+                query, search_term, (data.get('text') or '').strip(), filters, page, page_size
+            ))
 
         if not search_term:
             return jsonify({'error': 'Search term cannot be empty'}), 400
 
-        query = {'user_id': str(current_user['_id'])}
-
         if search_type == 'skills':
             # Split skills by comma and clean up
             skills = [skill.strip() for skill in search_term.split(',') if skill.strip()]
@@ -1183,25 +3419,31 @@ def search_resumes(current_user):
             if not emails:
                 return jsonify({'error': 'No valid emails provided'}), 400
 
-            # Create a case-insensitive regex pattern for each email
-            email_patterns = [{'email': {'$regex': email, '$options': 'i'}} for email in emails]
-            query['$or'] = email_patterns
+            # Complete addresses match exactly, partial ones by anchored prefix
+            query['$or'] = [email_lookup(email) for email in emails]
+
+        elif search_type == 'hybrid':
+            try:
+                page_size = min(max(int(data.get('page_size', 20)), 1), 100)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Invalid pagination parameters'}), 400
+
+            return jsonify(hybrid_search_resumes(query, search_term, page_size))
+
+        elif search_type == 'text':
+            try:
+                page = max(int(data.get('page', 1)), 1)
+                page_size = min(max(int(data.get('page_size', 20)), 1), 100)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Invalid pagination parameters'}), 400
+
+            return jsonify(text_search_resumes(query, search_term, page, page_size))
 
         else:
             return jsonify({'error': 'Invalid search type'}), 400
 
-        # Execute the search
-        resumes = list(resumes_collection.find(query))
-        
-        # Process results
-        for resume in resumes:
-            resume['_id'] = str(resume['_id'])
-            resume['id'] = str(resume['_id'])
-            # Remove file data from response
-            if 'file_data' in resume:
-                del resume['file_data']
-            if 'text_content' in resume:
-                del resume['text_content']
+        # Execute the search without fetching file data
+        resumes = with_ids(list(resumes_collection.find(query, HEAVY_RESUME_FIELDS)))
 
         return jsonify({
             'resumes': resumes,
@@ -1209,69 +3451,339 @@ def search_resumes(current_user):
         })
 
     except Exception as e:
-        print(f"Search error: {str(e)}")
+        logger.exception('Search error')
         return jsonify({'error': str(e)}), 500
 
+def email_lookup(email):
+    """Build an index-friendly query on email_normalized: exact for full addresses, anchored prefix otherwise"""
+    email = normalize_email(email)
+    if is_valid_email(email):
+        return {'email_normalized': email}
+    return {'email_normalized': {'$regex': '^' + re.escape(email)}}
+
+def build_snippet(text, terms, width=160):
+    """Return a short excerpt of text around the first occurrence of any search term"""
+    if not text:
+        return ''
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms]
+    positions = [position for position in positions if position >= 0]
+    start = max(min(positions) - width // 2, 0) if positions else 0
+    snippet = ' '.join(text[start:start + width].split())
+    prefix = '...' if start > 0 else ''
+    suffix = '...' if start + width < len(text) else ''
+    return f"{prefix}{snippet}{suffix}"
+
+def text_search_resumes(query, search_term, page, page_size):
+    """Run a relevance-ranked text index search and return one page of hits with snippets"""
+    query = {**query, '$text': {'$search': search_term}}
+    projection = {'file_data': 0, 'embedding': 0, 'score': {'$meta': 'textScore'}}
+
+    total = resumes_collection.count_documents(query)
+    cursor = resumes_collection.find(query, projection) \
+        .sort([('score', {'$meta': 'textScore'})]) \
+        .skip((page - 1) * page_size) \
+        .limit(page_size)
+
+    # Quoted phrases and negations are handled by Mongo; snippets only need the plain words
+    terms = [term.lower() for term in re.findall(r'[\w.+#-]+', search_term) if not term.startswith('-')]
+    resumes = []
+    for resume in cursor:
+        resume['snippet'] = build_snippet(resume.pop('text_content', ''), terms)
+        resume['id'] = resume['_id']
+        resumes.append(resume)
+
+    return {
+        'resumes': resumes,
+        'total': total,
+        'page': page,
+        'page_size': page_size,
+        'message': f'Found {total} matching resumes'
+    }
+
+_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hybrid-search')
+RRF_K = 60  # Reciprocal-rank fusion constant; dampens the weight of top ranks
+
+def lexical_candidates(query, search_term, limit):
+    """Top resume IDs and scores from the text index"""
+    cursor = resumes_collection.find(
+        {**query, '$text': {'$search': search_term}},
+        {'score': {'$meta': 'textScore'}}
+    ).sort([('score', {'$meta': 'textScore'})]).limit(limit)
+    return [(resume['_id'], resume['score']) for resume in cursor]
+
+def semantic_candidates(user_id, search_term, limit):
+    """Top resume IDs and cosine similarities against the stored resume embeddings"""
+    if _embedding_model is None:
+        # Don't hold a search thread (and the budget) for the model load;
+        # searches use the lexical signal alone until it is ready
+        warm_embedding_model()
+        raise RuntimeError('embedding model is loading')
+    index = get_embedding_index(user_id)
+    with STAGE_LATENCY.labels('embedding').time():
+        query_vector = get_embedding_model().encode(search_term, normalize_embeddings=True)
+    return index.search(query_vector, limit)
+
+def hybrid_search_resumes(query, search_term, page_size):
+    """Run lexical and semantic retrieval in parallel and merge them with reciprocal-rank fusion"""
+    budget = app.config['HYBRID_SEARCH_BUDGET_MS'] / 1000
+    limit = app.config['HYBRID_CANDIDATES']
+    futures = {
+        'lexical': submit_tracked(_search_executor, 'search', lexical_candidates, query, search_term, limit),
+        'semantic': submit_tracked(_search_executor, 'search', semantic_candidates, query['user_id'], search_term, limit)
+    }
+    wait(futures.values(), timeout=budget)
+
+    # Signals that miss the budget or fail are left out rather than delaying the response
+    signals = {}
+    skipped = {}
+    for name, future in futures.items():
+        if not future.done():
+            skipped[name] = 'timeout'
+        elif future.exception():
+            skipped[name] = str(future.exception())
+        else:
+            signals[name] = future.result()
+
+    fused = {}
+    for name, candidates in signals.items():
+        for rank, (resume_id, score) in enumerate(candidates, start=1):
+            entry = fused.setdefault(resume_id, {'rrf_score': 0.0})
+            entry['rrf_score'] += 1 / (RRF_K + rank)
+            entry[f'{name}_rank'] = rank
+            entry[f'{name}_score'] = round(score, 4)
+
+    ranked = sorted(fused.items(), key=lambda item: item[1]['rrf_score'], reverse=True)[:page_size]
+    documents = {
+        resume['_id']: resume
+        for resume in resumes_collection.find({'_id': {'$in': [resume_id for resume_id, _ in ranked]}}, HEAVY_RESUME_FIELDS)
+    }
+    resumes = []
+    for resume_id, scores in ranked:
+        resume = documents.get(resume_id)
+        if resume:
+            scores['rrf_score'] = round(scores['rrf_score'], 6)
+            resume['id'] = resume_id
+            resume['scores'] = scores
+            resumes.append(resume)
+
+    return {
+        'resumes': resumes,
+        'signals': list(signals),
+        'skipped_signals': skipped,
+        'message': f'Found {len(resumes)} matching resumes'
+    }
+
+# Facet name in requests -> stored field
+RESUME_FACETS = {
+    'location': 'location_normalized',
+    'category': 'category_normalized',
+    'education_level': 'education_level'
+}
+EXPERIENCE_BUCKETS = [0, 1, 3, 5, 10, 20, 100]
+
+def faceted_search_resumes(query, skills_term, text, filters, page, page_size):
+    """Filter resumes by facets plus optional skills/text terms, returning one page and per-facet counts from a single aggregation"""
+    match = dict(query)
+    if text:
+        match['$text'] = {'$search': text}
+
+    skills = [skill.strip() for skill in skills_term.split(',') if skill.strip()]
+    if skills:
+        match['$or'] = [{'skills': {'$regex': re.escape(skill), '$options': 'i'}} for skill in skills]
+
+    for name, field in RESUME_FACETS.items():
+        values = filters.get(name)
+        if not values:
+            continue
+        if not isinstance(values, list):
+            values = [values]
+        if name == 'location':
+            values = [normalize_location(value) for value in values]
+        else:
+            values = [' '.join(str(value).lower().split()) for value in values]
+        match[field] = {'$in': values}
+
+    experience = {}
+    if filters.get('min_experience') is not None:
+        experience['$gte'] = filters['min_experience']
+    if filters.get('max_experience') is not None:
+        experience['$lte'] = filters['max_experience']
+    if experience:
+        match['experience_years'] = experience
+
+    if text:
+        sort = {'score': {'$meta': 'textScore'}, 'updated_at': -1}
+        projection = {**HEAVY_RESUME_FIELDS, 'score': {'$meta': 'textScore'}}
+    else:
+        sort = {'updated_at': -1}
+        projection = HEAVY_RESUME_FIELDS
+
+    def facet_counts(field):
+        return [
+            {'$match': {field: {'$nin': [None, '']}}},
+            {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}},
+            {'$sort': {'count': -1, '_id': 1}},
+            {'$limit': 50}
+        ]
+
+    pipeline = [
+        {'$match': match},
+        {'$facet': {
+            'results': [
+                {'$sort': sort},
+                {'$skip': (page - 1) * page_size},
+                {'$limit': page_size},
+                {'$project': projection}
+            ],
+            'total': [{'$count': 'count'}],
+            **{name: facet_counts(field) for name, field in RESUME_FACETS.items()},
+            'experience': [
+                {'$bucket': {
+                    'groupBy': '$experience_years',
+                    'boundaries': EXPERIENCE_BUCKETS,
+                    'default': 'unknown',
+                    'output': {'count': {'$sum': 1}}
+                }}
+            ]
+        }}
+    ]
+    faceted = next(resumes_collection.aggregate(pipeline))
+
+    total = faceted['total'][0]['count'] if faceted['total'] else 0
+    bucket_labels = {
+        low: f'{low}-{high}' for low, high in zip(EXPERIENCE_BUCKETS, EXPERIENCE_BUCKETS[1:])
+    }
+    facets = {
+        name: [{'value': bucket['_id'], 'count': bucket['count']} for bucket in faceted[name]]
+        for name in RESUME_FACETS
+    }
+    facets['experience'] = [
+        {'value': bucket_labels.get(bucket['_id'], bucket['_id']), 'count': bucket['count']}
+        for bucket in faceted['experience']
+    ]
+
+    return {
+        'resumes': with_ids(faceted['results']),
+        'facets': facets,
+        'total': total,
+        'page': page,
+        'page_size': page_size,
+        'message': f'Found {total} matching resumes'
+    }
+
 @app.route('/api/resumes/search/email', methods=['GET'])
-@token_required
+@token_claims_required
 def search_resumes_by_email(current_user):
-    """Search resumes by email with partial matching"""
+    """Search resumes by email prefix"""
     try:
-        email = request.args.get('email', '').lower()
+        email = normalize_email(request.args.get('email'))
         if not email:
             return jsonify([]), 200
 
-        # Find resumes with partial email match
-        resumes = list(resumes_collection.find({
+        # Find resumes whose email starts with the input, without file data
+        resumes = with_ids(list(resumes_collection.find({
             'user_id': str(current_user['_id']),
-            'email': {'$regex': email, '$options': 'i'}
-        }))
-
-        # Process results
-        for resume in resumes:
-            resume['_id'] = str(resume['_id'])
-            resume['id'] = str(resume['_id'])
-            # Remove file data from response
-            if 'file_data' in resume:
-                del resume['file_data']
+            'email_normalized': {'$regex': '^' + re.escape(email)}
+        }, {'file_data': 0, 'embedding': 0})))
 
         return jsonify(resumes)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/resumes/suggest', methods=['GET'])
+@token_claims_required
+def suggest_resumes(current_user):
+    """Suggest candidate names, emails, titles and skills starting with a prefix"""
+    try:
+        prefix = request.args.get('prefix', '').strip().lower()
+        if not prefix:
+            return jsonify({'suggestions': []})
+
+        try:
+            limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+        except ValueError:
+            return jsonify({'error': 'Invalid limit'}), 400
+
+        index = get_suggestion_index(str(current_user['_id']))
+        with index.lock:
+            suggestions = index.suggest(prefix, limit)
+        return jsonify({'suggestions': suggestions})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# =============================================
+# Public Job Page Cache
+# =============================================
+# Per-process LRU of rendered public job payloads keyed by shareable link.
+# Writes in this process invalidate immediately; other workers pick changes up
+# within PUBLIC_JOB_CACHE_TTL, which is also the max-age sent to proxies.
+_public_job_links = {}  # job_id -> shareable_link, for invalidation by ID
+_public_job_cache = TTLCache(
+    'PUBLIC_JOB_CACHE_MAX_SIZE', 'PUBLIC_JOB_CACHE_TTL',
+    on_evict=lambda shareable_link, entry: _public_job_links.pop(entry['job_id'], None)
+)
+
+def get_public_job_payload(shareable_link):
+    """Return the serialized public view of a job, or None if no job has this link"""
+    entry = _public_job_cache.get(shareable_link)
+    if entry:
+        return entry['payload']
+
+    job = jobs_collection.find_one(
+        {'shareable_link': shareable_link},
+        {'title': 1, 'client': 1, 'location': 1, 'description': 1, 'bill_rate': 1, 'visas': 1}
+    )
+    if not job:
+        return None
+
+    # Only return necessary fields for public view
+    payload = app.json.dumps({
+        'id': job['_id'],
+        'title': job['title'],
+        'company': job['client'],
+        'location': job['location'],
+        'description': job['description'],
+        'bill_rate': job['bill_rate'],
+        'visas': job['visas']
+    })
+    _public_job_links[str(job['_id'])] = shareable_link
+    _public_job_cache.set(shareable_link, {'payload': payload, 'job_id': str(job['_id'])})
+    return payload
+
+def invalidate_public_job(job_id):
+    """Drop a job's cached public page after it is updated or deleted"""
+    shareable_link = _public_job_links.pop(str(job_id), None)
+    if shareable_link is not None:
+        _public_job_cache.pop(shareable_link)
+
 # =============================================
 # Job Management Routes
 # =============================================
 @app.route('/api/jobs', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('jobs')
 def get_jobs(current_user):
     """Get all jobs for the current user"""
     try:
-        jobs = list(jobs_collection.find())
-        for job in jobs:
-            job['_id'] = str(job['_id'])
-            # Convert ObjectId to string for the job id
-            job['id'] = str(job['_id'])  # Add id field for frontend compatibility
+        jobs = with_ids(list(jobs_collection.find()))
         return jsonify(jobs)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/jobs', methods=['POST'])
-@token_required
-def create_job(current_user):
-    """Create a new job posting"""
-    data = request.json
-    if not data:
-        return jsonify({'error': 'No data provided'}), 400
-    
+def build_job_doc(data, current_user):
+    """Build and validate a job document, returning (job, error)"""
     # Validate required fields
     if not data.get('title'):
-        return jsonify({'error': 'Job title is required'}), 400
+        return None, 'Job title is required'
     
-    # Generate unique URLs for the job
+    # Generate unique URLs for the job; the random suffix keeps jobs with the
+    # same title created in the same second apart
     timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
-    job_url = f"job-{timestamp}-{data['title'].lower().replace(' ', '-')}"
-    shareable_link = f"share-{timestamp}-{data['title'].lower().replace(' ', '-')}"
+    slug = data['title'].lower().replace(' ', '-')
+    suffix = uuid.uuid4().hex[:12]
+    job_url = f"job-{timestamp}-{slug}-{suffix}"
+    shareable_link = f"share-{timestamp}-{slug}-{suffix}"
     
     job = {
         'title': data.get('title'),
@@ -1286,11 +3798,43 @@ def create_job(current_user):
         'created_at': datetime.utcnow(),
         'updated_at': datetime.utcnow()
     }
+    return job, None
+
+JOB_EDITABLE_FIELDS = ['title', 'location', 'bill_rate', 'visas', 'description', 'client', 'status']
+
+def build_job_update(data):
+    """Validate job update data, returning (update, error)"""
+    # Links are generated on create and never change
+    update, error = editable_update(data, JOB_EDITABLE_FIELDS, read_only=['url', 'shareable_link'])
+    if error:
+        return None, error
+    if 'title' in update and not update['title']:
+        return None, 'Job title cannot be empty'
+    
+    # Ensure status is one of the allowed values
+    if 'status' in update and update['status'] not in ['open', 'closed']:
+        return None, 'Invalid status value. Must be either "open" or "closed"'
+    
+    # Add updated_at timestamp
+    update['updated_at'] = datetime.utcnow()
+    return update, None
+
+@app.route('/api/jobs', methods=['POST'])
+@token_required
+def create_job(current_user):
+    """Create a new job posting"""
+    data = request.json
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    job, error = build_job_doc(data, current_user)
+    if error:
+        return jsonify({'error': error}), 400
     
     try:
         result = jobs_collection.insert_one(job)
-        job['_id'] = str(result.inserted_id)
-        job['id'] = str(result.inserted_id)
+        bump_version('jobs')
+        job['id'] = result.inserted_id
         return jsonify(job), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1299,26 +3843,20 @@ def create_job(current_user):
 def get_public_job(shareable_link):
     """Get public job details by shareable link"""
     try:
-        job = jobs_collection.find_one({'shareable_link': shareable_link})
-        if not job:
+        payload = get_public_job_payload(shareable_link)
+        if payload is None:
             return jsonify({'error': 'Job not found'}), 404
-        
-        # Only return necessary fields for public view
-        public_job = {
-            'id': str(job['_id']),
-            'title': job['title'],
-            'company': job['client'],
-            'location': job['location'],
-            'description': job['description'],
-            'bill_rate': job['bill_rate'],
-            'visas': job['visas']
-        }
-        
-        return jsonify(public_job)
+
+        response = app.response_class(payload, mimetype='application/json')
+        # Let a CDN or reverse proxy absorb traffic spikes on shared postings
+        response.cache_control.public = True
+        response.cache_control.max_age = app.config['PUBLIC_JOB_CACHE_TTL']
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/jobs/share/<shareable_link>/apply', methods=['POST'])
+@admission_control
 def apply_for_public_job(shareable_link):
     try:
         # Get the job by shareable link
@@ -1337,6 +3875,7 @@ def apply_for_public_job(shareable_link):
         update_data = {
             'name': resume_data.get('name'),
             'email': resume_data.get('email'),
+            'email_normalized': normalize_email(resume_data.get('email')),
             'phone_number': resume_data.get('phone_number'),
             'location': resume_data.get('location'),
             'skills': resume_data.get('skills'),
@@ -1345,12 +3884,14 @@ def apply_for_public_job(shareable_link):
             'linkedin': resume_data.get('linkedin'),
             'updated_at': datetime.utcnow()
         }
+        update_data.update(compute_resume_facets(update_data))
 
         # Update the resume in the database
         result = resumes_collection.update_one(
             {'_id': ObjectId(resume_id)},
             {'$set': update_data}
         )
+        bump_version('resumes')
 
         if result.matched_count == 0:
             return jsonify({'error': 'Resume not found'}), 404
@@ -1373,74 +3914,62 @@ def apply_for_public_job(shareable_link):
         }
 
         result = public_applications_collection.insert_one(new_application)
-        new_application['_id'] = str(result.inserted_id)
-        new_application['id'] = str(result.inserted_id)
+        bump_version('public_applications')
 
         return jsonify({
             'message': 'Application submitted successfully',
-            'application_id': new_application['id']
+            'application_id': result.inserted_id
         }), 201
 
     except Exception as e:
-        print(f"Error in apply_for_public_job: {str(e)}")
+        logger.exception('Error in apply_for_public_job')
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/public_applications', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('public_applications', 'jobs')
 def get_public_applications(current_user):
     try:
-        print("=== Debug: get_public_applications ===")
-        print(f"Current user ID: {current_user['_id']}")
-        
-        # Get all jobs created by the current user
-        user_jobs = list(jobs_collection.find({'user_id': str(current_user['_id'])}, {'_id': 1}))
-        job_ids = [str(job['_id']) for job in user_jobs]
-        print(f"Found {len(job_ids)} jobs for user")
-        print(f"Job IDs: {job_ids}")
-        
-        # Get all public applications and convert cursor to list
-        all_applications = list(public_applications_collection.find())
-        print(f"Total applications in DB: {len(all_applications)}")
-        
-        # Get applications for user's jobs
-        applications = list(public_applications_collection.find({'job_id': {'$in': job_ids}}))
-        print(f"Applications matching user's jobs: {len(applications)}")
-        
-        # Debug: Print raw application data
-        for app in applications:
-            print(f"Application: job_id={app.get('job_id')}, name={app.get('name')}")
-        
+        # Jobs created by the current user, with the fields shown alongside each application
+        user_jobs = {
+            job['_id']: job
+            for job in jobs_collection.find({'user_id': str(current_user['_id'])}, {'title': 1, 'client': 1})
+        }
+
+        # Applications store job_id as an ObjectId; older ones may hold the string form
+        job_ids = list(user_jobs) + [str(job_id) for job_id in user_jobs]
+        applications = public_applications_collection.find(
+            {'job_id': {'$in': job_ids}},
+            {'file_data': 0, 'text_content': 0}
+        )
+
         # Format the response
         result = []
         for app in applications:
-            try:
-                job = jobs_collection.find_one({'_id': ObjectId(app['job_id'])})
-                if job:
-                    result.append({
-                        'id': str(app['_id']),
-                        'job_id': str(app['job_id']),
-                        'job_title': job.get('title', 'Unknown Job'),
-                        'company_name': job.get('client', 'Unknown Company'),
-                        'name': app.get('name', ''),
-                        'email': app.get('email', ''),
-                        'phone': app.get('phone', ''),
-                        'linkedin_url': app.get('linkedin_url', ''),
-                        'state': app.get('state', ''),
-                        'country': app.get('country', ''),
-                        'expected_pay_rate': app.get('expected_pay_rate', ''),
-                        'status': app.get('status', 'pending'),
-                        'resume_path': app.get('resume_path', ''),
-                        'created_at': app['created_at'].isoformat() if app.get('created_at') else None,
-                        'updated_at': app['updated_at'].isoformat() if app.get('updated_at') else None
-                    })
-            except Exception as e:
-                print(f"Error processing application {app.get('_id')}: {str(e)}")
-                continue
-        
-        print(f"Returning {len(result)} formatted applications")
+            job_id = app['job_id']
+            job = user_jobs.get(job_id if isinstance(job_id, ObjectId) else ObjectId(job_id))
+            result.append({
+                'id': app['_id'],
+                'job_id': job_id,
+                'job_title': job.get('title', 'Unknown Job'),
+                'company_name': job.get('client', 'Unknown Company'),
+                'name': app.get('name', ''),
+                'email': app.get('email', ''),
+                'phone': app.get('phone', ''),
+                'linkedin_url': app.get('linkedin_url', ''),
+                'state': app.get('state', ''),
+                'country': app.get('country', ''),
+                'expected_pay_rate': app.get('expected_pay_rate', ''),
+                'status': app.get('status', 'pending'),
+                'resume_path': app.get('resume_path', ''),
+                'created_at': app.get('created_at'),
+                'updated_at': app.get('updated_at')
+            })
+
+        logger.debug('Fetched public applications', extra={'jobs': len(user_jobs), 'count': len(result)})
         return jsonify(result)
     except Exception as e:
-        print(f"Error in get_public_applications: {str(e)}")
+        logger.exception('Error in get_public_applications')
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/public_applications/<application_id>/resume', methods=['GET'])
@@ -1475,7 +4004,7 @@ def download_public_resume(current_user, application_id):
         )
 
     except Exception as e:
-        print(f"Error in download_public_resume: {str(e)}")
+        logger.exception('Error in download_public_resume')
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/jobs/<job_id>', methods=['PUT'])
@@ -1487,43 +4016,35 @@ def update_job(current_user, job_id):
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        # Remove _id from data if present
-        if '_id' in data:
-            del data['_id']
-        
-        # Add updated_at timestamp
-        data['updated_at'] = datetime.utcnow()
-        
-        # Ensure status is one of the allowed values
-        if 'status' in data:
-            if data['status'] not in ['open', 'closed']:
-                return jsonify({'error': 'Invalid status value. Must be either "open" or "closed"'}), 400
+        update, error = build_item(build_job_update, data)
+        if error:
+            return jsonify({'error': error}), 400
         
         # Update the job without user_id check
         result = jobs_collection.update_one(
             {'_id': ObjectId(job_id)},
-            {'$set': data}
+            {'$set': update}
         )
-        
         if result.modified_count == 0:
             # Check if job exists
             job = jobs_collection.find_one({'_id': ObjectId(job_id)})
             if not job:
                 return jsonify({'error': 'Job not found'}), 404
             return jsonify({'error': 'No changes were made to the job'}), 400
+        bump_version('jobs')
+        invalidate_public_job(job_id)
         
         # Fetch and return the updated job
         updated_job = jobs_collection.find_one({'_id': ObjectId(job_id)})
         
         if updated_job:
-            updated_job['_id'] = str(updated_job['_id'])
-            updated_job['id'] = str(updated_job['_id'])
+            updated_job['id'] = updated_job['_id']
             return jsonify(updated_job)
         else:
             return jsonify({'error': 'Failed to fetch updated job'}), 500
             
     except Exception as e:
-        print(f"Error updating job: {str(e)}")
+        logger.exception('Error updating job')
         return jsonify({'error': f'Error updating job: {str(e)}'}), 500
 
 @app.route('/api/jobs/<job_id>', methods=['DELETE'])
@@ -1540,17 +4061,52 @@ def delete_job(current_user, job_id):
             }), 400
         
         result = jobs_collection.delete_one({'_id': ObjectId(job_id)})
-        
         if result.deleted_count == 0:
             return jsonify({'error': 'Job not found'}), 404
+        bump_version('jobs')
+        invalidate_public_job(job_id)
             
         return jsonify({'message': 'Job deleted successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+def jobs_with_submissions(job_ids):
+    """Map job IDs that still have submissions to the reason they cannot be deleted"""
+    linked = submissions_collection.distinct('job_id', {'job_id': {'$in': [str(job_id) for job_id in job_ids]}})
+    message = 'Cannot delete job with existing submissions. Please delete the submissions first.'
+    return {ObjectId(job_id): message for job_id in linked}
+
+@app.route('/api/jobs/bulk', methods=['POST'])
+@token_required
+def bulk_jobs(current_user):
+    """Create, update and delete many jobs in one request"""
+    operations, ordered, error = parse_bulk_request()
+    if error:
+        return jsonify({'error': error}), 400
+    
+    try:
+        report = run_bulk_write(
+            jobs_collection,
+            str(current_user['_id']),
+            operations,
+            ordered,
+            build_create=lambda data: build_job_doc(data, current_user),
+            build_update=build_job_update,
+            check_deletes=jobs_with_submissions
+        )
+        for result in report['results']:
+            if result['status'] == 'success' and result['op'] in ('update', 'delete'):
+                invalidate_public_job(result['id'])
+        return jsonify(report)
+    except Exception as e:
+        logger.exception('Error in bulk_jobs')
+        return jsonify({'error': str(e)}), 500
+
 # =============================================
 # ATS (Applicant Tracking System) Routes
 # =============================================
+SKILLS_PROMPT_VERSION = 1
+
 def extract_skills_gemini(text):
     """Extract skills from text using Gemini AI"""
     try:
@@ -1569,7 +4125,7 @@ def extract_skills_gemini(text):
         Text:
         """ + text
 
-        response = model.generate_content(prompt)
+        response = generate_llm_content(prompt, 'extract_skills', SKILLS_PROMPT_VERSION)
         skills = response.text.strip()
         
         # Clean up the skills list
@@ -1584,18 +4140,18 @@ def extract_skills_gemini(text):
         # Join back into a comma-separated string
         return skill_list
 
-    except Exception as e:
-        print(f"Error extracting skills: {str(e)}")
+    except Exception:
+        logger.exception('Error extracting skills')
         return []
 
 def batch_embed(texts):
     """Batch process embeddings with caching"""
     try:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        embeddings = model.encode(texts)
+        with STAGE_LATENCY.labels('embedding').time():
+            embeddings = get_embedding_model().encode(texts)
         return embeddings
-    except Exception as e:
-        print(f"Error in batch embedding: {str(e)}")
+    except Exception:
+        logger.exception('Error in batch embedding')
         return None
 
 def calculate_resume_scores(job_description, resumes, target_percentage):
@@ -1621,7 +4177,7 @@ def calculate_resume_scores(job_description, resumes, target_percentage):
 
             if match_percentage >= target_percentage:
                 matching_resumes.append({
-                    'id': str(resume['_id']),
+                    'id': resume['_id'],
                     'name': resume.get('name', ''),
                     'email': resume.get('email', ''),
                     'phone_number': resume.get('phone_number', ''),
@@ -1637,7 +4193,7 @@ def calculate_resume_scores(job_description, resumes, target_percentage):
         return matching_resumes, None
 
     except Exception as e:
-        print(f"Error calculating resume scores: {str(e)}")
+        logger.exception('Error calculating resume scores')
         return [], str(e)
 
 @app.route('/api/ats-score', methods=['POST'])
@@ -1653,7 +4209,7 @@ def ats_score(current_user):
         match_threshold = float(data.get('match_threshold', 70))
         
         # Get all resumes for the current user
-        resumes = list(resumes_collection.find({'user_id': str(current_user['_id'])}))
+        resumes = list(resumes_collection.find({'user_id': str(current_user['_id'])}, HEAVY_RESUME_FIELDS))
         if not resumes:
             return jsonify({
                 'results': [],
@@ -1675,7 +4231,7 @@ def ats_score(current_user):
         })
         
     except Exception as e:
-        print(f"Error in ats_score: {str(e)}")
+        logger.exception('Error in ats_score')
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/public_applications/<application_id>', methods=['DELETE'])
@@ -1699,6 +4255,7 @@ def delete_public_application(current_user, application_id):
             
         # Delete the application
         result = public_applications_collection.delete_one({'_id': ObjectId(application_id)})
+        bump_version('public_applications')
         if result.deleted_count == 0:
             return jsonify({'error': 'Failed to delete application'}), 500
             
@@ -1707,7 +4264,8 @@ def delete_public_application(current_user, application_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/resumes/count', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('resumes')
 def get_resumes_count(current_user):
     """Get the total count of resumes in the collection and last modified timestamp"""
     try:
@@ -1720,7 +4278,7 @@ def get_resumes_count(current_user):
         count = resumes_collection.count_documents({})
         return jsonify({
             'count': count,
-            'last_modified': last_modified['updated_at'].isoformat() if last_modified and 'updated_at' in last_modified else None
+            'last_modified': last_modified.get('updated_at') if last_modified else None
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1729,65 +4287,47 @@ def get_resumes_count(current_user):
 # Public Routes
 # =============================================
 @app.route('/api/public/recruiters', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('recruiters')
 def get_public_recruiters(current_user):
     """Get all recruiters from all users"""
     try:
-        recruiters = list(recruiters_collection.find({}))
-        for recruiter in recruiters:
-            recruiter['_id'] = str(recruiter['_id'])
-            recruiter['id'] = str(recruiter['_id'])
+        recruiters = with_ids(list(recruiters_collection.find({})))
         return jsonify(recruiters)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/public/jobs', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('jobs')
 def get_public_jobs(current_user):
     """Get all jobs from all users"""
     try:
-        jobs = list(jobs_collection.find({}))
-        for job in jobs:
-            job['_id'] = str(job['_id'])
-            job['id'] = str(job['_id'])
+        jobs = with_ids(list(jobs_collection.find({})))
         return jsonify(jobs)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/public/submissions', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('submissions')
 def get_public_submissions(current_user):
     """Get all submissions from all users"""
     try:
-        submissions = list(submissions_collection.find({}))
-        for submission in submissions:
-            submission['_id'] = str(submission['_id'])
-            submission['id'] = str(submission['_id'])
-            # Remove sensitive data
-            if 'file_data' in submission:
-                del submission['file_data']
-            if 'resume_data' in submission:
-                del submission['resume_data']
-            if 'text_content' in submission:
-                del submission['text_content']
+        # Leave out sensitive and binary data
+        submissions = with_ids(list(submissions_collection.find({}, HEAVY_SUBMISSION_FIELDS)))
         return jsonify(submissions)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/public/resumes', methods=['GET'])
-@token_required
+@token_claims_required
+@conditional_get('resumes')
 def get_public_resumes(current_user):
     """Get all resumes from all users"""
     try:
-        resumes = list(resumes_collection.find({}))
-        for resume in resumes:
-            resume['_id'] = str(resume['_id'])
-            resume['id'] = str(resume['_id'])
-            # Remove sensitive data
-            if 'file_data' in resume:
-                del resume['file_data']
-            if 'text_content' in resume:
-                del resume['text_content']
+        # Leave out sensitive and binary data
+        resumes = with_ids(list(resumes_collection.find({}, HEAVY_RESUME_FIELDS)))
         return jsonify(resumes)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1798,6 +4338,7 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 @app.route('/api/process-and-store-resume', methods=['POST', 'OPTIONS'])
+@admission_control
 def process_and_store_resume():
     if request.method == 'OPTIONS':
         response = make_response()
@@ -1856,7 +4397,8 @@ def process_and_store_resume():
 
         try:
             # Check if resume with this email already exists
-            existing_resume = resumes_collection.find_one({'email': resume_data['email']}) if resume_data.get('email') else None
+            email_normalized = normalize_email(resume_data.get('email'))
+            existing_resume = resumes_collection.find_one({'email_normalized': email_normalized}) if email_normalized else None
             
             # Prepare document for MongoDB - store data at root level
             resume_doc = {
@@ -1865,6 +4407,7 @@ def process_and_store_resume():
                 'text_content': text_content,
                 'name': resume_data.get('name', ''),
                 'email': resume_data.get('email', ''),
+                'email_normalized': email_normalized,
                 'phone_number': resume_data.get('phone_number', ''),
                 'linkedin': resume_data.get('linkedin', ''),
                 'job_title': resume_data.get('job_title', ''),
@@ -1875,22 +4418,27 @@ def process_and_store_resume():
                 'skills': resume_data.get('skills', ''),
                 'education': resume_data.get('education', ''),
                 'visa': resume_data.get('visa', ''),
-                'resume_summary': resume_data.get('professional_profile', ''),
+                'resume_summary': resume_data.get('professional_summary_resume', ''),
                 'experience': resume_data.get('experience_details', []),
                 'category': resume_data.get('category', ''),
-                'updated_at': datetime.utcnow()
+                'updated_at': datetime.utcnow(),
+                **extraction_stamp(text_content)
             }
 
             # If email exists, update the existing document, otherwise insert new
             if existing_resume and resume_data.get('email'):
                 # Keep existing values if new values are empty
                 for key in resume_doc:
-                    if key not in ['file_name', 'file_data', 'text_content', 'updated_at'] and not resume_doc[key]:
+                    if key not in ['file_name', 'file_data', 'text_content', 'email_normalized', 'updated_at', 'text_hash', 'prompt_version'] and not resume_doc[key]:
                         resume_doc[key] = existing_resume.get(key, '')
-                
+
+            resume_doc.update(compute_resume_facets(resume_doc))
+            resume_doc['embedding'] = embed_resume(resume_doc)
+
+            if existing_resume and resume_data.get('email'):
                 # Update existing resume
                 result = resumes_collection.update_one(
-                    {'email': resume_data['email']},
+                    {'_id': existing_resume['_id']},
                     {'$set': resume_doc}
                 )
                 resume_id = str(existing_resume['_id'])
@@ -1901,6 +4449,7 @@ def process_and_store_resume():
                 result = resumes_collection.insert_one(resume_doc)
                 resume_id = str(result.inserted_id)
                 # print(f"Inserted new resume with ID: {resume_id}")  # Comment out debug print
+            bump_version('resumes')
 
             # Return the processed information
             return jsonify({
@@ -1946,9 +4495,423 @@ def extract_skills(current_user):
         })
         
     except Exception as e:
-        print(f"Error in extract_skills: {str(e)}")
+        logger.exception('Error in extract_skills')
         return jsonify({'error': str(e)}), 500
 
+# =============================================
+# Maintenance Commands
+# =============================================
+@app.cli.command('backfill-email-normalized')
+def backfill_email_normalized():
+    """Populate email_normalized on resumes stored before the field existed"""
+    batch_size = 1000
+    updated = 0
+    conflicts = 0
+    operations = []
+
+    def flush():
+        nonlocal updated, conflicts
+        if not operations:
+            return
+        try:
+            updated += resumes_collection.bulk_write(operations, ordered=False).modified_count
+        except BulkWriteError as e:
+            updated += e.details.get('nModified', 0)
+            conflicts += len(e.details.get('writeErrors', []))
+        operations.clear()
+
+    cursor = resumes_collection.find(
+        {'email_normalized': {'$exists': False}, 'email': {'$type': 'string'}},
+        {'email': 1}
+    ).batch_size(batch_size)
+    for resume in cursor:
+        operations.append(UpdateOne(
+            {'_id': resume['_id']},
+            {'$set': {'email_normalized': normalize_email(resume['email'])}}
+        ))
+        if len(operations) >= batch_size:
+            flush()
+    flush()
+
+    bump_version('resumes')
+    click.echo(f"Backfilled email_normalized on {updated} resumes")
+    if conflicts:
+        # Casing variants of an address already stored for the same user
+        click.echo(f"{conflicts} resumes duplicate another resume's email for the same user and were left unset; run dedupe-resumes")
+
+# Fields that describe one uploaded file and its extraction; never copied between merged resumes
+RESUME_FILE_FIELDS = {
+    '_id', 'user_id', 'created_at', 'updated_at', 'filename', 'file_name', 'content_type', 'file_data',
+    'text_content', 'text_hash', 'prompt_version', 'embedding', 'extraction_retries'
+}
+
+def merge_duplicate_resumes(resume_ids):
+    """Merge resumes of one user that share an email into the most recently updated one"""
+    resumes = list(resumes_collection.find({'_id': {'$in': resume_ids}}))
+    if len(resumes) < 2:
+        return 0
+    resumes.sort(
+        key=lambda resume: (resume['updated_at'] if isinstance(resume.get('updated_at'), datetime) else datetime.min, resume['_id']),
+        reverse=True
+    )
+    survivor, duplicates = resumes[0], resumes[1:]
+
+    # Fields the survivor lacks are filled in from the next most recent resume that has them
+    update = {'email_normalized': normalize_email(survivor['email'])}
+    for duplicate in duplicates:
+        for field, value in duplicate.items():
+            if field in RESUME_FILE_FIELDS or field in update or value in (None, '', []):
+                continue
+            if survivor.get(field) in (None, '', []):
+                update[field] = value
+    created = [resume['created_at'] for resume in resumes if isinstance(resume.get('created_at'), datetime)]
+    if created:
+        update['created_at'] = min(created)
+    if any(field in update for field in ('total_experience', 'location', 'category', 'education')):
+        update.update(compute_resume_facets({**survivor, **update}))
+
+    duplicate_ids = [duplicate['_id'] for duplicate in duplicates]
+    public_applications_collection.update_many(
+        {'resume_id': {'$in': [str(resume_id) for resume_id in duplicate_ids]}},
+        {'$set': {'resume_id': str(survivor['_id'])}}
+    )
+    resumes_collection.delete_many({'_id': {'$in': duplicate_ids}})
+    resumes_collection.update_one({'_id': survivor['_id']}, {'$set': update})
+    return len(duplicate_ids)
+
+@app.cli.command('dedupe-resumes')
+@click.option('--dry-run', is_flag=True, help='Only report how many resumes would be merged')
+def dedupe_resumes(dry_run):
+    """Merge resumes that share a user and email (ignoring case) so the unique (user_id, email) index can be built"""
+    merged = 0
+    groups = 0
+
+    def merge_user(by_email):
+        nonlocal merged, groups
+        for resume_ids in by_email.values():
+            if len(resume_ids) > 1:
+                groups += 1
+                merged += len(resume_ids) - 1 if dry_run else merge_duplicate_resumes(resume_ids)
+
+    # Sorted by user, so only one user's emails are held in memory at a time
+    cursor = resumes_collection.find(
+        {'user_id': {'$type': 'string'}, 'email': {'$type': 'string', '$ne': ''}},
+        {'user_id': 1, 'email': 1}
+    ).sort('user_id', 1).batch_size(1000)
+    current_user_id = None
+    by_email = {}
+    for resume in cursor:
+        if resume['user_id'] != current_user_id:
+            merge_user(by_email)
+            current_user_id, by_email = resume['user_id'], {}
+        email = normalize_email(resume['email'])
+        if email:
+            by_email.setdefault(email, []).append(resume['_id'])
+    merge_user(by_email)
+
+    if dry_run:
+        click.echo(f"{merged} resumes in {groups} groups would be merged")
+        return
+    if merged:
+        bump_version('resumes')
+    ensure_indexes()
+    click.echo(f"Merged {merged} duplicate resumes into {groups} resumes")
+
+@app.cli.command('dedupe-job-links')
+def dedupe_job_links():
+    """Give every job that shares its shareable link with an older job a link of its own"""
+    pipeline = [
+        {'$match': {'shareable_link': {'$type': 'string'}}},
+        {'$group': {'_id': '$shareable_link', 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}}
+    ]
+    relinked = 0
+    for group in jobs_collection.aggregate(pipeline):
+        # The oldest job keeps the link that has already been shared
+        for job_id in sorted(group['ids'])[1:]:
+            jobs_collection.update_one(
+                {'_id': job_id},
+                {'$set': {'shareable_link': f"{group['_id']}-{uuid.uuid4().hex[:12]}", 'updated_at': datetime.utcnow()}}
+            )
+            invalidate_public_job(job_id)
+            relinked += 1
+
+    if relinked:
+        bump_version('jobs')
+    ensure_indexes()
+    click.echo(f"Gave {relinked} jobs a new shareable link")
+
+@app.cli.command('backfill-resume-facets')
+@click.option('--all', 'recompute_all', is_flag=True, help='Recompute facets on every resume, e.g. after the parsers change')
+def backfill_resume_facets(recompute_all):
+    """Compute facet fields for resumes stored before they existed"""
+    batch_size = 1000
+    updated = 0
+    operations = []
+    cursor = resumes_collection.find(
+        {} if recompute_all else {'education_level': {'$exists': False}},
+        {'total_experience': 1, 'location': 1, 'category': 1, 'education': 1}
+    ).batch_size(batch_size)
+    for resume in cursor:
+        facets = compute_resume_facets({
+            'total_experience': resume.get('total_experience'),
+            'location': resume.get('location'),
+            'category': resume.get('category'),
+            'education': resume.get('education')
+        })
+        operations.append(UpdateOne({'_id': resume['_id']}, {'$set': facets}))
+        if len(operations) >= batch_size:
+            updated += resumes_collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += resumes_collection.bulk_write(operations, ordered=False).modified_count
+
+    bump_version('resumes')
+    click.echo(f"Backfilled facet fields on {updated} resumes")
+
+@app.cli.command('backfill-resume-embeddings')
+def backfill_resume_embeddings():
+    """Compute embeddings for resumes stored before semantic search existed"""
+    batch_size = 64
+    updated = 0
+    batch = []
+
+    def flush():
+        nonlocal updated
+        if not batch:
+            return
+        vectors = get_embedding_model().encode([build_embedding_text(resume) for resume in batch], normalize_embeddings=True)
+        operations = [
+            UpdateOne({'_id': resume['_id']}, {'$set': {'embedding': [float(value) for value in vector]}})
+            for resume, vector in zip(batch, vectors)
+        ]
+        updated += resumes_collection.bulk_write(operations, ordered=False).modified_count
+        batch.clear()
+
+    cursor = resumes_collection.find(
+        {'embedding': {'$exists': False}},
+        {'job_title': 1, 'current_role': 1, 'skills': 1, 'category': 1, 'education': 1, 'text_content': 1}
+    ).batch_size(batch_size)
+    for resume in cursor:
+        if build_embedding_text(resume):
+            batch.append(resume)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    bump_version('resumes')
+    click.echo(f"Backfilled embeddings on {updated} resumes")
+
+@app.cli.command('reprocess-resumes')
+@click.option('--batch-size', default=200, help='Resumes read and written per batch')
+@click.option('--workers', default=4, help='Extractions running at once')
+@click.option('--rate', default=60.0, help='Extractions started per minute, to stay under the Gemini quota')
+@click.option('--checkpoint', default='reprocess-checkpoint.json', help='Progress file used to resume after a crash')
+@click.option('--restart', is_flag=True, help='Ignore an existing checkpoint')
+@click.option('--force', is_flag=True, help='Re-extract even if the text and prompt version are unchanged')
+@click.option('--user-id', default=None, help="Only reprocess this user's resumes")
+def reprocess_resumes(batch_size, workers, rate, checkpoint, restart, force, user_id):
+    """Re-extract stored resumes with the current prompt, in parallel and resumably"""
+    # failed_ids: resumes before last_id whose extraction failed, retried at the end of each run
+    state = {'prompt_version': RESUME_PROMPT_VERSION, 'last_id': None, 'updated': 0, 'skipped': 0, 'failed_ids': [], 'conflicts': 0}
+    if not restart and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            saved = json.load(f)
+        if saved.get('prompt_version') == RESUME_PROMPT_VERSION:
+            state.update(saved)
+            click.echo(f"Resuming after resume {state['last_id']} ({state['updated']} updated so far)")
+        else:
+            click.echo('Checkpoint was written for another prompt version; starting over')
+
+    def save_checkpoint():
+        with open(checkpoint + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(checkpoint + '.tmp', checkpoint)
+
+    # One bucket shared by all workers keeps the whole job under the LLM rate limit
+    bucket = TokenBucket(rate / 60, max(1, workers))
+    bucket_lock = threading.Lock()
+
+    def reextract(resume):
+        while True:
+            with bucket_lock:
+                delay = bucket.take()
+            if not delay:
+                break
+            time.sleep(delay)
+        return extract_resume_info(resume['text_content'])
+
+    def is_current(resume):
+        stamp = extraction_stamp(resume['text_content'])
+        return resume.get('text_hash') == stamp['text_hash'] and resume.get('prompt_version') == stamp['prompt_version']
+
+    def run_batch(batch, retry=False):
+        pending = batch if force else [resume for resume in batch if not is_current(resume)]
+        state['skipped'] += len(batch) - len(pending)
+        futures = {executor.submit(reextract, resume): resume for resume in pending}
+
+        updates = []
+        for future in as_completed(futures):
+            resume = futures[future]
+            try:
+                resume_info = future.result()
+            except Exception:
+                logger.exception('Reprocessing failed', extra={'resume_id': str(resume['_id'])})
+                resume_info = None
+            if not resume_info or not resume_info.get('email'):
+                # Left unstamped and recorded, since the checkpoint moves past it
+                state['failed_ids'].append(str(resume['_id']))
+                continue
+            update = {
+                **resume_fields_from_extraction(resume_info),
+                **extraction_stamp(resume['text_content']),
+                'updated_at': datetime.utcnow()
+            }
+            update.update(compute_resume_facets(update))
+            updates.append((resume, update))
+
+        embeddable = [(update, build_embedding_text({**resume, **update})) for resume, update in updates]
+        embeddable = [(update, text) for update, text in embeddable if text]
+        if embeddable:
+            vectors = get_embedding_model().encode([text for _, text in embeddable], normalize_embeddings=True)
+            for (update, _), vector in zip(embeddable, vectors):
+                update['embedding'] = [float(value) for value in vector]
+
+        if updates:
+            operations = [UpdateOne({'_id': resume['_id']}, {'$set': update}) for resume, update in updates]
+            try:
+                state['updated'] += resumes_collection.bulk_write(operations, ordered=False).modified_count
+            except BulkWriteError as e:
+                state['updated'] += e.details.get('nModified', 0)
+                state['conflicts'] += len(e.details.get('writeErrors', []))
+            bump_version('resumes')
+
+        # Batches finish in _id order, so everything up to here is done or in failed_ids
+        if not retry:
+            state['last_id'] = str(batch[-1]['_id'])
+        save_checkpoint()
+        click.echo(f"Up to {state['last_id']}: {state['updated']} updated, {state['skipped']} unchanged, {len(state['failed_ids'])} failed")
+
+    query = {'text_content': {'$type': 'string', '$ne': ''}}
+    if user_id:
+        query['user_id'] = user_id
+    if state['last_id']:
+        query['_id'] = {'$gt': ObjectId(state['last_id'])}
+    cursor = resumes_collection.find(query, {'file_data': 0, 'embedding': 0}).sort('_id', 1).batch_size(batch_size)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='reprocess') as executor:
+        batch = []
+        for resume in cursor:
+            batch.append(resume)
+            if len(batch) >= batch_size:
+                run_batch(batch)
+                batch = []
+        if batch:
+            run_batch(batch)
+
+        # Give earlier failures (from this run or, via the checkpoint, an interrupted one) another try
+        retry_ids = list(state['failed_ids'])
+        for start in range(0, len(retry_ids), batch_size):
+            chunk = set(retry_ids[start:start + batch_size])
+            # run_batch records the ones that fail again; the checkpoint keeps the rest until it is saved
+            state['failed_ids'] = [resume_id for resume_id in state['failed_ids'] if resume_id not in chunk]
+            batch = list(resumes_collection.find(
+                {**query, '_id': {'$in': [ObjectId(resume_id) for resume_id in chunk]}},
+                {'file_data': 0, 'embedding': 0}
+            ).sort('_id', 1))
+            if batch:
+                run_batch(batch, retry=True)
+
+    if state['failed_ids']:
+        save_checkpoint()
+    elif os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    click.echo(f"Reprocessed {state['updated']} resumes; {state['skipped']} were already current")
+    if state['failed_ids']:
+        click.echo(f"{len(state['failed_ids'])} resumes could not be extracted and were left unchanged; rerun to retry them")
+    if state['conflicts']:
+        click.echo(f"{state['conflicts']} resumes now share an email with another resume of the same user and were not updated")
+
+@app.cli.command('clear-llm-cache')
+@click.option('--operation', default=None, help='Only clear responses for this operation, e.g. extract_resume_info')
+@click.option('--prompt-version', default=None, help='Only clear responses for this prompt version')
+def clear_llm_cache(operation, prompt_version):
+    """Delete cached Gemini responses, all of them or those matching the filters"""
+    connection = get_llm_cache()
+    if connection is None:
+        click.echo('LLM_CACHE_PATH is empty; the LLM response cache is disabled')
+        return
+    conditions = []
+    params = []
+    if operation:
+        conditions.append('operation = ?')
+        params.append(operation)
+    if prompt_version:
+        conditions.append('prompt_version = ?')
+        params.append(prompt_version)
+    where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+    deleted = connection.execute(f'DELETE FROM llm_responses{where}', params).rowcount
+    remaining, size = connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses').fetchone()
+    click.echo(f"Deleted {deleted} cached responses; {remaining} remain ({size / 1024 / 1024:.1f} MB)")
+
+# Imported lazily by request handlers; measured separately by startup-report
+LAZY_MODULES = ['google.generativeai', 'sentence_transformers', 'numpy', 'PyPDF2', 'docx2txt']
+
+def preload_shared_state():
+    """Load read-only heavy state in a preloading gunicorn master so forked workers share it copy-on-write"""
+    for module in ['google.generativeai', 'PyPDF2', 'docx2txt', 'numpy']:
+        __import__(module)
+    if os.getenv('PRELOAD_EMBEDDING_MODEL', '0') == '1':
+        get_embedding_model()
+
+def parse_importtime(output):
+    """Parse `python -X importtime` output into {module: (self_us, cumulative_us)}"""
+    timings = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+@app.cli.command('startup-report')
+@click.option('--top', default=20, help='Number of packages to list')
+def startup_report(top):
+    """Show per-package import cost of the app and of its lazily imported dependencies"""
+    import resource
+
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=app_dir, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    timings = parse_importtime(result.stderr)
+
+    # Attribute each module's own time to its top-level package
+    packages = {}
+    for module, (self_us, _) in timings.items():
+        package = module.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+
+    app_ms = timings.get('app', (0, 0))[1] / 1000
+    rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    click.echo(f"import app: {app_ms:.1f} ms cumulative, {wall_ms:.1f} ms wall, peak RSS {rss_mb:.1f} MB")
+    click.echo(f"{'package':<32}{'self ms':>10}")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        click.echo(f"{package:<32}{self_us / 1000:>10.1f}")
+
+    click.echo("\nDeferred until first use:")
+    for module in LAZY_MODULES:
+        lazy = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=app_dir, capture_output=True, text=True
+        )
+        cumulative_us = parse_importtime(lazy.stderr).get(module, (0, 0))[1]
+        status = f"{cumulative_us / 1000:.1f} ms" if lazy.returncode == 0 else 'not installed'
+        click.echo(f"{module:<32}{status:>10}")
+
 # =============================================
 # Application Entry Point
 # =============================================
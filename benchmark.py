@@ -0,0 +1,308 @@
+"""
+Benchmarks for the ATS backend.
+
+Drives app.py through the Flask test client against a local mongod or an
+in-memory mongomock stand-in. Gemini and the embedding model are replaced by
+fast deterministic fakes, so results measure this code rather than the network.
+Reports p50/p95/p99 latency and throughput per endpoint at each corpus size as
+JSON, and can compare a run against an earlier one.
+
+    python benchmark.py --sizes 1000,10000 --output bench.json
+    python benchmark.py --mongo-uri mongodb://localhost:27017/ --sizes 1000,10000,100000
+    python benchmark.py --compare bench-main.json --output bench.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from generate_corpus import (
+    FIRST_NAMES, LOCATIONS, SKILLS, FakeEmbeddingModel, add_embeddings, make_candidate, make_pdf,
+    make_resume_doc, resume_text
+)
+
+# =============================================
+# Fake Backends
+# =============================================
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeGeminiModel:
+    """Stands in for Gemini: answers extraction prompts from the resume text itself"""
+
+    def __init__(self, latency_ms=0):
+        self.latency = latency_ms / 1000
+
+    def generate_content(self, prompt, generation_config=None):
+        if self.latency:
+            time.sleep(self.latency)
+        if 'Resume Text:' in prompt:
+            return FakeResponse(json.dumps(self.extract_resume(prompt.split('Resume Text:', 1)[1])))
+        # Skill extraction for ATS scoring
+        found = [skill for skill in SKILLS if skill.lower() in prompt.lower()]
+        return FakeResponse(', '.join(found or SKILLS[:5]))
+
+    def extract_resume(self, text):
+        fields = dict(re.findall(r'^\s*(Email|Phone|Location|Skills|Title|Company|Experience|Education|Category):\s*(.+)$', text, re.M))
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        return {
+            'name': lines[0] if lines else '',
+            'email': fields.get('Email', ''),
+            'phone_number': fields.get('Phone', ''),
+            'location': fields.get('Location', ''),
+            'current_role': fields.get('Title', ''),
+            'current_company': fields.get('Company', ''),
+            'total_experience': fields.get('Experience', ''),
+            'education': fields.get('Education', ''),
+            'category': fields.get('Category', ''),
+            'skills': fields.get('Skills', ''),
+            'experience_details': []
+        }
+
+# =============================================
+# Benchmark Runner
+# =============================================
+def load_app(args):
+    """Import app.py with quiet logging, a benchmark database and fake model backends"""
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('LLM_CACHE_PATH', '')  # Every run should measure uncached LLM calls
+    os.environ.setdefault('GOOGLE_API_KEY', 'benchmark')
+    os.environ['MONGO_DB_NAME'] = args.database
+    os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    if args.mongo_uri:
+        os.environ['MONGO_URI'] = args.mongo_uri
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+
+    if not args.mongo_uri:
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit('mongomock is not installed; install it or pass --mongo-uri for a local mongod')
+        app_module.MongoClient = mongomock.MongoClient
+        app_module.init_db()
+
+    gemini = FakeGeminiModel(args.llm_latency_ms)
+    app_module.get_gemini_model = lambda: gemini
+    if not args.real_embeddings:
+        embedding_model = FakeEmbeddingModel()
+        app_module.get_embedding_model = lambda: embedding_model
+        app_module._embedding_model = embedding_model  # Marks the model as loaded, so no warm-up starts
+    return app_module
+
+def reset_database(app_module):
+    """Drop the benchmark database and recreate its indexes"""
+    app_module.client.drop_database(app_module.app.config['MONGO_DB_NAME'])
+    app_module.init_db()
+    app_module.ensure_indexes()
+    app_module._indexes_ready = True
+
+def login(client, suffix):
+    """Create a benchmark user and return auth headers"""
+    credentials = {'username': f'bench{suffix}', 'email': f'bench{suffix}@example.com', 'password': 'Bench-Password1!'}
+    client.post('/api/auth/signup', json=credentials)
+    response = client.post('/api/auth/login', json={'username': credentials['username'], 'password': credentials['password']})
+    return {'Authorization': f"Bearer {response.get_json()['token']}", 'Accept-Encoding': 'gzip'}
+
+def seed(app_module, size, user_id, rng, batch_size=1000):
+    """Insert `size` resumes plus proportional jobs, recruiters, submissions and applications"""
+    embedding_model = app_module.get_embedding_model()
+    for start in range(0, size, batch_size):
+        docs = [make_resume_doc(app_module, make_candidate(i, rng), user_id)
+                for i in range(start, min(start + batch_size, size))]
+        add_embeddings(app_module, docs, embedding_model)
+        app_module.resumes_collection.insert_many(docs)
+
+    job_count = max(10, size // 100)
+    now = datetime.utcnow()
+    jobs = [{
+        'title': f'Job {i}', 'client': 'Acme', 'location': rng.choice(LOCATIONS), 'bill_rate': '80',
+        'visas': 'Any', 'description': 'Looking for ' + ', '.join(rng.sample(SKILLS, 5)),
+        'url': f'job-{i}', 'shareable_link': f'share-bench-{i}', 'user_id': user_id,
+        'created_at': now, 'updated_at': now
+    } for i in range(job_count)]
+    job_ids = app_module.jobs_collection.insert_many(jobs).inserted_ids
+    recruiter_ids = app_module.recruiters_collection.insert_many([{
+        'name': f'Recruiter {i}', 'email': f'recruiter{i}@example.com', 'company': 'Acme', 'user_id': user_id, 'created_at': now
+    } for i in range(max(5, size // 200))]).inserted_ids
+    app_module.submissions_collection.insert_many([{
+        'job_id': str(rng.choice(job_ids)), 'recruiter_id': str(rng.choice(recruiter_ids)), 'user_id': user_id,
+        'candidate_name': f'Candidate {i}', 'candidate_email': f'candidate{i}@example.com', 'candidate_city': 'Dallas',
+        'candidate_state': 'TX', 'candidate_country': 'USA', 'visa': 'H1B', 'pay_rate': '60', 'status': 'Submitted',
+        'created_at': now, 'updated_at': now
+    } for i in range(max(10, size // 10))])
+    app_module.public_applications_collection.insert_many([{
+        'job_id': rng.choice(job_ids), 'name': f'Applicant {i}', 'email': f'applicant{i}@example.com',
+        'status': 'Submitted', 'created_at': now, 'updated_at': now
+    } for i in range(max(10, size // 10))])
+
+def endpoint_requests(rng):
+    """Named request builders; each returns (method, path, kwargs) for the test client"""
+    def upload():
+        candidate = make_candidate(rng.randint(10 ** 6, 10 ** 7), rng)
+        pdf = make_pdf(resume_text(candidate).splitlines())
+        return 'POST', '/api/resumes', {
+            'data': {'file': [(io.BytesIO(pdf), 'resume.pdf')]},
+            'content_type': 'multipart/form-data'
+        }
+
+    def search(search_type, term):
+        return lambda: ('POST', '/api/resumes/search', {'json': {'search_type': search_type, 'search_term': term()}})
+
+    return {
+        'upload_resume': upload,
+        'search_resumes:skills': search('skills', lambda: ', '.join(rng.sample(SKILLS, 2))),
+        'search_resumes:email': search('email', lambda: rng.choice(FIRST_NAMES).lower()),
+        'search_resumes:hybrid': search('hybrid', lambda: ' '.join(rng.sample(SKILLS, 2))),
+        'search_resumes:faceted': lambda: ('POST', '/api/resumes/search', {'json': {
+            'search_type': 'faceted', 'filters': {'location': 'Texas'}, 'search_term': ''
+        }}),
+        'ats_score': lambda: ('POST', '/api/ats-score', {'json': {
+            'job_description': 'Looking for ' + ', '.join(rng.sample(SKILLS, 5)), 'match_threshold': 40
+        }}),
+        'get_public_applications': lambda: ('GET', '/api/public_applications', {}),
+        'list:resumes': lambda: ('GET', '/api/resumes', {}),
+        'list:jobs': lambda: ('GET', '/api/jobs', {}),
+        'list:recruiters': lambda: ('GET', '/api/recruiters', {}),
+        'list:submissions': lambda: ('GET', '/api/submissions', {}),
+        'list:resumes_count': lambda: ('GET', '/api/resumes/count', {})
+    }
+
+# Aggregations mongomock cannot run ($project alongside $facet); measured against mongod only.
+# Hybrid search still runs on mongomock, with only the semantic signal ($text is unsupported).
+MONGOMOCK_UNSUPPORTED = {'search_resumes:faceted'}
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def measure(client, headers, build_request, iterations, warmup):
+    """Run one endpoint repeatedly, returning latency statistics in milliseconds"""
+    latencies = []
+    errors = 0
+    total_started = time.perf_counter()
+    for iteration in range(warmup + iterations):
+        method, path, kwargs = build_request()
+        started = time.perf_counter()
+        response = client.open(path, method=method, headers=headers, **kwargs)
+        response.get_data()
+        elapsed = (time.perf_counter() - started) * 1000
+        if iteration < warmup:
+            total_started = time.perf_counter()
+            continue
+        latencies.append(elapsed)
+        if response.status_code >= 400:
+            errors += 1
+    wall = time.perf_counter() - total_started
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(latencies[-1], 3),
+        'throughput_rps': round(iterations / wall, 2) if wall else None
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, baseline_path, threshold):
+    """Print p50/p95 ratios against a baseline run; return True if any p95 regressed past the threshold"""
+    with open(baseline_path) as f:
+        baseline = {(row['size'], row['endpoint']): row for row in json.load(f)['results']}
+    regressed = False
+    print(f"\n{'size':>8} {'endpoint':<28}{'p50 ratio':>10}{'p95 ratio':>10}", file=sys.stderr)
+    for row in results:
+        before = baseline.get((row['size'], row['endpoint']))
+        if not before:
+            continue
+        p50_ratio = row['p50_ms'] / before['p50_ms'] if before['p50_ms'] else float('inf')
+        p95_ratio = row['p95_ms'] / before['p95_ms'] if before['p95_ms'] else float('inf')
+        flag = '  REGRESSION' if p95_ratio > threshold else ''
+        regressed = regressed or bool(flag)
+        print(f"{row['size']:>8} {row['endpoint']:<28}{p50_ratio:>10.2f}{p95_ratio:>10.2f}{flag}", file=sys.stderr)
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ATS backend endpoints at several corpus sizes')
+    parser.add_argument('--sizes', default='1000,10000', help='Comma-separated resume counts (e.g. 1000,10000,100000)')
+    parser.add_argument('--iterations', type=int, default=30, help='Measured requests per endpoint and size')
+    parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests before each endpoint')
+    parser.add_argument('--endpoints', help='Comma-separated subset of endpoint names to run')
+    parser.add_argument('--mongo-uri', help='Use a local mongod instead of the in-memory stand-in')
+    parser.add_argument('--database', default='ats_benchmark', help='Database dropped and reseeded for each size')
+    parser.add_argument('--llm-latency-ms', type=float, default=0, help='Simulated Gemini latency per call')
+    parser.add_argument('--real-embeddings', action='store_true', help='Use the sentence-transformers model instead of the fake')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for data and requests')
+    parser.add_argument('--output', help='Write JSON results here (default: stdout)')
+    parser.add_argument('--compare', help='Earlier JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2, help='p95 ratio above which --compare fails')
+    args = parser.parse_args()
+
+    app_module = load_app(args)
+    client = app_module.app.test_client()
+    rng = random.Random(args.seed)
+    requests_by_name = endpoint_requests(rng)
+    names = args.endpoints.split(',') if args.endpoints else list(requests_by_name)
+    if not args.mongo_uri and not args.endpoints:
+        names = [name for name in names if name not in MONGOMOCK_UNSUPPORTED]
+    unknown = set(names) - set(requests_by_name)
+    if unknown:
+        sys.exit(f"Unknown endpoints: {', '.join(sorted(unknown))}. Choose from {', '.join(requests_by_name)}")
+
+    results = []
+    for size in [int(value) for value in args.sizes.split(',')]:
+        reset_database(app_module)
+        headers = login(client, size)
+        user_id = str(app_module.users_collection.find_one({'username': f'bench{size}'})['_id'])
+        started = time.perf_counter()
+        seed(app_module, size, user_id, rng)
+        print(f"Seeded {size} resumes in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        for name in names:
+            stats = measure(client, headers, requests_by_name[name], args.iterations, args.warmup)
+            results.append({'size': size, 'endpoint': name, **stats})
+            print(f"{size:>8} {name:<28} p50 {stats['p50_ms']:>9.2f} ms  p95 {stats['p95_ms']:>9.2f} ms  "
+                  f"p99 {stats['p99_ms']:>9.2f} ms  {stats['throughput_rps']:>8.1f} req/s  errors {stats['errors']}",
+                  file=sys.stderr)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': 'mongod' if args.mongo_uri else 'mongomock',
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
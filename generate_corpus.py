@@ -0,0 +1,487 @@
+"""
+Synthetic resume corpus generator for scale testing.
+
+Produces N synthetic candidates with controllable skill distributions, page
+counts, duplicate rates and malformed-file ratios, and writes them either as
+PDF/DOCX files for the upload path (plus a manifest.jsonl describing each file)
+or directly into MongoDB as resume documents shaped like process_single_resume's
+output, with facets and embeddings precomputed. Generation streams in batches,
+so memory stays flat up to millions of resumes.
+
+    python generate_corpus.py --count 10000 --output-dir corpus/ --docx-ratio 0.3 --malformed-rate 0.02
+    python generate_corpus.py --count 1000000 --mongo-uri mongodb://localhost:27017/ \\
+        --database ats_scale --username bench --skill-distribution zipf --duplicate-rate 0.05
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+import zipfile
+import zlib
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+# =============================================
+# Vocabulary
+# =============================================
+SKILLS = [
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'React', 'Angular', 'Node.js', 'Django', 'Flask',
+    'Spring Boot', 'Kubernetes', 'Docker', 'AWS', 'Azure', 'GCP', 'Terraform', 'SQL', 'PostgreSQL',
+    'MongoDB', 'Kafka', 'Spark', 'Machine Learning', 'Pandas', 'Go', 'C#', '.NET', 'Jenkins', 'Git',
+    'Linux', 'Agile', 'Scrum', 'Project Management', 'Communication', 'Leadership', 'Salesforce', 'SAP'
+]
+FIRST_NAMES = ['Aarav', 'Maria', 'James', 'Priya', 'Chen', 'Fatima', 'Lucas', 'Sofia', 'Ravi', 'Emma', 'Omar', 'Yuki']
+LAST_NAMES = ['Sharma', 'Garcia', 'Smith', 'Reddy', 'Wang', 'Khan', 'Silva', 'Rossi', 'Patel', 'Brown', 'Ali', 'Tanaka']
+LOCATIONS = ['Dallas, TX, USA', 'Austin, Texas', 'New York, NY', 'Hyderabad, India', 'Toronto, Canada', 'London, UK', 'Remote']
+CATEGORIES = ['Software Engineering', 'Data Science', 'DevOps', 'Project Management', 'QA', 'Business Analysis']
+EDUCATION = ['B.Tech in Computer Science', 'Bachelor of Science', 'Master of Science in Data Science', 'MBA', 'PhD in Physics', 'Diploma in IT']
+JOB_TITLES = ['Software Engineer', 'Data Scientist', 'DevOps Engineer', 'Project Manager', 'QA Analyst']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella', 'Hooli']
+ACHIEVEMENTS = [
+    'Designed and shipped {skill} services used by {n} internal teams',
+    'Reduced deployment time by {n}% by automating pipelines with {skill}',
+    'Led a team of {n} engineers migrating legacy systems to {skill}',
+    'Improved query latency by {n}% through indexing and {skill} tuning',
+    'Mentored {n} junior developers on {skill} best practices',
+    'Owned on-call rotation and incident reviews for {skill} workloads',
+    'Partnered with product managers to deliver {n} releases using {skill}'
+]
+
+LINES_PER_PAGE = 50
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+MALFORMED_KINDS = ['truncated', 'empty', 'garbage', 'no_text', 'no_email']
+
+# =============================================
+# Candidates
+# =============================================
+class SkillSampler:
+    """Draws skill sets uniformly or with a Zipf skew toward the head of SKILLS"""
+
+    def __init__(self, distribution='uniform', zipf_s=1.1):
+        self.distribution = distribution
+        self.weights = [1 / (rank ** zipf_s) for rank in range(1, len(SKILLS) + 1)]
+
+    def sample(self, rng, k):
+        if self.distribution == 'uniform':
+            return rng.sample(SKILLS, k)
+        # Weighted sampling without replacement: keep the k largest u ** (1 / w)
+        keyed = sorted(((rng.random() ** (1 / weight), skill) for skill, weight in zip(SKILLS, self.weights)), reverse=True)
+        return [skill for _, skill in keyed[:k]]
+
+def make_candidate(index, rng, skill_sampler=None, skill_range=(4, 12)):
+    """Profile fields for one synthetic candidate"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    count = rng.randint(*skill_range)
+    skills = skill_sampler.sample(rng, count) if skill_sampler else rng.sample(SKILLS, count)
+    return {
+        'name': f'{first} {last}',
+        'email': f'{first}.{last}.{index}@example.com'.lower(),
+        'phone_number': f'+1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}',
+        'location': rng.choice(LOCATIONS),
+        'job_title': rng.choice(JOB_TITLES),
+        'current_job': rng.choice(COMPANIES),
+        'skills': ', '.join(skills),
+        'total_experience': f'{rng.randint(0, 25)} years',
+        'education': rng.choice(EDUCATION),
+        'category': rng.choice(CATEGORIES)
+    }
+
+def make_duplicate(candidate, rng):
+    """A re-submission of an earlier candidate: same person, differently cased email, updated phone"""
+    duplicate = dict(candidate)
+    duplicate['email'] = rng.choice([candidate['email'].upper(), candidate['email'].title(), candidate['email']])
+    duplicate['phone_number'] = f'+1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}'
+    return duplicate
+
+def make_experience(candidate, rng, pages):
+    """Employment history, in the experience_details shape Gemini returns, long enough to fill `pages` pages"""
+    skills = [skill.strip() for skill in candidate['skills'].split(',')]
+    target_lines = (pages - 1) * LINES_PER_PAGE + LINES_PER_PAGE // 2
+    lines = 13  # Header fields plus the section heading
+    year = 2024
+    entries = []
+    while lines < target_lines:
+        start = year - rng.randint(1, 4)
+        first = not entries
+        entries.append({
+            'title': candidate['job_title'] if first else rng.choice(JOB_TITLES),
+            'company': candidate['current_job'] if first else rng.choice(COMPANIES),
+            'duration': f'{start} - {"Present" if first else year}',
+            'responsibilities': [
+                rng.choice(ACHIEVEMENTS).format(skill=rng.choice(skills), n=rng.randint(2, 60))
+                for _ in range(rng.randint(3, 6))
+            ]
+        })
+        lines += 2 + len(entries[-1]['responsibilities'])
+        year = start
+    return entries
+
+def resume_text(candidate, experience=()):
+    """Plain-text resume body; the header fields are what FakeGeminiModel reads back"""
+    lines = [
+        candidate['name'],
+        f"Email: {candidate['email']}",
+        f"Phone: {candidate['phone_number']}",
+        f"Location: {candidate['location']}",
+        f"Title: {candidate['job_title']}",
+        f"Company: {candidate['current_job']}",
+        f"Experience: {candidate['total_experience']}",
+        f"Education: {candidate['education']}",
+        f"Category: {candidate['category']}",
+        f"Skills: {candidate['skills']}",
+        'Summary: Experienced professional delivering reliable systems across teams and projects.'
+    ]
+    if experience:
+        lines += ['', 'PROFESSIONAL EXPERIENCE']
+        for entry in experience:
+            lines += ['', f"{entry['title']} - {entry['company']} ({entry['duration']})"]
+            lines += [f'- {item}' for item in entry['responsibilities']]
+    return '\n'.join(lines)
+
+# =============================================
+# Documents
+# =============================================
+def pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def paginate(lines, lines_per_page=LINES_PER_PAGE, footer=None):
+    """Split lines into pages, appending a footer such as 'Name - Page {page} of {pages}' to each"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    if footer:
+        pages = [page + ['', footer.format(page=number, pages=len(pages))] for number, page in enumerate(pages, start=1)]
+    return pages
+
+def make_pdf(lines, lines_per_page=LINES_PER_PAGE, footer=None):
+    """Build a minimal text PDF (Helvetica, one content stream per page) that PyPDF2 can read"""
+    pages = paginate(lines, lines_per_page, footer)
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_ids = []
+    for page_lines in pages:
+        stream = 'BT /F1 10 Tf 14 TL 50 770 Td ' + ' '.join(f'({pdf_escape(line)}) Tj T*' for line in page_lines) + ' ET'
+        objects.append(f'<< /Length {len(stream.encode("latin-1", "replace"))} >>\nstream\n{stream}\nendstream')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>')
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1', 'replace')
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return bytes(out)
+
+DOCX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/>'
+        '</Relationships>'
+    )
+}
+
+def make_docx(lines, lines_per_page=LINES_PER_PAGE, footer=None):
+    """Build a minimal DOCX (one paragraph per line, explicit page breaks) that docx2txt can read"""
+    paragraphs = []
+    for number, page_lines in enumerate(paginate(lines, lines_per_page, footer)):
+        if number:
+            paragraphs.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+        paragraphs += [f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in page_lines]
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{"".join(paragraphs)}</w:body></w:document>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in DOCX_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr('word/document.xml', document)
+    return buffer.getvalue()
+
+def make_file(lines, file_format, footer=None):
+    return make_pdf(lines, footer=footer) if file_format == 'pdf' else make_docx(lines, footer=footer)
+
+def make_malformed(kind, candidate, file_format, rng):
+    """File bytes the upload path should reject, one kind per error branch of process_single_resume"""
+    lines = resume_text(candidate).splitlines()
+    if kind == 'truncated':
+        data = make_file(lines, file_format)
+        return data[:len(data) // 2]
+    if kind == 'empty':
+        return b''
+    if kind == 'garbage':
+        return bytes(rng.getrandbits(8) for _ in range(rng.randint(256, 4096)))
+    if kind == 'no_text':
+        # A well-formed file with nothing to extract, like a scanned image-only resume
+        return make_file([], file_format)
+    # no_email: extracts fine but gives Gemini no valid email to return
+    return make_file([line for line in lines if not line.startswith('Email:')], file_format)
+
+# =============================================
+# Embeddings and Resume Documents
+# =============================================
+class FakeEmbeddingModel:
+    """Deterministic bag-of-words embeddings: each token maps to a fixed random vector"""
+
+    def __init__(self, dim=384):
+        # 384 matches all-MiniLM-L6-v2, so generated corpora stay queryable by a live instance
+        self.dim = dim
+        self.token_vectors = {}
+
+    def token_vector(self, token):
+        vector = self.token_vectors.get(token)
+        if vector is None:
+            vector = np.random.default_rng(zlib.crc32(token.encode())).standard_normal(self.dim).astype(np.float32)
+            self.token_vectors[token] = vector
+        return vector
+
+    def encode_one(self, text, normalize_embeddings):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in re.findall(r'\w+', text.lower()):
+            vector += self.token_vector(token)
+        norm = np.linalg.norm(vector)
+        return vector / norm if normalize_embeddings and norm else vector
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        if isinstance(texts, str):
+            return self.encode_one(texts, normalize_embeddings)
+        return np.array([self.encode_one(text, normalize_embeddings) for text in texts])
+
+def make_resume_doc(app_module, candidate, user_id, text=None, experience=(), filename=None,
+                    content_type='application/pdf', file_bytes=None):
+    """A resume document shaped like process_single_resume's output, with facets precomputed"""
+    now = datetime.utcnow()
+    doc = {
+        'user_id': user_id,
+        'filename': filename or f"{candidate['name'].replace(' ', '_')}.pdf",
+        'content_type': content_type,
+        'text_content': text if text is not None else resume_text(candidate, experience),
+        **candidate,
+        'email_normalized': app_module.normalize_email(candidate['email']),
+        'linkedin': '',
+        'resume_summary': '',
+        'experience': list(experience),
+        'extraction_retries': 0,
+        'created_at': now,
+        'updated_at': now
+    }
+    if file_bytes is not None:
+        doc['file_data'] = base64.b64encode(file_bytes).decode('utf-8')
+    doc.update(app_module.compute_resume_facets(doc))
+    return doc
+
+def add_embeddings(app_module, docs, embedding_model):
+    """Embed a batch of resume documents in one encode call"""
+    vectors = embedding_model.encode([app_module.build_embedding_text(doc) for doc in docs], normalize_embeddings=True)
+    for doc, vector in zip(docs, vectors):
+        doc['embedding'] = [float(value) for value in vector]
+
+# =============================================
+# Corpus Generation
+# =============================================
+def parse_range(value):
+    """'4-12' -> (4, 12); '2' -> (2, 2)"""
+    low, _, high = value.partition('-')
+    return int(low), int(high or low)
+
+def generate(args):
+    """Yield one entry per corpus item: candidate, format, pages, and duplicate/malformed markers"""
+    rng = random.Random(args.seed)
+    sampler = SkillSampler(args.skill_distribution, args.zipf_s)
+    skill_range, page_range = parse_range(args.skills_per_resume), parse_range(args.pages)
+    # Duplicates are drawn from a bounded window of recent candidates, keeping memory flat
+    recent = []
+    for index in range(args.count):
+        entry = {'index': index, 'format': 'docx' if rng.random() < args.docx_ratio else 'pdf',
+                 'duplicate_of': None, 'malformed': None}
+        if recent and rng.random() < args.duplicate_rate:
+            original_index, original = rng.choice(recent)
+            entry['candidate'] = make_duplicate(original, rng)
+            entry['duplicate_of'] = original_index
+        else:
+            entry['candidate'] = make_candidate(index, rng, sampler, skill_range)
+            recent.append((index, entry['candidate']))
+            if len(recent) > 10000:
+                recent.pop(rng.randrange(len(recent)))
+        if rng.random() < args.malformed_rate:
+            entry['malformed'] = rng.choice(MALFORMED_KINDS)
+        entry['pages'] = rng.randint(*page_range)
+        entry['experience'] = make_experience(entry['candidate'], rng, entry['pages'])
+        yield entry
+
+def render(entry):
+    """File bytes for an entry, honoring its malformed kind"""
+    candidate, file_format = entry['candidate'], entry['format']
+    if entry['malformed']:
+        return make_malformed(entry['malformed'], candidate, file_format, random.Random(entry['index']))
+    lines = resume_text(candidate, entry['experience']).splitlines()
+    return make_file(lines, file_format, footer=f"{candidate['name']} - Page {{page}} of {{pages}}")
+
+def filename_for(entry):
+    return f"{entry['candidate']['name'].replace(' ', '_')}_{entry['index']}.{entry['format']}"
+
+def write_files(args):
+    """Write resumes under output-dir in subdirectories of --files-per-dir, plus manifest.jsonl"""
+    os.makedirs(args.output_dir, exist_ok=True)
+    written = 0
+    started = time.perf_counter()
+    with open(os.path.join(args.output_dir, 'manifest.jsonl'), 'w') as manifest:
+        for entry in generate(args):
+            relative = os.path.join(f"batch-{entry['index'] // args.files_per_dir:05d}", filename_for(entry))
+            path = os.path.join(args.output_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(render(entry))
+            manifest.write(json.dumps({
+                'file': relative, 'format': entry['format'], 'pages': entry['pages'],
+                'email': entry['candidate']['email'], 'skills': entry['candidate']['skills'],
+                'duplicate_of': entry['duplicate_of'], 'malformed': entry['malformed']
+            }) + '\n')
+            written += 1
+            if written % args.batch_size == 0:
+                report_progress(written, args.count, started)
+    if written % args.batch_size:
+        report_progress(written, args.count, started)
+
+def load_app(args):
+    """Import app.py against the target database with quiet logging"""
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ['MONGO_URI'] = args.mongo_uri
+    os.environ['MONGO_DB_NAME'] = args.database
+    os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+    return app_module
+
+def resolve_user_id(app_module, args):
+    if args.user_id:
+        return args.user_id
+    user = app_module.users_collection.find_one({'username': args.username}, {'_id': 1})
+    if not user:
+        sys.exit(f'No user named {args.username!r} in {args.database}; sign up first or pass --user-id')
+    return str(user['_id'])
+
+def write_mongo(args):
+    """Upsert resumes keyed on (user_id, email_normalized) in batches, as store_processed_resumes does"""
+    from pymongo import UpdateOne
+
+    app_module = load_app(args)
+    app_module.ensure_indexes()
+    user_id = resolve_user_id(app_module, args)
+    if args.embeddings == 'model':
+        embedding_model = app_module.get_embedding_model()
+    elif args.embeddings == 'fake':
+        embedding_model = FakeEmbeddingModel()
+    else:
+        embedding_model = None
+
+    written = skipped = 0
+    started = time.perf_counter()
+    batch = []
+
+    def flush():
+        if embedding_model is not None:
+            add_embeddings(app_module, batch, embedding_model)
+        app_module.resumes_collection.bulk_write([
+            UpdateOne(
+                {'user_id': user_id, 'email_normalized': doc['email_normalized']},
+                {'$set': {key: value for key, value in doc.items() if key != 'created_at'},
+                 '$setOnInsert': {'created_at': doc['created_at']}},
+                upsert=True
+            )
+            for doc in batch
+        ], ordered=False)
+        batch.clear()
+
+    for entry in generate(args):
+        # Malformed files never make it past extraction, so there is nothing to store
+        if entry['malformed']:
+            skipped += 1
+            continue
+        file_bytes = render(entry) if args.file_data else None
+        batch.append(make_resume_doc(
+            app_module, entry['candidate'], user_id, experience=entry['experience'],
+            filename=filename_for(entry),
+            content_type=DOCX_CONTENT_TYPE if entry['format'] == 'docx' else 'application/pdf',
+            file_bytes=file_bytes
+        ))
+        written += 1
+        if len(batch) >= args.batch_size:
+            flush()
+            report_progress(written, args.count, started)
+    if batch:
+        flush()
+        report_progress(written, args.count, started)
+    app_module.bump_version('resumes')
+    if skipped:
+        print(f'Skipped {skipped} malformed entries (the upload path would reject them)', file=sys.stderr)
+
+def report_progress(done, total, started):
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed else 0
+    print(f'{done}/{total} resumes in {elapsed:.1f}s ({rate:.0f}/s)', file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic resume corpus for scale testing')
+    parser.add_argument('--count', type=int, default=1000, help='Number of resumes')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skill-distribution', choices=['uniform', 'zipf'], default='uniform',
+                        help='zipf makes skills early in the list far more common, like real corpora')
+    parser.add_argument('--zipf-s', type=float, default=1.1, help='Zipf exponent; larger is more skewed')
+    parser.add_argument('--skills-per-resume', default='4-12', help='Range of skills per resume, e.g. 4-12')
+    parser.add_argument('--pages', default='1-2', help='Range of pages per resume, e.g. 1-3')
+    parser.add_argument('--docx-ratio', type=float, default=0.0, help='Fraction of resumes written as DOCX instead of PDF')
+    parser.add_argument('--duplicate-rate', type=float, default=0.0,
+                        help='Fraction of resumes that re-submit an earlier candidate (same email, different case)')
+    parser.add_argument('--malformed-rate', type=float, default=0.0,
+                        help=f"Fraction of files that fail extraction ({', '.join(MALFORMED_KINDS)})")
+    parser.add_argument('--batch-size', type=int, default=1000, help='Documents per Mongo write / progress report')
+
+    output = parser.add_argument_group('file output')
+    output.add_argument('--output-dir', help='Write resume files and manifest.jsonl here')
+    output.add_argument('--files-per-dir', type=int, default=1000, help='Files per batch-NNNNN subdirectory')
+
+    mongo = parser.add_argument_group('Mongo output')
+    mongo.add_argument('--mongo-uri', help='Write resume documents to this MongoDB')
+    mongo.add_argument('--database', default='ats_db')
+    mongo.add_argument('--username', help='Owner of the generated resumes')
+    mongo.add_argument('--user-id', help='Owner id, instead of --username')
+    mongo.add_argument('--embeddings', choices=['fake', 'model', 'none'], default='fake',
+                       help='fake is fast but semantically meaningless; model uses EMBEDDING_MODEL')
+    mongo.add_argument('--file-data', action=argparse.BooleanOptionalAction, default=True,
+                       help='Store the base64 file like uploads do (--no-file-data for smaller documents)')
+    args = parser.parse_args()
+
+    if bool(args.output_dir) == bool(args.mongo_uri):
+        parser.error('pass exactly one of --output-dir or --mongo-uri')
+    if args.mongo_uri and not (args.username or args.user_id):
+        parser.error('--mongo-uri needs --username or --user-id')
+    if args.output_dir:
+        write_files(args)
+    else:
+        write_mongo(args)
+
+if __name__ == '__main__':
+    main()
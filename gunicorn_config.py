@@ -1,14 +1,34 @@
 import multiprocessing
+import os
+
+# Serving mode: 'sync' (one request per worker process) or 'async' (gevent
+# workers that multiplex many I/O-bound requests, such as Gemini and MongoDB
+# calls, inside each process)
+serving_mode = os.getenv('SERVING_MODE', 'sync')
+
+if serving_mode == 'async':
+    # Patch sockets, ssl and threading before the app (and pymongo/requests) are imported
+    from gevent import monkey
+    monkey.patch_all()
+
+# Prometheus multiprocess mode: every worker writes metric samples here and
+# /api/metrics aggregates them. Must be set before the app is imported.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/ats_metrics')
 
 # Server socket
 bind = "0.0.0.0:5000"
 backlog = 2048
 
 # Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = 'sync'
-worker_connections = 1000
-timeout = 30
+if serving_mode == 'async':
+    workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+    worker_class = 'gevent'
+    timeout = 120  # LLM-bound requests can legitimately take a while
+else:
+    workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+    worker_class = 'sync'
+    timeout = 30
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))  # Concurrent requests per async worker
 keepalive = 2
 
 # Logging
@@ -25,4 +45,41 @@ pidfile = None
 umask = 0
 user = None
 group = None
-tmp_upload_dir = None 
\ No newline at end of file
+tmp_upload_dir = None
+
+# Preloading: import the app once in the master and fork workers from it, so
+# workers boot without re-importing and share read-only pages copy-on-write.
+# The app opens no connections at import time, so this is fork-safe.
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+def when_ready(server):
+    """Load shared heavy state in the master before the first worker is forked"""
+    if not preload_app:
+        return
+    import gc
+    import app
+    app.preload_shared_state()
+    # Move everything loaded so far out of the GC's tracked generations, so
+    # collections in workers don't touch (and copy) the shared pages
+    gc.freeze()
+
+def post_fork(server, worker):
+    """Give each worker its own MongoClient and log writer; neither survives fork safely"""
+    import app
+    app.init_db()
+    app.init_logging()
+    if worker_class == 'sync':
+        # A request waiting for an admission slot would hold the whole worker
+        app.app.config['ADMISSION_QUEUE_DEPTH'] = 0
+
+def on_starting(server):
+    """Start with an empty metrics directory so samples from previous runs are not aggregated"""
+    import shutil
+    metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    """Drop live gauges of a worker that exited"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
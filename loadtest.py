@@ -0,0 +1,391 @@
+"""
+Closed-loop load generator for a running ATS backend.
+
+A fixed pool of virtual users issues requests paced to a target rate. Each user
+waits for its previous response before sending the next request, so once the
+server saturates, the achieved rate falls below the target and the report shows
+it. Traffic is either scripted scenarios (recruiters browsing the dashboard,
+bulk uploads, public applicants following share links) or a recorded request
+log replayed in order. The report gives per-route latency percentiles and error
+rates.
+
+Serve the app with Gemini and the embedding model replaced by the benchmark
+fakes, against a local mongod (or mongomock for single-worker smoke runs):
+
+    MONGO_DB_NAME=ats_loadtest GUNICORN_WORKERS=4 gunicorn -c gunicorn_config.py 'loadtest:stub_app()'
+    python loadtest.py --url http://localhost:5000 --rate 50 --users 32 --duration 60
+    python loadtest.py --url http://localhost:5000 --mix dashboard=60,public=35,upload=5 --output run.json
+    python loadtest.py --url http://localhost:5000 --replay access.log --rate 100
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from benchmark import FakeGeminiModel, percentile
+from generate_corpus import SKILLS, FakeEmbeddingModel, make_candidate, make_experience, make_pdf, resume_text
+
+# =============================================
+# Stub App
+# =============================================
+def stub_app():
+    """gunicorn app factory: app.py with fake Gemini and embeddings; LOADTEST_MONGOMOCK=1 swaps in mongomock"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as app_module
+
+    if os.getenv('LOADTEST_MONGOMOCK') == '1':
+        # In-memory and per process: only meaningful with a single worker
+        import mongomock
+        app_module.MongoClient = mongomock.MongoClient
+        app_module.init_db()
+
+    gemini = FakeGeminiModel(float(os.getenv('LOADTEST_LLM_LATENCY_MS', 0)))
+    embedding_model = FakeEmbeddingModel()
+    app_module.get_gemini_model = lambda: gemini
+    app_module.get_embedding_model = lambda: embedding_model
+    app_module._embedding_model = embedding_model  # Marks the model as loaded, so no warm-up starts
+    return app_module.app
+
+# =============================================
+# Traffic
+# =============================================
+# Scenarios are generators: each yields (route, method, path, kwargs) and is
+# sent back the response, so later steps can use earlier results.
+DASHBOARD_PAGES = ['/api/jobs', '/api/recruiters', '/api/submissions', '/api/resumes',
+                   '/api/resumes/count', '/api/public_applications']
+
+class Context:
+    """State shared by all virtual users: accounts, share links and a unique-id counter"""
+
+    def __init__(self, args):
+        self.args = args
+        self.tokens = []
+        self.share_links = []
+        self.counter = itertools.count(int(time.time() * 1000))
+        self.lock = threading.Lock()
+
+    def next_id(self):
+        with self.lock:
+            return next(self.counter)
+
+    def resume_file(self, rng, name='resume.pdf'):
+        candidate = make_candidate(self.next_id(), rng)
+        lines = resume_text(candidate, make_experience(candidate, rng, rng.randint(1, 2))).splitlines()
+        return name, make_pdf(lines), 'application/pdf'
+
+def auth(ctx, rng):
+    return {'Authorization': f'Bearer {rng.choice(ctx.tokens)}'}
+
+def dashboard_session(ctx, rng):
+    """A recruiter opening the dashboard, revalidating cached lists, then searching"""
+    headers = auth(ctx, rng)
+    etags = {}
+    for _ in range(rng.randint(1, 3)):
+        for path in DASHBOARD_PAGES:
+            request_headers = dict(headers)
+            if path in etags:
+                request_headers['If-None-Match'] = etags[path]
+            response = yield f'GET {path}', 'GET', path, {'headers': request_headers}
+            if response is not None and response.headers.get('ETag'):
+                etags[path] = response.headers['ETag']
+        for _ in range(rng.randint(1, 3)):
+            term = ', '.join(rng.sample(SKILLS, 2))
+            yield 'POST /api/resumes/search', 'POST', '/api/resumes/search', {
+                'headers': headers, 'json': {'search_type': rng.choice(['skills', 'hybrid']), 'search_term': term}
+            }
+        prefix = rng.choice(SKILLS)[:2].lower()
+        yield 'GET /api/resumes/suggest', 'GET', '/api/resumes/suggest', {'headers': headers, 'params': {'prefix': prefix}}
+        if rng.random() < 0.1:
+            yield 'POST /api/ats-score', 'POST', '/api/ats-score', {'headers': headers, 'json': {
+                'job_description': 'Looking for ' + ', '.join(rng.sample(SKILLS, 5)), 'match_threshold': 40
+            }}
+
+def upload_session(ctx, rng):
+    """A recruiter uploading a batch of resumes"""
+    files = [('file', ctx.resume_file(rng, f'resume{i}.pdf')) for i in range(ctx.args.upload_files)]
+    yield 'POST /api/resumes', 'POST', '/api/resumes', {'headers': auth(ctx, rng), 'files': files}
+
+def public_session(ctx, rng):
+    """A candidate opening a shared job; some go on to upload a resume and apply"""
+    link = rng.choice(ctx.share_links)
+    for _ in range(rng.randint(1, 3)):
+        yield 'GET /api/jobs/share/<link>', 'GET', f'/api/jobs/share/{link}', {}
+    if rng.random() >= ctx.args.apply_rate:
+        return
+    response = yield 'POST /api/process-and-store-resume', 'POST', '/api/process-and-store-resume', {
+        'files': {'resume': ctx.resume_file(rng)}
+    }
+    if response is None or response.status_code != 200:
+        return
+    resume = response.json()
+    yield 'POST /api/jobs/share/<link>/apply', 'POST', f'/api/jobs/share/{link}/apply', {'data': {
+        'resume_id': resume['resume_id'], 'resume_data': json.dumps(resume),
+        'city': 'Dallas', 'state': 'TX', 'country': 'USA', 'visa_type': 'H1B'
+    }}
+
+SCENARIOS = {'dashboard': dashboard_session, 'upload': upload_session, 'public': public_session}
+
+# Bodies for recorded requests that were logged without one (the app's access log records no bodies)
+REPLAY_BODIES = [
+    (re.compile(r'^/api/resumes/search$'), lambda ctx, rng: {'json': {'search_type': 'skills', 'search_term': rng.choice(SKILLS)}}),
+    (re.compile(r'^/api/ats-score$'), lambda ctx, rng: {'json': {'job_description': ', '.join(rng.sample(SKILLS, 5))}}),
+    (re.compile(r'^/api/resumes$'), lambda ctx, rng: {'files': [('file', ctx.resume_file(rng))]}),
+    (re.compile(r'^/api/process-and-store-resume$'), lambda ctx, rng: {'files': {'resume': ctx.resume_file(rng)}})
+]
+
+def load_recording(path):
+    """Request entries from a JSON-lines log: the app's 'request' access records, or {method, path, ...} objects"""
+    entries = []
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get('method') and record.get('path'):
+                entries.append(record)
+    return entries
+
+class Replay:
+    """Hands out recorded requests in order to whichever user is free, looping at the end"""
+
+    def __init__(self, entries):
+        replayable = [record for record in entries if self.body_for(record) is not None]
+        self.skipped = len(entries) - len(replayable)
+        self.entries = itertools.cycle(replayable)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def body_for(record):
+        """Request body arguments for a record, a builder for them, or None if it cannot be replayed"""
+        if record.get('json') is not None:
+            return {'json': record['json']}
+        if record['method'].upper() not in ('POST', 'PUT'):
+            return {}
+        return next((build for pattern, build in REPLAY_BODIES if pattern.match(record['path'])), None)
+
+    def session(self, ctx, rng):
+        with self.lock:
+            record = next(self.entries)
+        method, path = record['method'].upper(), record['path']
+        kwargs = {'headers': auth(ctx, rng)}
+        if record.get('params'):
+            kwargs['params'] = record['params']
+        body = self.body_for(record)
+        kwargs.update(body if isinstance(body, dict) else body(ctx, rng))
+        yield f"{method} {record.get('route') or path}", method, path, kwargs
+
+# =============================================
+# Load Generator
+# =============================================
+def prepare(ctx, rng):
+    """Create load-test accounts, jobs to share, and a starting set of resumes"""
+    session = requests.Session()
+    url = ctx.args.url
+    for i in range(ctx.args.accounts):
+        credentials = {'username': f'loadtest{i}', 'email': f'loadtest{i}@example.com', 'password': 'Load-Test-Password1!'}
+        session.post(f'{url}/api/auth/signup', json=credentials, timeout=ctx.args.timeout)
+        response = session.post(f'{url}/api/auth/login', json={
+            'username': credentials['username'], 'password': credentials['password']
+        }, timeout=ctx.args.timeout)
+        response.raise_for_status()
+        token = response.json()['token']
+        ctx.tokens.append(token)
+        headers = {'Authorization': f'Bearer {token}'}
+
+        for j in range(ctx.args.jobs_per_account):
+            response = session.post(f'{url}/api/jobs', headers=headers, timeout=ctx.args.timeout, json={
+                'title': f'Load Test {i}-{j}-{ctx.next_id()}', 'client': 'Acme', 'location': 'Dallas, TX',
+                'description': 'Looking for ' + ', '.join(rng.sample(SKILLS, 5))
+            })
+            response.raise_for_status()
+            ctx.share_links.append(response.json()['shareable_link'])
+
+        for start in range(0, ctx.args.seed_resumes, 10):
+            files = [('file', ctx.resume_file(rng, f'seed{n}.pdf')) for n in range(start, min(start + 10, ctx.args.seed_resumes))]
+            session.post(f'{url}/api/resumes', headers=headers, files=files, timeout=ctx.args.timeout)
+
+class Pacer:
+    """Releases send slots at a fixed rate; a slot that is taken late counts as schedule lag"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self.next_slot = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.perf_counter()
+            lag = max(0.0, now - self.next_slot)
+            # Missed slots are dropped rather than sent as a catch-up burst
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return lag
+
+class Recorder:
+    """Collects per-route latencies and outcomes once the warmup period has passed"""
+
+    def __init__(self, measure_from):
+        self.measure_from = measure_from
+        self.routes = {}
+        self.lags = []
+        self.lock = threading.Lock()
+
+    def record(self, route, started, latency, status, lag):
+        if started < self.measure_from:
+            return
+        with self.lock:
+            stats = self.routes.setdefault(route, {'latencies': [], 'statuses': {}})
+            stats['latencies'].append(latency)
+            stats['statuses'][status] = stats['statuses'].get(status, 0) + 1
+            self.lags.append(lag)
+
+def virtual_user(ctx, user_index, scenarios, weights, pacer, recorder, deadline):
+    """Run sessions back to back until the deadline, sending each request when the pacer allows"""
+    rng = random.Random(ctx.args.seed + user_index)
+    session = requests.Session()
+    while time.perf_counter() < deadline:
+        steps = rng.choices(scenarios, weights)[0](ctx, rng)
+        response = None
+        while True:
+            try:
+                route, method, path, kwargs = steps.send(response)
+            except StopIteration:
+                break
+            lag = pacer.wait()
+            if time.perf_counter() >= deadline:
+                return
+            started = time.perf_counter()
+            try:
+                response = session.request(method, ctx.args.url + path, timeout=ctx.args.timeout, **kwargs)
+                status = response.status_code
+            except requests.RequestException as e:
+                response = None
+                status = type(e).__name__
+            recorder.record(route, started, (time.perf_counter() - started) * 1000, status, lag * 1000)
+
+def summarize(recorder, elapsed, args):
+    """Per-route percentiles, error rates and status counts, plus achieved rate and pacing lag"""
+    routes = []
+    total = 0
+    for route, stats in sorted(recorder.routes.items()):
+        latencies = sorted(stats['latencies'])
+        statuses = stats['statuses']
+        count = len(latencies)
+        total += count
+        errors = sum(n for status, n in statuses.items() if not isinstance(status, int) or status >= 500)
+        routes.append({
+            'route': route,
+            'requests': count,
+            'rate_rps': round(count / elapsed, 2),
+            'error_rate': round(errors / count, 4),
+            'rejected_429': statuses.get(429, 0),
+            'statuses': {str(status): n for status, n in sorted(statuses.items(), key=str)},
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'max_ms': round(latencies[-1], 2)
+        })
+    lags = sorted(recorder.lags)
+    return {
+        'target_rps': args.rate,
+        'achieved_rps': round(total / elapsed, 2) if elapsed else 0,
+        'requests': total,
+        'duration_s': round(elapsed, 1),
+        'users': args.users,
+        'schedule_lag_p95_ms': round(percentile(lags, 0.95), 2) if lags else None,
+        'routes': routes
+    }
+
+def print_report(report):
+    print(f"\n{'route':45} {'reqs':>7} {'rps':>7} {'err%':>6} {'429':>5} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for row in report['routes']:
+        print(f"{row['route'][:45]:45} {row['requests']:7d} {row['rate_rps']:7.1f} {row['error_rate'] * 100:6.2f} "
+              f"{row['rejected_429']:5d} {row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f}")
+    print(f"\nTarget {report['target_rps']} req/s, achieved {report['achieved_rps']} req/s with {report['users']} users; "
+          f"schedule lag p95 {report['schedule_lag_p95_ms']} ms")
+    if report['achieved_rps'] < report['target_rps'] * 0.95:
+        print('Achieved rate is below target: the server (or --users) is saturated at this load.')
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name.strip() not in SCENARIOS:
+            sys.exit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description='Closed-loop load test against a running ATS backend')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--rate', type=float, default=20, help='Target requests per second across all users')
+    parser.add_argument('--users', type=int, default=16, help='Concurrent virtual users (max requests in flight)')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to run, including warmup')
+    parser.add_argument('--warmup', type=float, default=5, help='Seconds excluded from the report')
+    parser.add_argument('--mix', default='dashboard=70,public=25,upload=5', help='Scenario weights')
+    parser.add_argument('--replay', help='Replay a recorded JSON-lines request log instead of the scenarios')
+    parser.add_argument('--accounts', type=int, default=4, help='Recruiter accounts to create and spread load across')
+    parser.add_argument('--jobs-per-account', type=int, default=5)
+    parser.add_argument('--seed-resumes', type=int, default=50, help='Resumes uploaded per account before the run')
+    parser.add_argument('--upload-files', type=int, default=5, help='Files per bulk upload request')
+    parser.add_argument('--apply-rate', type=float, default=0.3, help='Fraction of share-link visitors who apply')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the JSON report here')
+    args = parser.parse_args()
+    args.url = args.url.rstrip('/')
+
+    ctx = Context(args)
+    rng = random.Random(args.seed)
+    print(f'Preparing {args.accounts} accounts against {args.url}...', file=sys.stderr)
+    prepare(ctx, rng)
+
+    replay = None
+    if args.replay:
+        entries = load_recording(args.replay)
+        if not entries:
+            sys.exit(f'No requests found in {args.replay}')
+        replay = Replay(entries)
+        if replay.skipped == len(entries):
+            sys.exit(f'None of the requests in {args.replay} can be replayed (write requests need a recorded body)')
+        scenarios, weights = [replay.session], [1]
+    else:
+        mix = parse_mix(args.mix)
+        scenarios, weights = [SCENARIOS[name] for name in mix], list(mix.values())
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    recorder = Recorder(started + args.warmup)
+    pacer = Pacer(args.rate)
+    users = [
+        threading.Thread(target=virtual_user, args=(ctx, i, scenarios, weights, pacer, recorder, deadline), daemon=True)
+        for i in range(args.users)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join(args.duration + args.timeout)
+
+    report = summarize(recorder, max(time.perf_counter() - recorder.measure_from, 1e-9), args)
+    report['timestamp'] = datetime.utcnow().isoformat() + 'Z'
+    report['config'] = vars(args)
+    if replay:
+        report['replay_skipped'] = replay.skipped
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
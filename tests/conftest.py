@@ -0,0 +1,44 @@
+import os
+import sys
+
+import mongomock
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['LLM_CACHE_PATH'] = ''  # No SQLite response cache in tests
+os.environ.setdefault('SECRET_KEY', 'test-secret-key-that-is-long-enough-for-hs256')
+
+import app as app_module
+
+
+@pytest.fixture
+def app():
+    return app_module
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """The app module bound to an empty mongomock database with the app's indexes"""
+    monkeypatch.setattr(app_module, 'MongoClient', mongomock.MongoClient)
+    app_module.init_db()
+    app_module.client.drop_database(app_module.app.config['MONGO_DB_NAME'])
+    app_module.ensure_indexes()
+    yield app_module
+    app_module.client.drop_database(app_module.app.config['MONGO_DB_NAME'])
+
+
+@pytest.fixture
+def client(db):
+    return db.app.test_client()
+
+
+@pytest.fixture
+def signup(client):
+    """Create a user and return (user_id, auth headers) for it"""
+    def signup(username='ann'):
+        credentials = {'username': username, 'email': f'{username}@example.com', 'password': 'Test-Password1!'}
+        client.post('/api/auth/signup', json=credentials)
+        response = client.post('/api/auth/login', json={'username': username, 'password': credentials['password']})
+        body = response.get_json()
+        return body['user']['id'], {'Authorization': f"Bearer {body['token']}"}
+    return signup
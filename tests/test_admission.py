@@ -0,0 +1,95 @@
+import fcntl
+import os
+
+import pytest
+
+
+@pytest.fixture
+def admission(db, tmp_path, monkeypatch):
+    """Fresh admission state with slot files under tmp_path"""
+    monkeypatch.setitem(db.app.config, 'ADMISSION_SLOT_DIR', str(tmp_path))
+    monkeypatch.setitem(db.app.config, 'ADMISSION_MAX_CONCURRENT', 1)
+    monkeypatch.setitem(db.app.config, 'ADMISSION_QUEUE_DEPTH', 0)
+    monkeypatch.setattr(db, '_ip_buckets', db.OrderedDict())
+    monkeypatch.setattr(db, '_global_bucket', db.TokenBucket(1, 100))
+    monkeypatch.setattr(db, '_slot_files', {})
+    monkeypatch.setattr(db, '_held_slots', set())
+    monkeypatch.setattr(db, '_slot_files_pid', None)
+    yield db
+    for handle in db._slot_files.values():
+        handle.close()
+
+
+def call(app, view, ip='10.0.0.1'):
+    with app.app.test_request_context('/', method='POST', environ_base={'REMOTE_ADDR': ip}):
+        return app.admission_control(view)()
+
+
+def ok():
+    return 'ok'
+
+
+def test_rate_limited_requests_get_429_with_retry_after(admission, monkeypatch):
+    monkeypatch.setitem(admission.app.config, 'ADMISSION_IP_BURST', 2)
+    assert call(admission, ok) == 'ok'
+    assert call(admission, ok) == 'ok'
+
+    response, status = call(admission, ok)
+    assert status == 429
+    assert int(response.headers['Retry-After']) >= 1
+    # Other clients keep their own bucket
+    assert call(admission, ok, ip='10.0.0.2') == 'ok'
+
+
+def test_public_endpoint_is_rate_limited(admission, client, monkeypatch):
+    monkeypatch.setitem(admission.app.config, 'ADMISSION_IP_BURST', 0)
+    response = client.post('/api/process-and-store-resume')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '6'
+
+
+def test_busy_slots_get_429_and_refund_the_rate_limit(admission, monkeypatch):
+    monkeypatch.setitem(admission.app.config, 'ADMISSION_QUEUE_TIMEOUT', 3)
+    held = admission.try_acquire_slot()
+    assert held == 0
+    response, status = call(admission, ok)
+    assert status == 429
+    assert response.headers['Retry-After'] == '3'
+    assert admission._ip_buckets['10.0.0.1'].tokens == admission.app.config['ADMISSION_IP_BURST']
+
+    admission.release_slot(held)
+    assert call(admission, ok) == 'ok'
+
+
+def test_queued_request_times_out(admission, monkeypatch):
+    monkeypatch.setitem(admission.app.config, 'ADMISSION_QUEUE_DEPTH', 1)
+    monkeypatch.setitem(admission.app.config, 'ADMISSION_QUEUE_TIMEOUT', 0.1)
+    admission.try_acquire_slot()
+    response, status = call(admission, ok)
+    assert status == 429
+    assert response.headers['Retry-After'] == '1'
+    assert admission._admission_waiting == 0
+
+
+def test_slot_is_released_when_the_view_raises(admission, tmp_path):
+    def fail():
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        call(admission, fail)
+    assert admission._held_slots == set()
+
+    # The flock is gone too, so another worker could take the slot
+    with open(os.path.join(tmp_path, 'slot-0.lock'), 'a') as other:
+        fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        fcntl.flock(other, fcntl.LOCK_UN)
+    assert call(admission, ok) == 'ok'
+
+
+def test_slot_held_by_another_process_is_skipped(admission, tmp_path, monkeypatch):
+    monkeypatch.setitem(admission.app.config, 'ADMISSION_MAX_CONCURRENT', 2)
+    # A separate open file description stands in for another worker's lock
+    with open(os.path.join(tmp_path, 'slot-0.lock'), 'a') as other:
+        fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        assert admission.try_acquire_slot() == 1
+        assert admission.try_acquire_slot() is None
@@ -0,0 +1,55 @@
+import time
+
+
+def test_revoked_tokens_are_rejected(client, signup):
+    _, headers = signup()
+    assert client.get('/api/auth/verify-token', headers=headers).status_code == 200
+    assert client.get('/api/jobs', headers=headers).status_code == 200
+
+    assert client.post('/api/auth/revoke-tokens', headers=headers).status_code == 200
+
+    # Both the full-user and the claims-only decorators check the version
+    assert client.get('/api/auth/verify-token', headers=headers).status_code == 401
+    assert client.get('/api/jobs', headers=headers).status_code == 401
+
+
+def test_new_login_works_after_revocation(client, signup):
+    _, old_headers = signup()
+    client.post('/api/auth/revoke-tokens', headers=old_headers)
+    _, new_headers = signup()
+    assert client.get('/api/auth/verify-token', headers=new_headers).status_code == 200
+    assert client.get('/api/auth/verify-token', headers=old_headers).status_code == 401
+
+
+def test_revocation_by_another_worker_applies_after_the_cache_ttl(db, client, signup, monkeypatch):
+    user_id, headers = signup()
+    now = [time.monotonic()]
+    monkeypatch.setattr(db.time, 'monotonic', lambda: now[0])
+    assert client.get('/api/jobs', headers=headers).status_code == 200
+
+    # Another worker bumps the version; this worker's cached copy is still fresh
+    db.users_collection.update_one({'_id': db.ObjectId(user_id)}, {'$inc': {'token_version': 1}})
+    assert client.get('/api/jobs', headers=headers).status_code == 200
+
+    now[0] += db.app.config['TOKEN_VERSION_CACHE_TTL'] + 1
+    assert client.get('/api/jobs', headers=headers).status_code == 401
+
+
+def test_token_version_cache_expires(db, signup, monkeypatch):
+    user_id, _ = signup()
+    now = [time.monotonic()]
+    monkeypatch.setattr(db.time, 'monotonic', lambda: now[0])
+    assert db.get_token_version(user_id) == 0
+
+    db.users_collection.update_one({'_id': db.ObjectId(user_id)}, {'$set': {'token_version': 3}})
+    now[0] += db.app.config['TOKEN_VERSION_CACHE_TTL'] - 1
+    assert db.get_token_version(user_id) == 0
+    now[0] += 2
+    assert db.get_token_version(user_id) == 3
+
+
+def test_deleted_user_has_no_token_version(db, signup):
+    user_id, headers = signup()
+    db.invalidate_cached_user(user_id)
+    db.users_collection.delete_one({'_id': db.ObjectId(user_id)})
+    assert db.get_token_version(user_id) is None
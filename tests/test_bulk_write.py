@@ -0,0 +1,156 @@
+from bson import ObjectId
+
+USER = {'_id': ObjectId()}
+
+
+def run(app, operations, ordered=True):
+    return app.run_bulk_write(
+        app.recruiters_collection, str(USER['_id']), operations, ordered,
+        lambda data: app.build_recruiter_doc(data, USER), app.build_recruiter_update
+    )
+
+
+def add_recruiter(app, name='Ann', user=USER):
+    return app.recruiters_collection.insert_one({'name': name, 'email': f'{name.lower()}@example.com', 'user_id': str(user['_id'])}).inserted_id
+
+
+def test_mixed_operations(db):
+    keep, drop = add_recruiter(db, 'Ann'), add_recruiter(db, 'Bob')
+    report = run(db, [
+        {'op': 'create', 'data': {'name': 'Cy', 'email': 'cy@example.com'}},
+        {'op': 'update', 'id': str(keep), 'data': {'company': 'Acme'}},
+        {'op': 'delete', 'id': str(drop)}
+    ])
+    assert (report['successful'], report['failed'], report['skipped']) == (3, 0, 0)
+    assert (report['inserted'], report['modified'], report['deleted']) == (1, 1, 1)
+    assert db.recruiters_collection.find_one({'_id': keep})['company'] == 'Acme'
+    assert db.recruiters_collection.find_one({'_id': drop}) is None
+    assert db.recruiters_collection.find_one({'_id': report['results'][0]['id']})['name'] == 'Cy'
+
+
+def test_ordered_stops_at_first_invalid_item(db):
+    report = run(db, [
+        {'op': 'create', 'data': {'name': 'Cy', 'email': 'cy@example.com'}},
+        {'op': 'create', 'data': {'name': 'Di', 'email': 'not-an-email'}},
+        {'op': 'create', 'data': {'name': 'Ed', 'email': 'ed@example.com'}}
+    ])
+    assert [result['status'] for result in report['results']] == ['success', 'error', 'skipped']
+    assert report['results'][1]['error'] == 'Invalid email format'
+    assert db.recruiters_collection.count_documents({}) == 1
+
+
+def test_unordered_applies_every_valid_item(db):
+    report = run(db, [
+        {'op': 'create', 'data': {'name': 'Cy', 'email': 'cy@example.com'}},
+        {'op': 'update', 'id': str(ObjectId()), 'data': {'name': 'Ghost'}},
+        {'op': 'create', 'data': {'name': 'Ed', 'email': 'ed@example.com'}}
+    ], ordered=False)
+    assert [result['status'] for result in report['results']] == ['success', 'error', 'success']
+    assert report['results'][1]['error'] == 'Document not found'
+    assert db.recruiters_collection.count_documents({}) == 2
+
+
+def test_malformed_items_fail_individually(db):
+    recruiter = add_recruiter(db)
+    report = run(db, [
+        'not an object',
+        {'op': 'upsert'},
+        {'op': 'create', 'data': ['a', 'list']},
+        {'op': 'create', 'data': {'name': 'Cy', 'email': 12345}},
+        {'op': 'update', 'id': 'xyz', 'data': {'name': 'Ann'}},
+        {'op': 'update', 'id': str(recruiter), 'data': {}},
+        {'op': 'update', 'id': str(recruiter), 'data': {'user_id': 'someone-else'}},
+        {'op': 'update', 'id': str(recruiter), 'data': {'title': 'CTO'}},
+        {'op': 'update', 'id': str(recruiter), 'data': {'name': ''}}
+    ], ordered=False)
+    errors = [result.get('error') for result in report['results']]
+    assert report['failed'] == 9
+    assert errors[:3] == [
+        'Invalid operation. Must be one of create, update or delete',
+        'Invalid operation. Must be one of create, update or delete',
+        'Data must be an object'
+    ]
+    assert errors[3].startswith('Invalid data')
+    # user_id is read-only: dropped, which leaves nothing to update
+    assert errors[4:] == ['Invalid id', 'No data provided', 'No data provided', 'Fields cannot be updated: title', 'Name cannot be empty']
+    assert db.recruiters_collection.find_one({'_id': recruiter})['user_id'] == str(USER['_id'])
+
+
+def test_document_deleted_earlier_in_batch(db):
+    recruiter = add_recruiter(db)
+    report = run(db, [
+        {'op': 'delete', 'id': str(recruiter)},
+        {'op': 'update', 'id': str(recruiter), 'data': {'name': 'Back'}}
+    ], ordered=False)
+    assert report['results'][1]['error'] == 'Document is deleted earlier in this batch'
+
+
+def test_check_deletes_blocks_referenced_documents(db):
+    recruiter = add_recruiter(db)
+    report = db.run_bulk_write(
+        db.recruiters_collection, str(USER['_id']), [{'op': 'delete', 'id': str(recruiter)}], True,
+        None, None, check_deletes=lambda ids: {ids[0]: 'Recruiter has submissions'}
+    )
+    assert report['results'][0] == {'index': 0, 'op': 'delete', 'status': 'error', 'error': 'Recruiter has submissions'}
+    assert db.recruiters_collection.find_one({'_id': recruiter})
+
+
+def test_write_errors_are_reported_per_item(db):
+    db.recruiters_collection.create_index('email', unique=True)
+    add_recruiter(db, 'Ann')
+    report = run(db, [
+        {'op': 'create', 'data': {'name': 'Cy', 'email': 'cy@example.com'}},
+        {'op': 'create', 'data': {'name': 'Ann', 'email': 'ann@example.com'}},
+        {'op': 'create', 'data': {'name': 'Ed', 'email': 'ed@example.com'}}
+    ])
+    assert [result['status'] for result in report['results']] == ['success', 'error', 'skipped']
+    assert report['inserted'] == 1
+
+
+def test_other_users_documents_are_not_found(db):
+    other = {'_id': ObjectId()}
+    theirs = add_recruiter(db, 'Zed', user=other)
+    report = run(db, [
+        {'op': 'update', 'id': str(theirs), 'data': {'name': 'Hijacked'}},
+        {'op': 'delete', 'id': str(theirs)}
+    ], ordered=False)
+    assert [result['error'] for result in report['results']] == ['Document not found', 'Document not found']
+    assert db.recruiters_collection.find_one({'_id': theirs})['name'] == 'Zed'
+
+
+def test_job_updates_only_touch_editable_fields(app):
+    update, error = app.build_job_update({
+        'id': 'x', 'title': 'Lead', 'status': 'closed', 'url': 'job-new', 'shareable_link': 'share-new', 'user_id': 'someone-else'
+    })
+    assert error is None
+    assert set(update) == {'title', 'status', 'updated_at'}
+    assert app.build_job_update({'owner': 'someone-else'}) == (None, 'Fields cannot be updated: owner')
+    assert app.build_job_update({'title': ''}) == (None, 'Job title cannot be empty')
+
+
+def test_single_recruiter_update_is_validated(db, client, signup):
+    user_id, headers = signup()
+    recruiter = add_recruiter(db, user={'_id': user_id})
+
+    response = client.put(f'/api/recruiters/{recruiter}', json={'email': 'nope'}, headers=headers)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid email format'}
+    response = client.put(f'/api/recruiters/{recruiter}', json={'user_id': 'x', 'notes': 'y'}, headers=headers)
+    assert response.get_json() == {'error': 'Fields cannot be updated: notes'}
+    response = client.put(f'/api/recruiters/{recruiter}', json={'company': 'Acme', 'created_at': 'then'}, headers=headers)
+    assert response.status_code == 200
+    assert db.recruiters_collection.find_one({'_id': recruiter})['company'] == 'Acme'
+
+
+def test_single_submission_update_is_validated(db, client, signup):
+    user_id, headers = signup()
+    submission = db.submissions_collection.insert_one({'candidate_name': 'Sam', 'status': 'Submitted', 'user_id': user_id}).inserted_id
+
+    response = client.put(f'/api/submissions/{submission}', json={'candidate_name': ''}, headers=headers)
+    assert response.get_json() == {'error': 'Candidate Name cannot be empty'}
+    # The UI sends updated_at back; it is replaced by the server's timestamp
+    response = client.put(f'/api/submissions/{submission}', json={'status': 'Interview', 'updated_at': '2020-01-01'}, headers=headers)
+    assert response.status_code == 200
+    stored = db.submissions_collection.find_one({'_id': submission})
+    assert stored['status'] == 'Interview'
+    assert isinstance(stored['updated_at'], db.datetime)
@@ -0,0 +1,61 @@
+def job(number):
+    bullets = '\n'.join(f'- Built service {number}.{i} handling payments at scale' for i in range(5))
+    return f'Senior Engineer {number}\nAcme Corp {number}, 2019 - 2023\n{bullets}'
+
+
+def test_text_under_budget_keeps_repeated_lines(app):
+    text = 'Jane Doe\nResponsibilities:\n- Build APIs\nResponsibilities:\n- Run on-call\n\n\nJane Doe'
+    assert app.compact_resume_text(text, 2000) == 'Jane Doe\nResponsibilities:\n- Build APIs\nResponsibilities:\n- Run on-call\n\nJane Doe'
+
+
+def test_whitespace_and_page_numbers_are_dropped(app):
+    text = 'Jane   Doe\xa0 \n• Python\nPage 1 of 2\n2\n\n\n\nEnd'
+    assert app.compact_resume_text(text, 2000) == 'Jane Doe\n- Python\n\nEnd'
+
+
+def test_lines_mentioning_a_page_are_kept(app):
+    text = 'Managed page 3 of website redesign\nPage 2 / 3\nWrote page 10 copy'
+    assert app.compact_resume_text(text, 2000) == 'Managed page 3 of website redesign\nWrote page 10 copy'
+
+
+def test_running_headers_are_dropped_when_over_budget(app):
+    header = 'Jane Doe - Resume'
+    pages = [f'{header}\n' + '\n'.join(f'- Item {page}.{i} with some detail about the work done' for i in range(6)) for page in range(3)]
+    text = '\nResponsibilities:\n'.join(pages)
+    # Just too long with the headers, short enough without them
+    compacted = app.compact_resume_text(text, (len(text) - len(header)) // app.CHARS_PER_TOKEN)
+    assert compacted.count(header) == 1
+    # A label that repeats only twice and away from page breaks is content
+    assert compacted.count('Responsibilities:') == 2
+
+
+def test_line_repeated_twice_at_page_breaks_is_a_header(app):
+    lines = ['Jane Doe | jane@example.com'] + [f'- Point {i} describing the project in detail' for i in range(10)]
+    text = '\n'.join(lines) + '\nPage 1 of 2\n' + '\n'.join(lines)
+    compacted = app.compact_resume_text(text, 100)
+    assert compacted.count('Jane Doe | jane@example.com') == 1
+    assert 'Page 1 of 2' not in compacted
+
+
+def test_high_priority_overflow_beats_low_priority_sections(app):
+    hobbies = 'Hiking in the mountains and reading books. ' * 7
+    text = f'John Smith\njohn@example.com\nSkills\nPython, Kafka, AWS\nExperience\n{job(1)}\n{job(2)}\nHobbies\n{hobbies}'
+    compacted = app.compact_resume_text(text, 200)
+    assert len(compacted) <= 200 * app.CHARS_PER_TOKEN
+    assert job(2) in compacted
+    assert hobbies.strip() not in compacted
+
+
+def test_long_experience_leaves_room_for_education(app):
+    experience = '\n'.join(job(i) for i in range(10))
+    text = f'John Smith\nExperience\n{experience}\nEducation\nB.S. Computer Science, State University, 2015'
+    compacted = app.compact_resume_text(text, 300)
+    assert 'B.S. Computer Science, State University, 2015' in compacted
+    assert job(0) in compacted
+
+
+def test_contact_details_move_to_the_header(app):
+    filler = '\n'.join(job(i) for i in range(6))
+    text = f'John Smith\nExperience\n{filler}\nPersonal Details\nPhone: (555) 123-4567\nEmail: john@example.com'
+    compacted = app.compact_resume_text(text, 150)
+    assert compacted.startswith('Phone: (555) 123-4567\nEmail: john@example.com\nJohn Smith')
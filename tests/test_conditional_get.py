@@ -0,0 +1,89 @@
+import gzip
+
+import pytest
+
+
+def add_recruiters(db, count):
+    db.recruiters_collection.insert_many([
+        {'name': f'Recruiter {i}', 'email': f'r{i}@example.com', 'company': 'Acme'} for i in range(count)
+    ])
+
+
+def test_matching_etag_gets_304(client, signup):
+    _, headers = signup()
+    first = client.get('/api/recruiters', headers=headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    again = client.get('/api/recruiters', headers={**headers, 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+    assert again.data == b''
+
+
+def test_etag_changes_after_a_write(db, client, signup):
+    _, headers = signup()
+    recruiter_id = db.recruiters_collection.insert_one({'name': 'Ann', 'email': 'ann@example.com'}).inserted_id
+    etag = client.get('/api/recruiters', headers=headers).headers['ETag']
+
+    response = client.put(f'/api/recruiters/{recruiter_id}', json={'company': 'Acme'}, headers=headers)
+    assert response.status_code == 200
+
+    after = client.get('/api/recruiters', headers={**headers, 'If-None-Match': etag})
+    assert after.status_code == 200
+    assert after.headers['ETag'] != etag
+
+
+def test_missing_documents_do_not_change_the_etag(db, client, signup):
+    _, headers = signup()
+    etag = client.get('/api/recruiters', headers=headers).headers['ETag']
+    missing = str(db.ObjectId())
+
+    assert client.put(f'/api/recruiters/{missing}', json={'company': 'Acme'}, headers=headers).status_code == 404
+    assert client.delete(f'/api/recruiters/{missing}', headers=headers).status_code == 404
+    assert client.get('/api/recruiters', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+
+def test_etags_are_per_user(client, signup):
+    _, ann = signup('ann')
+    _, bob = signup('bob')
+    etag = client.get('/api/recruiters', headers=ann).headers['ETag']
+    assert client.get('/api/recruiters', headers={**bob, 'If-None-Match': etag}).status_code == 200
+
+
+def test_large_responses_are_gzipped(db, client, signup, monkeypatch):
+    monkeypatch.setattr(db, 'brotli', None)
+    _, headers = signup()
+    add_recruiters(db, 50)
+    plain = client.get('/api/recruiters', headers=headers)
+    assert 'Content-Encoding' not in plain.headers
+    assert len(plain.data) >= db.app.config['COMPRESS_MIN_SIZE']
+
+    response = client.get('/api/recruiters', headers={**headers, 'Accept-Encoding': 'br, gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == plain.data
+    # Each encoding has its own strong ETag, and revalidating with it still works
+    assert response.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+    revalidated = client.get('/api/recruiters', headers={
+        **headers, 'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_brotli_is_preferred_when_available(db, client, signup):
+    brotli = pytest.importorskip('brotli')
+    _, headers = signup()
+    add_recruiters(db, 50)
+    plain = client.get('/api/recruiters', headers=headers)
+    response = client.get('/api/recruiters', headers={**headers, 'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.data) == plain.data
+
+
+def test_small_responses_are_not_compressed(db, client, signup, monkeypatch):
+    _, headers = signup()
+    add_recruiters(db, 50)
+    monkeypatch.setitem(db.app.config, 'COMPRESS_MIN_SIZE', 1024 * 1024)
+    response = client.get('/api/recruiters', headers={**headers, 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
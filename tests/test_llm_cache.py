@@ -0,0 +1,133 @@
+import os
+import stat
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+
+
+@pytest.fixture
+def cache(app, tmp_path, monkeypatch):
+    """LLM cache in a fresh SQLite file under tmp_path"""
+    path = tmp_path / 'instance' / 'llm_cache.sqlite3'
+    monkeypatch.setitem(app.app.config, 'LLM_CACHE_PATH', str(path))
+    monkeypatch.setattr(app, '_llm_cache_local', threading.local())
+    yield app
+    connection = getattr(app._llm_cache_local, 'connection', None)
+    if connection is not None:
+        connection.close()
+
+
+class FakeModel:
+    def __init__(self, text='{"name": "Jane"}'):
+        self.text = text
+        self.calls = 0
+
+    def generate_content(self, prompt, generation_config=None):
+        self.calls += 1
+        return FakeResponse(self.text)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self._text = text
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise ValueError('The response was blocked')
+        return self._text
+
+
+def llm_calls(outcome):
+    return REGISTRY.get_sample_value('ats_llm_calls_total', {'operation': 'extract_skills', 'outcome': outcome}) or 0
+
+
+def use_model(app, monkeypatch, model):
+    monkeypatch.setattr(app, 'get_gemini_model', lambda: model)
+    return model
+
+
+def test_miss_then_hit(cache):
+    key = cache.llm_cache_key('extract_skills', 1, 'prompt')
+    assert cache.llm_cache_get(key, 'extract_skills') is None
+    cache.llm_cache_put(key, 'extract_skills', 1, 'Python, Go')
+    assert cache.llm_cache_get(key, 'extract_skills') == 'Python, Go'
+
+
+def test_key_covers_prompt_version_and_config(cache):
+    key = cache.llm_cache_key('extract_resume_info', 1, 'prompt')
+    assert key != cache.llm_cache_key('extract_resume_info', 2, 'prompt')
+    assert key != cache.llm_cache_key('extract_resume_info', 1, 'other prompt')
+    assert key != cache.llm_cache_key('extract_resume_info', 1, 'prompt', {'temperature': 0.5})
+    assert key == cache.llm_cache_key('extract_resume_info', 1, 'prompt', {'temperature': 0.1})
+
+
+def test_generate_serves_repeat_prompts_from_the_cache(cache, monkeypatch):
+    model = use_model(cache, monkeypatch, FakeModel('Python'))
+    assert cache.generate_llm_content('prompt', 'extract_skills', 1).text == 'Python'
+    assert cache.generate_llm_content('prompt', 'extract_skills', 1).text == 'Python'
+    assert model.calls == 1
+
+    # Retries skip the lookup, and calls without a prompt version are never cached
+    cache.generate_llm_content('prompt', 'extract_skills', 1, refresh=True)
+    cache.generate_llm_content('prompt', 'extract_skills')
+    cache.generate_llm_content('prompt', 'extract_skills')
+    assert model.calls == 4
+
+
+def test_unreadable_responses_are_not_cached(cache, monkeypatch):
+    model = use_model(cache, monkeypatch, FakeModel(None))
+    successes, errors = llm_calls('success'), llm_calls('error')
+    with pytest.raises(ValueError):
+        cache.generate_llm_content('prompt', 'extract_skills', 1)
+    assert (llm_calls('success'), llm_calls('error')) == (successes, errors + 1)
+    key = cache.llm_cache_key('extract_skills', 1, 'prompt')
+    assert cache.llm_cache_get(key, 'extract_skills') is None
+
+    model.text = 'Python'
+    assert cache.generate_llm_content('prompt', 'extract_skills', 1).text == 'Python'
+    assert model.calls == 2
+
+
+def test_least_recently_used_responses_are_evicted(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+    monkeypatch.setitem(cache.app.config, 'LLM_CACHE_MAX_MB', 1)
+    text = 'x' * (300 * 1024)
+    for name in ('old', 'read', 'new'):
+        now[0] += 100
+        cache.llm_cache_put(name, 'extract_skills', 1, text)
+
+    # Reading an entry makes it recent again
+    now[0] += 100
+    assert cache.llm_cache_get('read', 'extract_skills') == text
+    now[0] += 100
+    cache.llm_cache_put('newest', 'extract_skills', 1, text)
+    cache.evict_llm_cache(cache.get_llm_cache())
+
+    assert cache.llm_cache_get('old', 'extract_skills') is None
+    for name in ('read', 'new', 'newest'):
+        assert cache.llm_cache_get(name, 'extract_skills') == text
+
+
+def test_cache_under_the_limit_is_not_evicted(cache):
+    cache.llm_cache_put('key', 'extract_skills', 1, 'Python')
+    cache.evict_llm_cache(cache.get_llm_cache())
+    assert cache.llm_cache_get('key', 'extract_skills') == 'Python'
+
+
+def test_cache_file_is_private(cache):
+    cache.llm_cache_put('key', 'extract_skills', 1, 'Python')
+    path = cache.app.config['LLM_CACHE_PATH']
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+
+
+def test_empty_path_disables_the_cache(cache, monkeypatch):
+    monkeypatch.setitem(cache.app.config, 'LLM_CACHE_PATH', '')
+    model = use_model(cache, monkeypatch, FakeModel('Python'))
+    cache.generate_llm_content('prompt', 'extract_skills', 1)
+    cache.generate_llm_content('prompt', 'extract_skills', 1)
+    assert model.calls == 2
+    assert cache.get_llm_cache() is None
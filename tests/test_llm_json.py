@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+
+def test_plain_object(app):
+    assert app.parse_llm_json('{"name": "Jane", "skills": "Python"}') == {'name': 'Jane', 'skills': 'Python'}
+
+
+def test_code_fences_and_surrounding_prose(app):
+    text = 'Here is the result:\n```json\n{"name": "Jane", "skills": "Go"}\n```\nLet me know if you need more.'
+    assert app.parse_llm_json(text) == {'name': 'Jane', 'skills': 'Go'}
+
+
+def test_braces_inside_strings(app):
+    assert app.parse_llm_json('{"summary": "Uses {curly} braces"} and {"other": 1}') == {'summary': 'Uses {curly} braces'}
+
+
+def test_truncated_response_is_recovered(app):
+    text = '{"name": "Jane", "experience_details": [{"title": "Engineer", "company": "Ac'
+    assert app.parse_llm_json(text) == {'name': 'Jane', 'experience_details': [{'title': 'Engineer', 'company': 'Ac'}]}
+
+
+def test_no_object_raises(app):
+    with pytest.raises(json.JSONDecodeError):
+        app.parse_llm_json('I could not read this resume.')
+
+
+def test_garbled_response_backs_off_to_what_parsed(app):
+    assert app.parse_llm_json('{"name": "Jane", "skills": }}') == {'name': 'Jane'}
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('{"name": "Jane", "skills": "Py', {'name': 'Jane', 'skills': 'Py'}),
+    ('{"name": "Jane", "skills": "Python",', {'name': 'Jane', 'skills': 'Python'}),
+    ('{"name": "Jane", "note": "ends with \\', {'name': 'Jane', 'note': 'ends with '}),
+    ('{"name": "Jane", "skills": ["Go", "Rust"', {'name': 'Jane', 'skills': ['Go', 'Rust']}),
+    ('{"name": "Jane", "years": 1', {'name': 'Jane', 'years': 1}),
+    # A cut inside a literal backs off to the last complete element
+    ('{"name": "Jane", "active": tr', {'name': 'Jane'}),
+    ('{"a": [1, 2, {"b": tr', {'a': [1, 2, {}]}),
+])
+def test_repair_truncated_json(app, text, expected):
+    assert app.repair_truncated_json(text) == expected
+
+
+def test_repair_needs_an_object(app):
+    with pytest.raises(json.JSONDecodeError):
+        app.repair_truncated_json('["just", "a list"')
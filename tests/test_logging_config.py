@@ -0,0 +1,27 @@
+import logging
+
+import pytest
+
+
+def test_route_levels_are_parsed(app):
+    assert app.parse_route_settings('/api/health=warning, /api/metrics=ERROR', app.parse_log_level) == {
+        '/api/health': logging.WARNING, '/api/metrics': logging.ERROR}
+
+
+def test_invalid_route_levels_are_skipped_with_a_warning(app, monkeypatch):
+    warnings = []
+    monkeypatch.setattr(logging.getLogger('ats'), 'warning', lambda message, *args: warnings.append(message % args))
+    settings = app.parse_route_settings('/api/health=LOUD,/api/metrics=ERROR,/api/jobs=BASIC_FORMAT', app.parse_log_level)
+    assert settings == {'/api/metrics': logging.ERROR}
+    assert len(warnings) == 2
+    assert "'/api/health=LOUD'" in warnings[0]
+
+
+def test_invalid_sample_rates_are_skipped(app):
+    assert app.parse_route_settings('/api/a=0.5,/api/b=often', float) == {'/api/a': 0.5}
+
+
+def test_parse_log_level_rejects_unknown_names(app):
+    assert app.parse_log_level('debug') == logging.DEBUG
+    with pytest.raises(ValueError):
+        app.parse_log_level('verbose')
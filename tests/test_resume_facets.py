@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pytest
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('5+ years', 5.0),
+    ('3.5 yrs', 3.5),
+    ('18 months', 1.5),
+    ('2012 - 2018', 6.0),
+    ('10', 10.0),
+    (7, 7.0),
+    (2.5, 2.5),
+    ('', None),
+    (None, None),
+    ('several', None),
+    (True, None),
+    # Calendar years are not durations, and absurd durations are dropped
+    ('2019', datetime.utcnow().year - 2019),
+    ('150 years', None),
+    (1998, None),
+])
+def test_parse_experience_years(app, value, expected):
+    assert app.parse_experience_years(value) == expected
+
+
+def test_open_ended_spans_run_to_this_year(app):
+    this_year = datetime.utcnow().year
+    assert app.parse_experience_years('2015 - present') == this_year - 2015
+    assert app.parse_experience_years('since 2012') == this_year - 2012
+
+
+@pytest.mark.parametrize('education, expected', [
+    ('PhD in Physics', 'doctorate'),
+    ('MBA, B.Tech', 'masters'),
+    ('M.S. in Computer Science', 'masters'),
+    ('MS Computer Science', 'masters'),
+    ('ME (Mechanical)', 'masters'),
+    ('Bachelor of Arts', 'bachelors'),
+    ('B.E. Mechanical Engineering', 'bachelors'),
+    ('BS Computer Science', 'bachelors'),
+    ('BA', 'bachelors'),
+    ('Associate degree', 'associate'),
+    ('Diploma in Nursing', 'diploma'),
+    ('High School Diploma', 'high_school'),
+    # Abbreviations outside a degree context
+    ('MS Office certified', 'other'),
+    ('Will be graduating soon', 'other'),
+    ('', ''),
+    (None, ''),
+])
+def test_classify_education(app, education, expected):
+    assert app.classify_education(education) == expected
+
+
+def test_faceted_search_accepts_null_terms(db, client, signup):
+    user_id, headers = signup()
+    db.resumes_collection.insert_one({'user_id': user_id, 'name': 'Jane', 'education_level': 'masters', 'experience_years': 6.0})
+    response = client.post('/api/resumes/search', json={
+        'search_type': 'faceted', 'search_term': None, 'text': None, 'filters': {'education_level': 'masters'}
+    }, headers=headers)
+    assert response.status_code == 200
+    assert [resume['name'] for resume in response.get_json()['resumes']] == ['Jane']
@@ -0,0 +1,92 @@
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+USER = {'_id': ObjectId()}
+
+
+def processed(email, name='Jane Doe', filename=None, user=USER, **fields):
+    return {
+        'filename': filename or f'{name}.pdf',
+        'retries': 0,
+        'resume_data': {
+            'name': name, 'email': email, 'email_normalized': email.strip().lower(),
+            'skills': 'Python', 'user_id': str(user['_id']), **fields
+        }
+    }
+
+
+def test_inserts_then_updates_by_email(db):
+    first = db.store_processed_resumes([processed('jane@example.com')], USER)
+    assert first[0]['status'] == 'success'
+    assert first[0]['message'] == 'Resume uploaded successfully'
+
+    second = db.store_processed_resumes([processed(' Jane@Example.com ', skills='Go')], USER)
+    assert second[0]['message'] == 'Resume updated successfully'
+    assert second[0]['id'] == first[0]['id']
+    stored = db.resumes_collection.find_one({'_id': first[0]['id']})
+    assert stored['skills'] == 'Go'
+    assert stored['created_at'] <= stored['updated_at']
+    assert db.resumes_collection.count_documents({}) == 1
+
+
+def test_files_with_the_same_email_are_merged(db):
+    results = db.store_processed_resumes([
+        processed('jane@example.com', filename='old.pdf', skills='Java'),
+        processed('JANE@example.com', filename='new.pdf', skills='Rust')
+    ], USER)
+    assert results[0]['message'] == 'Merged with new.pdf (same email)'
+    assert results[0]['id'] == results[1]['id']
+    assert db.resumes_collection.find_one({})['skills'] == 'Rust'
+    assert db.resumes_collection.count_documents({}) == 1
+
+
+def test_users_do_not_share_resumes(db):
+    other_user = {'_id': ObjectId()}
+    db.store_processed_resumes([processed('jane@example.com')], USER)
+    db.store_processed_resumes([processed('jane@example.com', user=other_user)], other_user)
+    assert db.resumes_collection.count_documents({}) == 2
+
+
+def duplicate_key_error(index):
+    return BulkWriteError({
+        'writeErrors': [{'index': index, 'code': 11000, 'errmsg': 'E11000 duplicate key error'}],
+        'upserted': [], 'nInserted': 0, 'nUpserted': 0, 'nMatched': 0, 'nModified': 0, 'nRemoved': 0
+    })
+
+
+def test_upsert_race_is_retried_as_an_update(db, monkeypatch):
+    """A concurrent upload inserts the same email between our lookup and insert"""
+    real_bulk_write = db.resumes_collection.bulk_write
+    calls = []
+
+    def racing_bulk_write(operations, ordered=True):
+        calls.append(len(operations))
+        if len(calls) == 1:
+            db.resumes_collection.insert_one({'user_id': str(USER['_id']), 'email_normalized': 'jane@example.com', 'name': 'Other upload'})
+            real_bulk_write(operations[1:], ordered=ordered)
+            raise duplicate_key_error(0)
+        return real_bulk_write(operations, ordered=ordered)
+
+    monkeypatch.setattr(db.resumes_collection, 'bulk_write', racing_bulk_write)
+    results = db.store_processed_resumes([processed('jane@example.com'), processed('sam@example.com', name='Sam')], USER)
+
+    assert calls == [2, 1]  # Only the losing upsert is retried
+    assert [result['status'] for result in results] == ['success', 'success']
+    assert results[0]['message'] == 'Resume updated successfully'
+    assert db.resumes_collection.count_documents({'email_normalized': 'jane@example.com'}) == 1
+    assert db.resumes_collection.find_one({'email_normalized': 'jane@example.com'})['name'] == 'Jane Doe'
+
+
+def test_persistent_duplicate_key_error_is_reported(db, monkeypatch):
+    def failing_bulk_write(operations, ordered=True):
+        raise duplicate_key_error(0)
+
+    monkeypatch.setattr(db.resumes_collection, 'bulk_write', failing_bulk_write)
+    bumped = []
+    monkeypatch.setattr(db, 'bump_version', bumped.append)
+    results = db.store_processed_resumes([processed('jane@example.com')], USER)
+    assert results == [{
+        'status': 'error', 'error': 'storage_failed', 'filename': 'Jane Doe.pdf', 'message': 'E11000 duplicate key error'
+    }]
+    # Nothing was written, so cached list responses stay valid
+    assert bumped == []